@@ -0,0 +1,102 @@
+"""
+Benchmark: EDA aggregates as the notebook did them (load the whole cleaned
+artifact, then pandas groupbys) vs analytics.Analytics on every available
+engine.
+
+The cleaned artifact is built once from synthetic data, partitioned by
+province like run_cleaning.py writes it, and cached under benchmarks/.data/.
+
+    python benchmarks/bench_analytics.py [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_CACHE = BENCH_DIR / ".data"
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from src.analytics import Analytics, available_engines  # noqa: E402
+from src.cleaning import clean_data  # noqa: E402
+from src.data_loader import load_data, save_data  # noqa: E402
+from src.dtype_planner import plan_dtypes  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+FILTER = [("province", "in", ["Gauteng", "Western Cape"]), ("totalpremium", ">", 0)]
+
+
+def clean_artifact(rows: int, seed: int) -> Path:
+    path = DATA_CACHE / f"clean_{rows}_seed{seed}.parquet"
+    if not path.exists():
+        raw = pd.concat(generate(rows, seed=seed), ignore_index=True)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            df = clean_data(raw)
+        save_data(df, path, partition_cols=["province"], sort_by="transactionmonth",
+                  dtype_plan=plan_dtypes(df))
+    return path
+
+
+def notebook_queries(path: Path):
+    df = load_data(path)
+    monthly = df.groupby("transactionmonth")[["totalclaims", "totalpremium"]].sum()
+    province = df.groupby("province", observed=True).agg(
+        {"lossratio": "mean", "totalclaims": "sum", "totalpremium": "sum"}
+    )
+    postal = (df["totalpremium"] - df["totalclaims"]).groupby(df["postalcode"], observed=True).sum()
+    freq = df.assign(has_claim=df["totalclaims"] > 0).groupby(
+        ["covertype", "transactionmonth"], observed=True
+    )["has_claim"].mean()
+    subset = df[df["province"].isin(FILTER[0][2]) & (df["totalpremium"] > 0)]
+    gender = subset.groupby("gender", observed=True)[["totalclaims", "totalpremium"]].sum()
+    return monthly, province, postal, freq, gender
+
+
+def analytics_queries(path: Path, engine: str):
+    eda = Analytics(path, engine=engine)
+    return (
+        eda.monthly_trends(),
+        eda.segment_summary("province", extra=["lossratio"]),
+        eda.margin_by_postalcode(),
+        eda.frequency_severity("covertype"),
+        eda.loss_ratio("gender", filters=FILTER),
+    )
+
+
+def best_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = clean_artifact(args.rows, args.seed)
+    modes = {"notebook (full load + pandas)": lambda: notebook_queries(path)}
+    for engine in available_engines():
+        modes[f"Analytics, {engine}"] = lambda engine=engine: analytics_queries(path, engine)
+
+    print(f"{args.rows:,} rows, 5 aggregates")
+    print(f"{'mode':<32} {'seconds':>9} {'speedup':>8}")
+    baseline = None
+    for name, fn in modes.items():
+        seconds = best_time(fn, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<32} {seconds:>9.3f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: DataFrame.drop_duplicates vs dedup.drop_duplicates (verified row
+hash and business key), plus the chunked StreamingDeduplicator.
+
+Runs on a cleaned synthetic frame with a share of rows duplicated, once with
+the cleaning dtypes and once with the dtype plan applied. Every mode is
+checked against pandas before it is timed.
+
+    python benchmarks/bench_dedup.py [--rows 1000000] [--dup-share 0.01] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from src.cleaning import clean_data  # noqa: E402
+from src.dedup import BUSINESS_KEY, StreamingDeduplicator, drop_duplicates  # noqa: E402
+from src.dtype_planner import apply_plan, plan_dtypes  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+CHUNK_ROWS = 100_000
+
+
+def make_frame(rows: int, dup_share: float, seed: int) -> pd.DataFrame:
+    raw = pd.concat(generate(rows, seed=seed), ignore_index=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        df = clean_data(raw)
+    rng = np.random.default_rng(seed)
+    dups = df.iloc[rng.integers(0, len(df), int(len(df) * dup_share))]
+    return pd.concat([df, dups]).sample(frac=1, random_state=seed)
+
+
+def streaming(df: pd.DataFrame) -> pd.DataFrame:
+    dedup = StreamingDeduplicator()
+    return pd.concat([dedup(df.iloc[i:i + CHUNK_ROWS]) for i in range(0, len(df), CHUNK_ROWS)])
+
+
+def best_time(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dup-share", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.dup_share, args.seed)
+    frames = {"cleaned": df, "dtype plan": apply_plan(df, plan_dtypes(df))}
+
+    modes = {
+        "pandas drop_duplicates": lambda d: d.drop_duplicates(),
+        "row hash (verified)": lambda d: drop_duplicates(d)[0],
+        "business key": lambda d: drop_duplicates(d, key=BUSINESS_KEY)[0],
+        f"streaming, {CHUNK_ROWS:,}-row chunks": streaming,
+    }
+
+    print(f"{len(df):,} rows, {args.dup_share:.1%} duplicated")
+    print(f"{'frame':<12} {'mode':<32} {'seconds':>9} {'speedup':>8} {'rows kept':>11}")
+    for frame_name, frame in frames.items():
+        expected = frame.drop_duplicates()
+        baseline = None
+        for name, fn in modes.items():
+            out = fn(frame)
+            if name != "business key":
+                pd.testing.assert_index_equal(out.index, expected.index)
+            seconds = best_time(lambda: fn(frame), args.repeat)
+            baseline = baseline or seconds
+            print(f"{frame_name:<12} {name:<32} {seconds:>9.3f} {baseline / seconds:>7.1f}x {len(out):>11,}")
+
+
+if __name__ == "__main__":
+    main()
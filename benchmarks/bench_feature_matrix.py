@@ -0,0 +1,78 @@
+"""
+Benchmark: dense OneHotEncoder + StandardScaler (the old Task 4
+preprocessing) vs feature_matrix.SparseFeatureBuilder, including the
+high-cardinality postalcode / model columns the dense path had to drop.
+
+Reports build time, peak traced memory and the size of the result.
+
+    python benchmarks/bench_feature_matrix.py [--rows 1000000] [--dense-rows 200000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from scipy import sparse
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_analytics import clean_artifact  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.feature_matrix import SparseFeatureBuilder  # noqa: E402
+
+NUMERIC = ["suminsured", "calculatedpremiumperterm", "cubiccapacity", "kilowatts", "registrationyear"]
+CATEGORICAL = ["province", "gender", "vehicletype", "make", "covertype", "postalcode", "model"]
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nbytes = sum(a.nbytes for a in (X.data, X.indices, X.indptr)) if sparse.issparse(X) else X.nbytes
+    return seconds, peak / 2 ** 20, nbytes / 2 ** 20, X.shape
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dense-rows", type=int, default=200_000,
+                        help="rows for the dense path (it does not fit in memory at full size)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = load_data(clean_artifact(args.rows, args.seed))
+    numeric = [c for c in NUMERIC if c in df.columns]
+    categorical = [c for c in CATEGORICAL if c in df.columns]
+    sample = df.iloc[: args.dense_rows]
+
+    def dense():
+        pre = ColumnTransformer([
+            ("num", StandardScaler(), numeric),
+            ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), categorical),
+        ])
+        return pre.fit_transform(sample.assign(**{c: sample[c].astype(str) for c in categorical}))
+
+    def builder(frame):
+        return SparseFeatureBuilder(numeric, categorical, min_frequency=20).fit(frame).transform(frame)
+
+    modes = {
+        f"dense one-hot, {len(sample):,} rows": dense,
+        f"SparseFeatureBuilder, {len(sample):,} rows": lambda: builder(sample),
+        f"SparseFeatureBuilder, {len(df):,} rows": lambda: builder(df),
+    }
+    print(f"{'mode':<40} {'seconds':>8} {'peak MB':>9} {'matrix MB':>10}  shape")
+    for name, fn in modes.items():
+        seconds, peak, size, shape = measure(fn)
+        print(f"{name:<40} {seconds:>8.2f} {peak:>9.0f} {size:>10.0f}  {shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark / regression check: import time of the data and stats paths.
+
+Each import runs in a fresh interpreter, timed above an `import pandas`
+baseline (paid by every path anyway). Fails (exit 1) when a path takes
+longer than its budget or pulls in a heavy dependency that should only be
+loaded by the functions using it (plotting, scipy.stats, sklearn).
+
+- data path: src.data_loader, src.cleaning, src.stream_cleaning,
+  src.run_cleaning, src.preprocessing
+- stats path: src.statistical_tests, src.hypothesis_runner,
+  src.multigroup, src.segment_metrics, src.Hypothesis_helper
+
+    python benchmarks/bench_import.py [--budget 0.3] [--repeat 5]
+
+The test suite runs it too (tests/test_import_time.py).
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+PATHS = {
+    "data": ["src.data_loader", "src.cleaning", "src.stream_cleaning", "src.run_cleaning", "src.preprocessing"],
+    "stats": ["src.statistical_tests", "src.hypothesis_runner", "src.multigroup", "src.segment_metrics",
+              "src.Hypothesis_helper"],
+}
+
+# Loaded on first use only: none of these may appear after importing a path
+LAZY = ["matplotlib", "seaborn", "scipy.stats", "sklearn"]
+
+RUNNER = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import numpy, pandas
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "loaded": [name for name in {lazy!r} if name in sys.modules],
+}}))
+"""
+
+
+def time_import(modules: list, repeat: int) -> dict:
+    """Best of `repeat` fresh-interpreter imports of `modules` (seconds above pandas)."""
+    code = RUNNER.format(root=str(ROOT_DIR), modules=modules, lazy=LAZY)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"seconds": min(r["seconds"] for r in runs), "loaded": runs[0]["loaded"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget", type=float, default=0.3, help="seconds per path, above import pandas")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = []
+    print(f"{'import':<24} {'seconds':>8}  heavy modules loaded")
+    for path, modules in PATHS.items():
+        for name in [*modules, f"{path} path"]:
+            result = time_import(modules if name == f"{path} path" else [name], args.repeat)
+            print(f"{name:<24} {result['seconds']:>8.3f}  {', '.join(result['loaded']) or '-'}")
+            if result["loaded"]:
+                failed.append(f"{name} imports {', '.join(result['loaded'])}")
+            if name == f"{path} path" and result["seconds"] > args.budget:
+                failed.append(f"{path} path takes {result['seconds']:.3f} s (budget {args.budget} s)")
+
+    for message in failed:
+        print(f"REGRESSION: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
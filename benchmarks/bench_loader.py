@@ -0,0 +1,67 @@
+"""
+Benchmark: original python-engine load_data vs the fast declared-schema loader.
+
+Each mode runs in a fresh subprocess so peak RSS is measured independently.
+
+    python benchmarks/bench_loader.py [--file MachineLearningRating_v3.txt] [--repeat 3]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+MODES = {
+    "python (current)": "load_data(FILE, sep='|')",
+    "c + schema": "load_raw(FILE, engine='c')",
+    "pyarrow + schema": "load_raw(FILE, engine='pyarrow')",
+    "c + schema, chunked": "sum(len(c) for c in load_raw(FILE, chunksize=100_000))",
+}
+
+RUNNER = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+from src.data_loader import load_data, load_raw
+FILE = {file!r}
+start, cpu = time.perf_counter(), time.process_time()
+result = {expr}
+rows = result if isinstance(result, int) else len(result)
+print(json.dumps({{
+    "wall_s": time.perf_counter() - start,
+    "cpu_s": time.process_time() - cpu,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "rows": rows,
+}}))
+"""
+
+
+def run_mode(expr: str, filename: str) -> dict:
+    code = RUNNER.format(root=str(ROOT_DIR), file=filename, expr=expr)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", default="MachineLearningRating_v3.txt")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':<24} {'wall (s)':>10} {'cpu (s)':>10} {'peak RSS (MB)':>14} {'rows':>10}")
+    for name, expr in MODES.items():
+        try:
+            runs = [run_mode(expr, args.file) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as exc:
+            print(f"{name:<24} failed: {exc.stderr.strip().splitlines()[-1]}")
+            continue
+        best = min(runs, key=lambda r: r["wall_s"])
+        print(
+            f"{name:<24} {best['wall_s']:>10.2f} {best['cpu_s']:>10.2f} "
+            f"{max(r['peak_rss_mb'] for r in runs):>14.1f} {best['rows']:>10,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: monthly loss-ratio series recomputed over the cleaned artifact
+(Analytics.monthly_trends, as the EDA notebook does) vs read from the
+monitoring.MonthlyMonitor store, and the cost of adding a new month.
+
+    python benchmarks/bench_monitoring.py [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_analytics import best_time, clean_artifact  # noqa: E402
+from src.analytics import Analytics  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.monitoring import MonthlyMonitor  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = clean_artifact(args.rows, args.seed)
+    df = load_data(path)
+    months = df["transactionmonth"].dt.to_period("M")
+    history, new = df[months < months.max()], df[months == months.max()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = MonthlyMonitor(tmp)
+        start = time.perf_counter()
+        monitor.rebuild(history)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        monitor.append(new)
+        append = time.perf_counter() - start
+
+        queries = {
+            "full scan: Analytics.monthly_trends": lambda: Analytics(path).monthly_trends(),
+            "store: monthly series (cold)": lambda: MonthlyMonitor(tmp).series(),
+            "store: monthly series (cached)": lambda: monitor.series(),
+            "store: 3-month rolling by province": lambda: monitor.series("province", window=3),
+            "store: cumulative, covertype filter": lambda: monitor.series(
+                filters={"covertype": ["Own Damage", "Windscreen"]}, cumulative=True),
+        }
+        print(f"{len(df):,} rows, {len(monitor.months())} months, "
+              f"{len(monitor.cells()):,} stored cells")
+        print(f"{'operation':<40} {'seconds':>8}")
+        print(f"{f'build store ({len(history):,} rows)':<40} {build:>8.3f}")
+        print(f"{f'append one month ({len(new):,} rows)':<40} {append:>8.3f}")
+        for name, fn in queries.items():
+            print(f"{name:<40} {best_time(fn, args.repeat):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: k-group tests over postal codes on the cleaned artifact.
+
+- Task 3 as written: a list of per-group arrays unpacked into
+  scipy f_oneway / kruskal (top 20 postal codes, then all of them)
+- multigroup.KGroupTests from factorized codes: ANOVA, Welch's ANOVA,
+  Kruskal-Wallis, Dunn and Games-Howell over every postal code
+
+    python benchmarks/bench_multigroup.py [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import f_oneway, kruskal
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_analytics import best_time, clean_artifact  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.multigroup import KGroupTests  # noqa: E402
+
+
+def group_arrays(df, metric):
+    return [group[metric].values for _, group in df.groupby("postalcode", observed=True)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = load_data(clean_artifact(args.rows, args.seed), usecols=["postalcode", "totalpremium", "totalclaims"])
+    df["margin"] = df["totalpremium"] - df["totalclaims"]
+    top = df["postalcode"].value_counts().head(20).index
+    df_top = df[df["postalcode"].isin(top)]
+    print(f"{len(df):,} rows, {df['postalcode'].nunique()} postal codes")
+    print(f"{'test (margin by postal code)':<52} {'seconds':>8}")
+
+    def row(name, fn):
+        print(f"{name:<52} {best_time(fn, args.repeat):>8.3f}")
+
+    row("f_oneway(*groups), top 20", lambda: f_oneway(*group_arrays(df_top, "margin")))
+    row("f_oneway(*groups), all", lambda: f_oneway(*group_arrays(df, "margin")))
+    row("kruskal(*groups), all", lambda: kruskal(*group_arrays(df, "margin")))
+
+    row("KGroupTests: ANOVA + Welch + Kruskal-Wallis, all",
+        lambda: [getattr(KGroupTests(df, "postalcode", "margin"), t)() for t in ("anova", "welch_anova", "kruskal")])
+    tests = KGroupTests(df, "postalcode", "margin")
+    pairs = tests.k * (tests.k - 1) // 2
+    row(f"KGroupTests: Dunn, all ({pairs:,} pairs)", lambda: KGroupTests(df, "postalcode", "margin").dunn())
+    tests.games_howell()  # studentized range table, built once per k
+    row(f"KGroupTests: Games-Howell, all ({pairs:,} pairs)",
+        lambda: KGroupTests(df, "postalcode", "margin").games_howell())
+
+    ours = tests.anova()["statistic"], tests.kruskal()["statistic"]
+    scipy = f_oneway(*group_arrays(df, "margin")).statistic, kruskal(*group_arrays(df, "margin")).statistic
+    print(f"max relative difference to scipy (F, H): {np.max(np.abs(np.subtract(ours, scipy)) / np.abs(scipy)):.2e}")
+
+
+if __name__ == "__main__":
+    main()
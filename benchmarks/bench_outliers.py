@@ -0,0 +1,101 @@
+"""
+Benchmark: winsorizing the cleaned artifact's numeric columns.
+
+- per-column loop of cleaning.winsorize_series (one exact quantile each)
+- outliers.Winsorizer, exact and sketch mode, overall and per covertype
+- a new month of data: refit exact caps over all history vs extend the
+  persisted sketches with the month only
+
+    python benchmarks/bench_outliers.py [--rows 1000000]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_analytics import clean_artifact  # noqa: E402
+from src.cleaning import winsorize_series  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.outliers import Winsorizer, numeric_columns  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def per_column_loop(df, columns):
+    out = df.copy()
+    for col in columns:
+        out[col] = winsorize_series(out[col])
+    return out
+
+
+def max_rank_error(df, sketch: Winsorizer, exact: Winsorizer) -> float:
+    """Largest gap between the share of rows below sketch and exact caps."""
+    worst = 0.0
+    for j, col in enumerate(exact.columns):
+        values = np.sort(df[col].to_numpy(dtype=float))
+        values = values[~np.isnan(values)]
+        for bound in (0, 1):
+            a = np.searchsorted(values, sketch.caps()["__all__"][bound][j]) / len(values)
+            b = np.searchsorted(values, exact.caps()["__all__"][bound][j]) / len(values)
+            worst = max(worst, abs(a - b))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = load_data(clean_artifact(args.rows, args.seed))
+    columns = numeric_columns(df)
+    print(f"{len(df):,} rows, {len(columns)} numeric columns")
+    print(f"{'mode':<50} {'seconds':>8}")
+
+    seconds, _ = timed(lambda: per_column_loop(df, columns))
+    print(f"{'winsorize_series per column':<50} {seconds:>8.3f}")
+    fitted = {}
+    for by in (None, "covertype"):
+        for exact in (True, False):
+            name = f"Winsorizer {'exact' if exact else 'sketch'}{', by ' + by if by else ''}"
+            seconds, w = timed(lambda: Winsorizer(columns=columns, by=by, exact=exact).fit(df))
+            capped, _ = timed(lambda: w.transform(df))
+            print(f"{name + ' (fit + transform)':<50} {seconds + capped:>8.3f}")
+            fitted[(by, exact)] = w
+    print(f"sketch vs exact caps: max rank error {max_rank_error(df, fitted[(None, False)], fitted[(None, True)]):.5f}")
+
+    # New month arriving after the persisted history
+    months = df["transactionmonth"]
+    last = months.max()
+    history, new = df[months < last], df[months == last]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Winsorizer(columns=columns, by="covertype").fit(history).save(Path(tmp) / "caps.json")
+
+        seconds, _ = timed(lambda: Winsorizer(columns=columns, by="covertype", exact=True)
+                           .fit(pd.concat([history, new])).transform(new))
+        print(f"\nnew month ({len(new):,} rows)")
+        print(f"{'exact: refit over history + month':<50} {seconds:>8.3f}")
+
+        def incremental():
+            w = Winsorizer.load(path).partial_fit(new)
+            w.save(path)
+            return w.transform(new)
+
+        seconds, _ = timed(incremental)
+        print(f"{'sketch: load, add month, save, transform':<50} {seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
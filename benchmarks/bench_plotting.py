@@ -0,0 +1,115 @@
+"""
+Benchmark: figures drawn from the rows vs from plot_summaries aggregates,
+rendered off-screen (Agg, PNG into memory).
+
+- plot_group_comparison by province and top-15 postal codes
+  (DataFrame.boxplot(by=) + two groupbys vs one box_stats pass)
+- visualize_ab (sns.boxplot on every positive claim vs box_stats)
+- totalpremium vs totalclaims (scatter of every row vs hexbin_density)
+- redrawing each figure from the cached summaries (style change)
+
+    python benchmarks/bench_plotting.py [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import io
+import sys
+import warnings
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_analytics import best_time, clean_artifact  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.Hypothesis_helper import plot_group_comparison  # noqa: E402
+from src.plot_summaries import DEFAULT_CACHE, hexbin_density  # noqa: E402
+from src.visualization import visualize_ab  # noqa: E402
+
+COLUMNS = ["province", "postalcode", "totalpremium", "totalclaims", "has_claim"]
+
+
+def rendered(fn):
+    """Runs a plotting call and renders every figure it opened."""
+    def run():
+        fn()
+        for num in plt.get_fignums():
+            plt.figure(num).savefig(io.BytesIO(), format="png", dpi=60)
+        plt.close("all")
+    return run
+
+
+# Previous implementations, drawing from the rows
+def rows_group_comparison(data, group_col, metric_col, top_n=None):
+    if top_n:
+        top_groups = data.groupby(group_col)[metric_col].mean().sort_values(ascending=False).head(top_n).index
+        data = data[data[group_col].isin(top_groups)]
+    fig, axes = plt.subplots(1, 2, figsize=(12, 6))
+    data.boxplot(column=metric_col, by=group_col, ax=axes[0])
+    data.groupby(group_col)[metric_col].mean().sort_values(ascending=False).plot(kind="bar", ax=axes[1])
+
+
+def rows_visualize_ab(df):
+    fig, ax = plt.subplots(1, 3, figsize=(16, 5))
+    df.groupby("ab_group")["has_claim"].mean().plot.bar(ax=ax[0])
+    sns.boxplot(data=df[df["totalclaims"] > 0], x="ab_group", y="totalclaims", ax=ax[1])
+    df["ab_group"].value_counts().plot.bar(ax=ax[2])
+
+
+def rows_scatter(df):
+    plt.figure()
+    sns.scatterplot(data=df, x="totalpremium", y="totalclaims", alpha=0.4)
+
+
+def summary_scatter(df):
+    plt.figure()
+    hexbin_density(df, "totalpremium", "totalclaims", gridsize=80).plot(bins="log")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = load_data(clean_artifact(args.rows, args.seed), usecols=COLUMNS)
+    df["margin"] = df["totalpremium"] - df["totalclaims"]
+    df["ab_group"] = np.where(np.random.default_rng(args.seed).random(len(df)) < 0.5, "A", "B")
+    warnings.filterwarnings("ignore", category=UserWarning)  # plt.show() under Agg
+    warnings.filterwarnings("ignore", category=FutureWarning)  # groupby observed= in the row versions
+
+    figures = [
+        ("plot_group_comparison(province)",
+         lambda: rows_group_comparison(df, "province", "totalclaims"),
+         lambda: plot_group_comparison(df, "province", "totalclaims", "Claims", "R")),
+        ("plot_group_comparison(postalcode, top 15)",
+         lambda: rows_group_comparison(df, "postalcode", "margin", top_n=15),
+         lambda: plot_group_comparison(df, "postalcode", "margin", "Margin", "R", top_n=15)),
+        ("visualize_ab",
+         lambda: rows_visualize_ab(df),
+         lambda: visualize_ab(df, "A/B")),
+        ("premium vs claims",
+         lambda: rows_scatter(df),
+         lambda: summary_scatter(df)),
+    ]
+    print(f"{len(df):,} rows")
+    print(f"{'figure':<42} {'rows':>8} {'summary':>8} {'redraw':>8}")
+    for name, from_rows, from_summary in figures:
+        rows_s = best_time(rendered(from_rows), args.repeat)
+        DEFAULT_CACHE.clear()
+        summary_s = best_time(rendered(from_summary), 1)
+        redraw_s = best_time(rendered(from_summary), args.repeat)
+        print(f"{name:<42} {rows_s:>8.3f} {summary_s:>8.3f} {redraw_s:>8.3f}")
+    print("(seconds; redraw = same figure again, summaries from the cache)")
+
+
+if __name__ == "__main__":
+    main()
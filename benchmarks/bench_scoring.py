@@ -0,0 +1,127 @@
+"""
+Benchmark: risk premium scoring throughput with scoring.PricingModel.
+
+Fits the Task 4 preprocessing with a logistic claim-probability model and a
+linear severity model on a sample of the synthetic cleaned artifact, then
+scores every policy:
+- in memory, per micro-batch (model cost only)
+- end to end from a CSV file and from the Parquet artifact (read + score + write)
+- over HTTP, one POST /score per micro-batch of JSON records
+
+    python benchmarks/bench_scoring.py [--rows 1000000] [--batch-size 65536]
+"""
+import argparse
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_analytics import clean_artifact  # noqa: E402
+from src.credibility import CredibilityEncoder  # noqa: E402
+from src.data_loader import load_data  # noqa: E402
+from src.feature_matrix import SparseFeatureBuilder  # noqa: E402
+from src.features import engineer_features  # noqa: E402
+from src.scoring import PricingModel, ScoringStats, read_batches, score_stream, serve  # noqa: E402
+
+NUMERIC = ["suminsured", "calculatedpremiumperterm", "cubiccapacity", "kilowatts",
+           "registrationyear", "vehicle_age", "power_ratio", "premium_to_sum_ratio"]
+CATEGORICAL = ["province", "gender", "vehicletype", "make", "covertype", "has_alarm",
+               "has_tracking", "postalcode", "model"]
+RISK = ["province", "postalcode"]
+# Raw columns a scoring request carries
+RECORD = ["policyid", "suminsured", "calculatedpremiumperterm", "cubiccapacity", "kilowatts",
+          "registrationyear", "totalpremium", "alarmimmobiliser", "trackingdevice",
+          "province", "gender", "vehicletype", "make", "covertype", "postalcode", "model"]
+
+
+def preprocessor():
+    return ColumnTransformer([
+        ("features", SparseFeatureBuilder(NUMERIC, CATEGORICAL, min_frequency=20), NUMERIC + CATEGORICAL),
+        ("risk", CredibilityEncoder(hierarchy=RISK), RISK),
+    ])
+
+
+def fit_pricing(df, train_rows: int) -> PricingModel:
+    train = engineer_features(df.sample(min(train_rows, len(df)), random_state=0))
+    X = train[list(dict.fromkeys(NUMERIC + CATEGORICAL + RISK))]
+    freq_pre = preprocessor()
+    freq = LogisticRegression(max_iter=200).fit(freq_pre.fit_transform(X, train["has_claim"]), train["has_claim"])
+    claims = train["totalclaims"] > 0
+    sev_pre = preprocessor()
+    sev = LinearRegression().fit(sev_pre.fit_transform(X[claims], train.loc[claims, "totalclaims"]),
+                                 train.loc[claims, "totalclaims"])
+    return PricingModel(freq_pre, freq, sev_pre, sev, X.dtypes)
+
+
+def report(name: str, rows: int, seconds: float):
+    print(f"{name:<36} {rows:>10,} {seconds:>8.2f} {rows / seconds:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--train-rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=65_536)
+    parser.add_argument("--http-rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = clean_artifact(args.rows, args.seed)
+    df = load_data(path)
+    model = fit_pricing(df, args.train_rows)
+    records = df[RECORD]
+
+    print(f"{'mode':<36} {'policies':>10} {'seconds':>8} {'policies/s':>12}")
+
+    stats = ScoringStats()
+    for start in range(0, len(records), args.batch_size):
+        batch = records.iloc[start: start + args.batch_size]
+        t = time.perf_counter()
+        model.score(batch)
+        stats.add(len(batch), time.perf_counter() - t)
+    report("in memory (score only)", stats.rows, stats.seconds)
+    print(f"  batch latency p50 {stats.to_dict()['latency_ms_p50']} ms, p95 {stats.to_dict()['latency_ms_p95']} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "policies.csv"
+        records.to_csv(csv_path, index=False)
+        for name, source in (("CSV file → CSV", str(csv_path)), ("Parquet artifact → CSV", str(path))):
+            out = io.BytesIO()
+            t = time.perf_counter()
+            stats = score_stream(model, read_batches(source, batch_size=args.batch_size), out,
+                                 keep=["policyid"], verbose=False)
+            report(f"end to end, {name}", stats.rows, time.perf_counter() - t)
+
+    server = serve(model, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/score"
+    sample = records.iloc[: args.http_rows].astype(object).where(records.iloc[: args.http_rows].notna(), None)
+    bodies = [json.dumps(sample.iloc[i: i + args.batch_size].to_dict("records"), default=str).encode()
+              for i in range(0, len(sample), args.batch_size)]
+    t = time.perf_counter()
+    premiums = []
+    for body in bodies:
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            premiums += json.loads(response.read())["risk_premium"]
+    report("HTTP JSON (request to response)", len(premiums), time.perf_counter() - t)
+    server.shutdown()
+
+    direct = model.score(records.iloc[: args.http_rows])["risk_premium"].to_numpy()
+    assert np.allclose(premiums, direct), "HTTP scores differ from in-process scores"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark suite for the analysis pipeline on synthetic data.
+
+Times and records peak traced memory (tracemalloc) for load_data,
+clean_data, preprocess_for_analysis, create_ab_groups and the
+statistical_tests functions at each scale. Each stage gets the output of
+the previous one; copies and setup are excluded from the measurement.
+Every scale runs in a fresh subprocess.
+
+Synthetic inputs are generated once (benchmarks/synthetic.py) and cached
+under benchmarks/.data/.
+
+    python benchmarks/run_benchmarks.py --scales 1m                 # run + compare
+    python benchmarks/run_benchmarks.py --scales 1m 10m --save      # store as baseline
+    python benchmarks/run_benchmarks.py --scales 1m --only clean_data preprocess_for_analysis
+
+Exits with status 1 when any benchmark is slower or uses more memory than
+the stored baseline by more than --tolerance.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+DATA_CACHE = BENCH_DIR / ".data"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+
+SCALES = {
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "50m": 50_000_000,
+}
+
+BENCHMARKS = [
+    "load_data",
+    "load_raw",
+    "clean_data",
+    "preprocess_for_analysis",
+    "create_ab_groups",
+    "claim_frequency_test",
+    "claim_severity_test",
+    "margin_test",
+]
+
+# Differences below these are treated as noise, whatever the tolerance
+MIN_SECONDS_DELTA = 0.05
+MIN_MB_DELTA = 1.0
+
+
+# ===============================
+# 1. WORKER (one scale, one process)
+# ===============================
+
+def _measure(fn, repeat):
+    """Best wall time over `repeat` runs, then one traced run for peak memory."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": min(times), "peak_mb": peak / 2 ** 20}
+
+
+def run_scale(path, repeat, only=None):
+    sys.path.insert(0, str(ROOT_DIR))
+    from src.cleaning import clean_data
+    from src.data_loader import load_data, load_raw
+    from src.preprocessing import preprocess_for_analysis
+    from src.segmentation import create_ab_groups
+    from src.statistical_tests import claim_frequency_test, claim_severity_test, margin_test
+
+    wanted = set(only or BENCHMARKS)
+    results = {}
+
+    def bench(name, fn):
+        # Stages not selected still run once, untimed, to feed the next one
+        if name not in wanted:
+            return fn()
+        result, results[name] = _measure(fn, repeat)
+        print(f"  {name:<26} {results[name]['seconds']:>9.3f} s {results[name]['peak_mb']:>10.1f} MB",
+              file=sys.stderr, flush=True)
+        return result
+
+    if "load_data" in wanted:
+        bench("load_data", lambda: load_data(path, sep="|"))
+    raw = bench("load_raw", lambda: load_raw(path))
+    clean = bench("clean_data", lambda: clean_data(raw.copy()))
+    del raw
+    pre = bench("preprocess_for_analysis", lambda: preprocess_for_analysis(clean.copy()))
+    del clean
+    ab = bench("create_ab_groups", lambda: create_ab_groups(pre, "province", "Gauteng", "Western Cape"))
+    bench("claim_frequency_test", lambda: claim_frequency_test(ab))
+    bench("claim_severity_test", lambda: claim_severity_test(ab))
+    bench("margin_test", lambda: margin_test(ab))
+    return results
+
+
+# ===============================
+# 2. DRIVER
+# ===============================
+
+def synthetic_file(scale, seed=0):
+    path = DATA_CACHE / f"synthetic_{scale}_seed{seed}.txt"
+    if not path.exists():
+        sys.path.insert(0, str(BENCH_DIR))
+        from synthetic import write_synthetic
+
+        print(f"Generating {SCALES[scale]:,} rows → {path}", file=sys.stderr)
+        write_synthetic(path, SCALES[scale], seed)
+    return path
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (scale, name, metric, base, now, ratio, flagged)."""
+    rows = []
+    for scale, benches in results.items():
+        for name, now in benches.items():
+            base = baseline.get(scale, {}).get(name)
+            if base is None:
+                continue
+            for metric, floor in (("seconds", MIN_SECONDS_DELTA), ("peak_mb", MIN_MB_DELTA)):
+                ratio = now[metric] / base[metric] if base[metric] else float("inf")
+                flagged = ratio > 1 + tolerance and now[metric] - base[metric] > floor
+                rows.append((scale, name, metric, base[metric], now[metric], ratio, flagged))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["1m"], choices=list(SCALES))
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scale(args.worker, args.repeat, args.only)))
+        return
+
+    results = {}
+    for scale in args.scales:
+        path = synthetic_file(scale, args.seed)
+        print(f"[{scale}] {SCALES[scale]:,} rows", file=sys.stderr)
+        cmd = [sys.executable, __file__, "--worker", str(path), "--repeat", str(args.repeat)]
+        if args.only:
+            cmd += ["--only", *args.only]
+        out = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, check=True)
+        results[scale] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    rows = compare(results, baseline, args.tolerance)
+    if rows:
+        print(f"\n{'scale':<6} {'benchmark':<26} {'metric':<8} {'baseline':>10} {'now':>10} {'ratio':>7}")
+        for scale, name, metric, base, now, ratio, flagged in rows:
+            flag = "  REGRESSION" if flagged else ""
+            print(f"{scale:<6} {name:<26} {metric:<8} {base:>10.3f} {now:>10.3f} {ratio:>7.2f}{flag}")
+
+    if args.save:
+        for scale, benches in results.items():
+            baseline.setdefault(scale, {}).update(benches)
+        baseline["_meta"] = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "saved": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"\nBaseline saved to {args.baseline}")
+
+    regressions = [r for r in rows if r[-1]]
+    if regressions and not args.save:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
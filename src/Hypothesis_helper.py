@@ -1,7 +1,12 @@
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-from scipy.stats import chi2_contingency, ttest_ind, mannwhitneyu, ks_2samp
+from .equivalence import balance_table
+from .instrumentation import instrumented
+from .plot_summaries import box_stats
+from .statistical_tests import grouped_moments
 
+# Single-group metrics; segment_metrics.SegmentMetrics computes all of them
+# for every group of a segmentation in one pass
 def calculate_claim_frequency(group_data):
     """Calculate proportion of policies with at least one claim"""
     return (group_data['has_claim'].sum() / len(group_data)) * 100
@@ -39,28 +44,66 @@ def print_test_result(hypothesis_num, null_hypothesis, test_name, statistic,
         print(f"\nEffect Details:")
         print(effect_details)
     print("="*80)
+def render_result(record, alpha=0.05):
+    """Print a hypothesis_runner result record via print_test_result"""
+    means = pd.Series(record['group_mean'], index=record['groups_tested'])
+    details = []
+    if pd.notna(record.get('dof')):
+        details.append(f"Degrees of Freedom: {int(record['dof'])}")
+    details.append(f"Groups tested: {len(means)}")
+    if record.get('effect_name'):
+        details.append(f"Effect size ({record['effect_name']}): {record['effect_size']:.4f}")
+    if len(means):
+        details.append(f"Highest mean {record['metric']}: {means.idxmax()} ({means.max():,.4f})")
+        details.append(f"Lowest mean {record['metric']}: {means.idxmin()} ({means.min():,.4f})")
+    if record.get('cached'):
+        details.append("(loaded from cache)")
+
+    print_test_result(
+        hypothesis_num=record['id'],
+        null_hypothesis=record['null_hypothesis'],
+        test_name=record['test_name'],
+        statistic=record['statistic'],
+        p_value=record['p_value'],
+        alpha=alpha,
+        effect_details="\n   ".join(details),
+    )
+
+def render_results(results, alpha=0.05):
+    """Render every record of a run_hypotheses result table, then a summary"""
+    for record in results.to_dict('records'):
+        render_result(record, alpha)
+
+    summary = results[['id', 'null_hypothesis', 'test_name', 'p_value']].copy()
+    summary['Decision'] = ['REJECT' if p < alpha else 'FAIL TO REJECT' for p in summary['p_value']]
+    print("\n" + "="*80)
+    print("SUMMARY: HYPOTHESIS TESTING RESULTS")
+    print("="*80)
+    print(summary.to_string(index=False))
+    print("="*80)
+    return summary
+
 def plot_group_comparison(data, group_col, metric_col, title, ylabel, 
                           top_n=None, figsize=(12, 6)):
-    """Create visualization for group comparisons"""
+    """Create visualization for group comparisons (drawn from one box_stats pass)"""
+    import matplotlib.pyplot as plt
+
+    box = box_stats(data, metric_col, by=group_col)
+    means = box.table['mean'].sort_values(ascending=False)
     if top_n:
-        top_groups = data.groupby(group_col)[metric_col].mean().sort_values(ascending=False).head(top_n).index
-        plot_data = data[data[group_col].isin(top_groups)]
-    else:
-        plot_data = data
+        means = means.head(top_n)
     
     fig, axes = plt.subplots(1, 2, figsize=figsize)
     
     # Box plot
-    plot_data.boxplot(column=metric_col, by=group_col, ax=axes[0])
+    box.plot(ax=axes[0], order=box.table.index[box.table.index.isin(means.index)])
     axes[0].set_title(f'{title} - Distribution')
     axes[0].set_xlabel(group_col.capitalize())
     axes[0].set_ylabel(ylabel)
-    axes[0].tick_params(axis='x', rotation=45)
     plt.sca(axes[0])
     plt.xticks(rotation=45, ha='right')
     
     # Bar plot of means
-    means = plot_data.groupby(group_col)[metric_col].mean().sort_values(ascending=False)
     means.plot(kind='bar', ax=axes[1], color='steelblue')
     axes[1].set_title(f'{title} - Mean by Group')
     axes[1].set_xlabel(group_col.capitalize())
@@ -77,61 +120,29 @@ def check_group_equivalence(group_a, group_b, features_to_check, alpha=0.05):
     print("\n" + "-"*80)
     print("CHECKING GROUP EQUIVALENCE (Controlling for Confounders)")
     print("-"*80)
-    
-    equivalence_results = []
-    
-    for feature in features_to_check:
-        if feature not in group_a.columns or feature not in group_b.columns:
-            continue
-            
-        # Skip if feature has too many missing values
-        if group_a[feature].isna().sum() > len(group_a) * 0.5:
-            continue
-            
-        # For numerical features
-        if group_a[feature].dtype in ['float64', 'int64']:
-            # Use t-test for numerical variables
-            a_vals = group_a[feature].dropna()
-            b_vals = group_b[feature].dropna()
-            
-            if len(a_vals) > 0 and len(b_vals) > 0:
-                stat, p_val = ttest_ind(a_vals, b_vals, equal_var=False)
-                is_equivalent = "✓ EQUIVALENT" if p_val >= alpha else "✗ DIFFERENT"
-                equivalence_results.append({
-                    'Feature': feature,
-                    'Test': 'T-Test',
-                    'P-Value': p_val,
-                    'Status': is_equivalent,
-                    'Group_A_Mean': a_vals.mean(),
-                    'Group_B_Mean': b_vals.mean()
-                })
-        
-        # For categorical features
-        elif group_a[feature].dtype in ['object', 'category', 'bool']:
-            try:
-                contingency = pd.crosstab(
-                    pd.concat([group_a[feature], group_b[feature]]),
-                    pd.Series(['A']*len(group_a) + ['B']*len(group_b))
-                )
-                if contingency.size > 1:
-                    chi2, p_val, dof, expected = chi2_contingency(contingency)
-                    is_equivalent = "✓ EQUIVALENT" if p_val >= alpha else "✗ DIFFERENT"
-                    equivalence_results.append({
-                        'Feature': feature,
-                        'Test': 'Chi-Squared',
-                        'P-Value': p_val,
-                        'Status': is_equivalent,
-                        'Group_A_Mean': '-',
-                        'Group_B_Mean': '-'
-                    })
-            except:
-                pass
-    
-    results_df = pd.DataFrame(equivalence_results)
-    
+
+    columns = [f for f in features_to_check if f in group_a.columns and f in group_b.columns]
+    combined = pd.concat([group_a[columns], group_b[columns]], ignore_index=True)
+    combined['_ab_group'] = np.repeat(['A', 'B'], [len(group_a), len(group_b)])
+
+    balance = balance_table(combined, '_ab_group', features_to_check, groups=('A', 'B'),
+                            alpha=alpha, max_missing=0.5)
+    tested = balance[balance['type'] != 'skipped']
+    skipped = balance[balance['type'] == 'skipped']
+
+    results_df = pd.DataFrame({
+        'Feature': tested['feature'],
+        'Test': tested['test'],
+        'P-Value': tested['p_value'],
+        'SMD': tested['smd'],
+        'Status': tested['status'],
+        'Group_A_Mean': tested['mean_a'].where(tested['type'] == 'numeric', '-'),
+        'Group_B_Mean': tested['mean_b'].where(tested['type'] == 'numeric', '-'),
+    }).reset_index(drop=True)
+
     if len(results_df) > 0:
         print(results_df.to_string(index=False))
-        
+
         # Count how many features are NOT equivalent
         non_equivalent = results_df[results_df['Status'].str.contains('DIFFERENT')]
         if len(non_equivalent) > 0:
@@ -142,14 +153,22 @@ def check_group_equivalence(group_a, group_b, features_to_check, alpha=0.05):
             print("\n✓ Groups are statistically equivalent on checked features")
     else:
         print("No features available for equivalence checking")
-    
+
+    if len(skipped) > 0:
+        print(f"\nSkipped {len(skipped)} feature(s):")
+        print(skipped[['feature', 'reason']].to_string(index=False, header=False))
+
     print("-"*80)
+    results_df.attrs['skipped'] = dict(zip(skipped['feature'], skipped['reason']))
     return results_df
 
+@instrumented
 def perform_ab_test(group_a, group_b, metric, test_type='ttest', group_a_name='Group A', group_b_name='Group B'):
     """
     Perform A/B test comparing a specific metric between two groups
     """
+    from scipy.stats import chi2_contingency, mannwhitneyu, ttest_ind
+
     a_vals = group_a[metric].dropna()
     b_vals = group_b[metric].dropna()
     
@@ -163,8 +182,9 @@ def perform_ab_test(group_a, group_b, metric, test_type='ttest', group_a_name='G
         test_name = "Mann-Whitney U Test"
     elif test_type == 'chi2':
         # Chi-squared test for binary/categorical
+        # ignore_index so the metric lines up with the A/B labels row by row
         contingency = pd.crosstab(
-            pd.concat([group_a[metric], group_b[metric]]),
+            pd.concat([group_a[metric], group_b[metric]], ignore_index=True),
             pd.Series(['A']*len(group_a) + ['B']*len(group_b))
         )
         stat, p_val, dof, expected = chi2_contingency(contingency)
@@ -220,4 +240,156 @@ def print_ab_test_result(hypothesis_num, null_hypothesis, result, alpha=0.05):
         print(f"\n✓ FAIL TO REJECT NULL HYPOTHESIS (p >= {alpha})")
         print("   → No significant differences detected")
     
-    print("="*80)
\ No newline at end of file
+    print("="*80)
+
+
+def group_sufficient_stats(df, group_col, metric):
+    """
+    Per-group count, sum and sum of squares of `metric` in one pass.
+
+    Squares are taken around the overall mean to keep variances accurate
+    for large values such as totalclaims. NaN metrics and groups are ignored.
+    """
+    codes, levels = pd.factorize(df[group_col], sort=True)
+    values = pd.to_numeric(df[metric], errors='coerce').to_numpy(dtype=float)
+    valid = (codes >= 0) & ~np.isnan(values)
+    n, mean, var = grouped_moments(codes[valid], values[valid], len(levels))
+
+    return pd.DataFrame({
+        'n': n.astype(int),
+        'sum': np.where(n > 0, mean * n, 0.0),
+        'mean': mean,
+        'var': var,
+    }, index=pd.Index(levels, name=group_col))
+
+
+def adjust_pvalues(p_values, method='holm'):
+    """Holm (FWER) or Benjamini-Hochberg ('bh', FDR) adjusted p-values."""
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p.shape, np.nan)
+    ok = ~np.isnan(p)
+    m = ok.sum()
+    if m == 0:
+        return adjusted
+
+    order = np.argsort(p[ok])
+    ranked = p[ok][order]
+
+    if method == 'holm':
+        ranked = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    elif method in ('bh', 'fdr_bh'):
+        ranked = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown correction method: {method}")
+
+    out = np.empty(m)
+    out[order] = np.minimum(ranked, 1.0)
+    adjusted[ok] = out
+    return adjusted
+
+
+@instrumented
+def batch_ab_tests(df, group_col, metric, pairs=None, test_type='ttest',
+                   correction='holm', alpha=0.05, min_n=2):
+    """
+    A/B test every pair of levels of `group_col` on `metric` at once.
+
+    - test_type='ttest': Welch's t-test from per-group moments
+    - test_type='chi2': 2x2 chi-squared (Yates-corrected, as chi2_contingency)
+      for a binary metric such as has_claim
+    - pairs: list of (A, B) levels; default is all level combinations
+    - correction: 'holm', 'bh' or None, applied across all returned pairs
+
+    Returns one row per pair with the same fields as perform_ab_test plus
+    cohens_d / cramers_v, the adjusted p-value and the decision.
+    """
+    from scipy.stats import chi2 as chi2_dist, t as t_dist
+
+    stats = group_sufficient_stats(df, group_col, metric)
+    stats = stats[stats['n'] >= min_n]
+
+    if test_type == 'chi2':
+        values = pd.to_numeric(df[metric], errors='coerce').dropna().unique()
+        if not np.isin(values, [0, 1]).all():
+            raise ValueError(f"chi2 batch test needs a binary metric, got {metric!r}")
+
+    position = {level: i for i, level in enumerate(stats.index)}
+    if pairs is None:
+        ia, ib = np.triu_indices(len(stats), k=1)
+    else:
+        pairs = [(a, b) for a, b in pairs if a in position and b in position]
+        ia = np.array([position[a] for a, _ in pairs], dtype=int)
+        ib = np.array([position[b] for _, b in pairs], dtype=int)
+
+    n = stats['n'].to_numpy(dtype=float)
+    mean = stats['mean'].to_numpy()
+    var = stats['var'].to_numpy()
+    na, nb, ma, mb = n[ia], n[ib], mean[ia], mean[ib]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if test_type == 'ttest':
+            va, vb = var[ia] / na, var[ib] / nb
+            statistic = (ma - mb) / np.sqrt(va + vb)
+            dof = (va + vb) ** 2 / (va ** 2 / (na - 1) + vb ** 2 / (nb - 1))
+            p_value = 2 * t_dist.sf(np.abs(statistic), dof)
+            pooled = np.sqrt((var[ia] + var[ib]) / 2)
+            effect = {'cohens_d': np.where(pooled > 0, (ma - mb) / pooled, 0.0)}
+            test_name = "Welch's T-Test"
+        elif test_type == 'chi2':
+            statistic, raw_chi2, total = _batch_chi2_2x2(ma * na, na, mb * nb, nb)
+            p_value = chi2_dist.sf(statistic, 1)
+            effect = {'cramers_v': np.sqrt(raw_chi2 / total)}
+            test_name = "Chi-Squared Test"
+        else:
+            raise ValueError(f"Unsupported batch test type: {test_type}")
+
+        diff = mb - ma
+        relative = np.where(ma != 0, diff / ma * 100, 0.0)
+
+    levels = stats.index.to_numpy()
+    results = pd.DataFrame({
+        'group_a_name': levels[ia],
+        'group_b_name': levels[ib],
+        'group_a_n': na.astype(int),
+        'group_b_n': nb.astype(int),
+        'group_a_mean': ma,
+        'group_b_mean': mb,
+        'effect_size': diff,
+        'relative_diff_pct': relative,
+        'statistic': statistic,
+        'p_value': p_value,
+        **effect,
+    })
+    results.insert(0, 'test_name', test_name)
+
+    if correction:
+        results['p_adjusted'] = adjust_pvalues(results['p_value'], correction)
+    else:
+        results['p_adjusted'] = results['p_value']
+    results['reject'] = results['p_adjusted'] < alpha
+    return results
+
+
+def _batch_chi2_2x2(claims_a, n_a, claims_b, n_b):
+    """Yates-corrected and raw chi-squared for many 2x2 tables at once."""
+    observed = np.stack([
+        [claims_a, n_a - claims_a],
+        [claims_b, n_b - claims_b],
+    ])  # shape (2, 2, pairs)
+    total = n_a + n_b
+    rows = observed.sum(axis=1, keepdims=True)
+    cols = observed.sum(axis=0, keepdims=True)
+    expected = rows * cols / total
+
+    # A table with an empty row/column carries no information: chi2 = 0
+    degenerate = (expected == 0).any(axis=(0, 1))
+    expected = np.where(expected == 0, 1.0, expected)
+
+    raw = ((observed - expected) ** 2 / expected).sum(axis=(0, 1))
+    diff = expected - observed
+    corrected = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    yates = ((corrected - expected) ** 2 / expected).sum(axis=(0, 1))
+
+    raw[degenerate] = 0.0
+    yates[degenerate] = 0.0
+    return yates, raw, total
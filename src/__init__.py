@@ -0,0 +1,55 @@
+"""
+ACIS insurance analytics: loading, cleaning, hypothesis testing, modeling
+and scoring of the policy data.
+
+Submodules are imported on first attribute access (`src.cleaning`,
+`from src.multigroup import KGroupTests`), and scipy / matplotlib / sklearn
+only inside the functions that use them, so `import src` and the data and
+stats paths stay cheap. Pipeline stages are installed as console scripts
+(see pyproject.toml): acis-clean, acis-score, acis-monitor.
+"""
+import importlib
+
+__all__ = [
+    "Hypothesis_helper",
+    "analytics",
+    "cleaning",
+    "credibility",
+    "data_loader",
+    "dedup",
+    "dtype_planner",
+    "effects",
+    "equivalence",
+    "feature_matrix",
+    "features",
+    "hypothesis_runner",
+    "instrumentation",
+    "modeling",
+    "monitoring",
+    "multigroup",
+    "outliers",
+    "paths",
+    "plot_summaries",
+    "preprocessing",
+    "resampling",
+    "run_cleaning",
+    "scoring",
+    "segment_metrics",
+    "segmentation",
+    "sketches",
+    "stage_cache",
+    "statistical_tests",
+    "stats_cube",
+    "stream_cleaning",
+    "visualization",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,267 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .data_loader import DATA_DIR, load_data
+
+# Query engines; "arrow" needs only pyarrow, which Parquet support already
+# requires, and "pandas" goes through load_data. duckdb and polars are
+# opt-in (engine="duckdb" / "polars") when installed.
+ENGINES = ["duckdb", "polars", "arrow", "pandas"]
+
+# engine="auto": the engine the test suite checks against pandas everywhere
+DEFAULT_ENGINE = "arrow"
+
+CLEAN_FILE = "clean_data.parquet"
+
+MONTH = "transactionmonth"
+
+
+def available_engines() -> list:
+    """ENGINES that can be used in this environment."""
+    return [
+        engine for engine in ENGINES
+        if engine in ("arrow", "pandas") or importlib.util.find_spec(engine) is not None
+    ]
+
+
+# ===============================
+# 1. FILTERS
+# ===============================
+# Filters use load_data's format: [(column, op, value), ...], all ANDed,
+# with op in ==, !=, <, <=, >, >=, in, not in.
+
+def _sql_where(filters: list) -> tuple:
+    clauses, params = [], []
+    for col, op, value in filters:
+        if op in ("in", "not in"):
+            values = list(value)
+            placeholders = ", ".join("?" * len(values))
+            clauses.append(f'"{col}" {op.upper()} ({placeholders})')
+            params.extend(values)
+        else:
+            clauses.append(f'"{col}" {op} ?')
+            params.append(value)
+    return " AND ".join(clauses), params
+
+
+def _polars_expr(filters: list):
+    import polars as pl
+
+    ops = {
+        "==": lambda c, v: c == v,
+        "!=": lambda c, v: c != v,
+        "<": lambda c, v: c < v,
+        "<=": lambda c, v: c <= v,
+        ">": lambda c, v: c > v,
+        ">=": lambda c, v: c >= v,
+        "in": lambda c, v: c.is_in(list(v)),
+        "not in": lambda c, v: ~c.is_in(list(v)),
+    }
+    expr = None
+    for col, op, value in filters:
+        term = ops[op](pl.col(col), value)
+        expr = term if expr is None else expr & term
+    return expr
+
+
+# ===============================
+# 2. ANALYTICS
+# ===============================
+
+class Analytics:
+    """
+    Standard ACIS aggregates over the cleaned Parquet artifact.
+
+    Every aggregate is one grouped scan planned by the engine: only the
+    group keys and measure columns are read (projection pushdown), and
+    `filters` skip province partitions and row groups before rows are
+    materialised (predicate pushdown). duckdb, polars and arrow execute the
+    scan multi-threaded; engine="auto" uses arrow (DEFAULT_ENGINE), the
+    others are opt-in. Results are small pandas frames indexed by the group
+    keys, identical across engines.
+    """
+
+    def __init__(self, filename: str = CLEAN_FILE, engine: str = "auto"):
+        self.filename = filename
+        self.path = DATA_DIR / filename
+        if not self.path.exists():
+            raise FileNotFoundError(f"Data file not found: {self.path}")
+        if engine == "auto":
+            engine = DEFAULT_ENGINE
+        if engine not in available_engines():
+            raise ValueError(f"Engine {engine!r} is not available; use one of {available_engines()}")
+        self.engine = engine
+
+    # ---------- engine primitives ----------
+
+    def _glob(self) -> str:
+        return str(self.path / "**" / "*.parquet") if self.path.is_dir() else str(self.path)
+
+    def _dataset(self) -> ds.Dataset:
+        return ds.dataset(self.path, format="parquet", partitioning="hive")
+
+    def schema(self):
+        return self._dataset().schema
+
+    def _grouped(self, by: list, columns: list, filters: list | None = None) -> pd.DataFrame:
+        """
+        Per group of `by`: n (rows), claim_count (rows with totalclaims > 0)
+        and, for each column, <col>_sum and <col>_count (non-null values).
+        """
+        filters = filters or []
+        if self.engine == "duckdb":
+            import duckdb
+
+            keys = ", ".join(f'"{col}"' for col in by)
+            measures = ", ".join(
+                f'sum("{col}") AS "{col}_sum", count("{col}") AS "{col}_count"' for col in columns
+            )
+            where, params = _sql_where(filters)
+            sql = (
+                f"SELECT {keys}, count(*) AS n, "
+                f'sum(CAST("totalclaims" > 0 AS BIGINT)) AS claim_count, {measures} '
+                f"FROM read_parquet('{self._glob()}', hive_partitioning = true) "
+                f"{'WHERE ' + where if where else ''} GROUP BY {keys}"
+            )
+            with duckdb.connect() as con:
+                out = con.execute(sql, params).df()
+
+        elif self.engine == "polars":
+            import polars as pl
+
+            lazy = pl.scan_parquet(self._glob(), hive_partitioning=True)
+            if filters:
+                lazy = lazy.filter(_polars_expr(filters))
+            aggs = [pl.len().alias("n"), (pl.col("totalclaims") > 0).sum().alias("claim_count")]
+            for col in columns:
+                aggs += [pl.col(col).sum().alias(f"{col}_sum"), pl.col(col).count().alias(f"{col}_count")]
+            out = lazy.group_by(by).agg(aggs).collect().to_pandas()
+
+        elif self.engine == "arrow":
+            projection = {col: ds.field(col) for col in dict.fromkeys(by + columns)}
+            projection["has_claim"] = (ds.field("totalclaims") > 0).cast("int64")
+            table = self._dataset().to_table(
+                columns=projection,
+                filter=pq.filters_to_expression(filters) if filters else None,
+            )
+            aggs = [([], "count_all"), ("has_claim", "sum")]
+            aggs += [(col, fn) for col in columns for fn in ("sum", "count")]
+            out = table.group_by(by).aggregate(aggs).to_pandas()
+            out = out.rename(columns={"count_all": "n", "has_claim_sum": "claim_count"})
+
+        else:
+            df = load_data(
+                self.filename,
+                usecols=list(dict.fromkeys(by + columns + ["totalclaims"])),
+                filters=filters or None,
+            )
+            df["claim_count"] = df["totalclaims"] > 0
+            agg = {"n": ("claim_count", "size"), "claim_count": ("claim_count", "sum")}
+            for col in columns:
+                agg[f"{col}_sum"] = (col, "sum")
+                agg[f"{col}_count"] = (col, "count")
+            out = df.groupby(by, observed=True).agg(**agg).reset_index()
+
+        # Same result whatever the engine: no missing keys, sorted, integer counts
+        out = out.dropna(subset=by).set_index(by).sort_index()
+        return out.astype({col: "int64" if col == "n" or col.endswith("count") else float for col in out.columns})
+
+    def scan(self, columns: list, filters: list | None = None) -> pd.DataFrame:
+        """Only `columns` of the rows matching `filters`, as a pandas frame."""
+        filters = filters or []
+        if self.engine == "duckdb":
+            import duckdb
+
+            cols = ", ".join(f'"{col}"' for col in columns)
+            where, params = _sql_where(filters)
+            sql = (
+                f"SELECT {cols} FROM read_parquet('{self._glob()}', hive_partitioning = true) "
+                f"{'WHERE ' + where if where else ''}"
+            )
+            with duckdb.connect() as con:
+                return con.execute(sql, params).df()
+        if self.engine == "polars":
+            import polars as pl
+
+            lazy = pl.scan_parquet(self._glob(), hive_partitioning=True)
+            if filters:
+                lazy = lazy.filter(_polars_expr(filters))
+            return lazy.select(columns).collect().to_pandas()
+        if self.engine == "arrow":
+            table = self._dataset().to_table(
+                columns=columns,
+                filter=pq.filters_to_expression(filters) if filters else None,
+            )
+            return table.to_pandas()
+        return load_data(self.filename, usecols=columns, filters=filters or None)
+
+    # ---------- standard aggregates ----------
+
+    def segment_summary(self, by, filters: list | None = None, extra: list | None = None) -> pd.DataFrame:
+        """
+        Premium, claims, margin and risk metrics per segment:
+        n, premium, claims, claim_count, margin, loss_ratio (claims /
+        premium), claim_frequency, claim_severity (claims per claim),
+        premium_mean, claims_mean, margin_mean, plus <col>_mean for `extra` columns.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        extra = list(extra or [])
+        agg = self._grouped(by, ["totalpremium", "totalclaims"] + extra, filters)
+
+        out = pd.DataFrame(index=agg.index)
+        out["n"] = agg["n"]
+        out["premium"] = agg["totalpremium_sum"]
+        out["claims"] = agg["totalclaims_sum"]
+        out["claim_count"] = agg["claim_count"]
+        out["margin"] = out["premium"] - out["claims"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["loss_ratio"] = out["claims"] / out["premium"]
+            out["claim_frequency"] = out["claim_count"] / out["n"]
+            out["claim_severity"] = out["claims"] / out["claim_count"]
+            out["premium_mean"] = out["premium"] / out["n"]
+            out["claims_mean"] = out["claims"] / out["n"]
+            out["margin_mean"] = out["margin"] / out["n"]
+            for col in extra:
+                out[f"{col}_mean"] = agg[f"{col}_sum"] / agg[f"{col}_count"]
+        return out
+
+    def loss_ratio(self, by, filters: list | None = None) -> pd.DataFrame:
+        """Loss ratio (total claims / total premium) by segment."""
+        return self.segment_summary(by, filters)[["n", "premium", "claims", "loss_ratio"]]
+
+    def frequency_severity(self, by, filters: list | None = None, monthly: bool = True) -> pd.DataFrame:
+        """Claim frequency and severity by segment (and transaction month)."""
+        by = [by] if isinstance(by, str) else list(by)
+        if monthly and MONTH not in by:
+            by = by + [MONTH]
+        summary = self.segment_summary(by, filters)
+        return summary[["n", "claim_count", "claim_frequency", "claim_severity"]]
+
+    def margin_by_postalcode(self, filters: list | None = None) -> pd.DataFrame:
+        """Total and mean margin (premium - claims) per postal code."""
+        summary = self.segment_summary("postalcode", filters)
+        return summary[["n", "premium", "claims", "margin", "margin_mean"]]
+
+    def monthly_trends(self, filters: list | None = None) -> pd.DataFrame:
+        """Total premium, claims and loss ratio per transaction month."""
+        return self.segment_summary(MONTH, filters)[["premium", "claims", "loss_ratio", "n"]]
+
+    def top_levels(self, by: str, metric: str = "premium_mean", top: int = 10,
+                   filters: list | None = None) -> pd.Series:
+        """`metric` for the `top` most frequent levels of `by`, e.g. premium by make."""
+        summary = self.segment_summary(by, filters)
+        return summary.nlargest(top, "n")[metric].sort_values(ascending=False)
+
+    def correlation(self, columns: list | None = None, filters: list | None = None) -> pd.DataFrame:
+        """Pearson correlation of numeric columns (default: all), reading only those columns."""
+        if columns is None:
+            columns = [
+                field.name for field in self.schema()
+                if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+            ]
+        return self.scan(columns, filters).corr()
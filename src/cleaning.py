@@ -1,39 +1,81 @@
+import time
+import tracemalloc
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from .outliers import Winsorizer
+from .instrumentation import instrumented
+
+# Columns coerced by convert_data_types
+NUMERIC_LIKE = [
+    "totalpremium",
+    "totalclaims",
+    "suminsured",
+    "cubiccapacity",
+    "kilowatts",
+    "customvalueestimate",
+]
+
+CATEGORICAL_LIKE = [
+    "province",
+    "gender",
+    "vehicletype",
+    "maritalstatus",
+    "country",
+    "postalcode",
+    "product",
+    "covertype",
+    "covercategory",
+]
+
+# Continuous measures capped by apply_outlier_treatment by default. Targets
+# (totalclaims, lossratio, has_claim), flags and ID / code columns (policyid,
+# mmcode, registrationyear, postalcode, ...) are never capped implicitly:
+# claims occur on ~0.3% of rows, so their upper quantile is 0.
+OUTLIER_COLUMNS = [
+    "totalpremium",
+    "calculatedpremiumperterm",
+    "suminsured",
+    "customvalueestimate",
+    "cubiccapacity",
+    "kilowatts",
+]
+
+# Columns with a larger missing fraction are dropped
+MISSING_DROP_THRESHOLD = 0.60
+
 # ===============================
 # 1. COLUMN CLEANING
 # ===============================
 
-def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Standardizes column names:
-    - Strips spaces
-    - Converts to lowercase
-    - Replaces spaces, hyphens, slashes with underscores
-    """
-    df.columns = (
-        df.columns
+def standardize_columns(columns: pd.Index) -> pd.Index:
+    """Lowercases and strips names; spaces, hyphens, slashes → underscores."""
+    return (
+        columns
         .str.strip()
         .str.lower()
         .str.replace(" ", "_")
         .str.replace("-", "_")
         .str.replace("/", "_")
     )
-    if "totalclaims" not in df.columns:
-        print(f"[] ❌ Column 'totalclaims' not found.")
-        return
 
-    # Ensure we have numeric dtype (NaN-safe)
-    s = pd.to_numeric(df["totalclaims"], errors="coerce")
 
-    non_zero = (s != 0).sum()
-    total    = s.notna().sum()          # ignore NaNs in denominator
-    pct      = (non_zero / total * 100) if total else 0.0
+def date_columns(columns) -> list:
+    """Columns parsed as datetimes by convert_data_types."""
+    return [col for col in columns if "month" in col or "date" in col]
 
-    print(f"[] Non-zero totalclaims: {non_zero:,} / {total:,}  ({pct:.2f}%)")
+
+@instrumented
+def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Standardizes column names:
+    - Strips spaces
+    - Converts to lowercase
+    - Replaces spaces, hyphens, slashes with underscores
+    """
+    df.columns = standardize_columns(df.columns)
     return df
 
 
@@ -41,6 +83,7 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
 # 2. DATA TYPE FIXING
 # ===============================
 
+@instrumented
 def convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
     """
     Converts:
@@ -50,53 +93,17 @@ def convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
     """
 
     # Identify date columns
-    date_cols = [col for col in df.columns if "month" in col or "date" in col]
-
-    for col in date_cols:
+    for col in date_columns(df.columns):
         df[col] = pd.to_datetime(df[col], errors="coerce")
 
     # Convert obvious numeric columns
-    numeric_like = [
-        "totalpremium",
-        "totalclaims",
-        "suminsured",
-        "cubiccapacity",
-        "kilowatts",
-        "customvalueestimate",
-    ]
-
-    for col in numeric_like:
-        if col in df.columns:
+    for col in NUMERIC_LIKE:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    
-    categorical_like = [
-        "province",
-        "gender",
-        "vehicletype",
-        "maritalstatus",
-        "country",
-        "postalcode",
-        "product",
-        "covertype",
-        "covercategory",
-    ]
-
-    for col in categorical_like:
-        if col in df.columns:
+    for col in CATEGORICAL_LIKE:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
             df[col] = df[col].astype("category")
-    if "totalclaims" not in df.columns:
-        print(f"[] ❌ Column 'totalclaims' not found.")
-        return
-
-    # Ensure we have numeric dtype (NaN-safe)
-    s = pd.to_numeric(df["totalclaims"], errors="coerce")
-
-    non_zero = (s != 0).sum()
-    total    = s.notna().sum()          # ignore NaNs in denominator
-    pct      = (non_zero / total * 100) if total else 0.0
-
-    print(f"[] Non-zero totalclaims: {non_zero:,} / {total:,}  ({pct:.2f}%)")
 
     return df
 
@@ -105,40 +112,39 @@ def convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
 # 3. MISSING VALUES
 # ===============================
 
+@instrumented
 def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
-    - Drops columns with >60% missing
-    - Fills numeric with median
+    - Drops columns with >60% missing (in place)
+    - Fills numeric with median (one vectorized fill)
     - Fills categorical with mode
     """
 
     missing_pct = df.isna().mean()
 
-    cols_to_drop = missing_pct[missing_pct > 0.60].index
-    df = df.drop(columns=cols_to_drop)
+    cols_to_drop = missing_pct[missing_pct > MISSING_DROP_THRESHOLD].index
+    df.drop(columns=cols_to_drop, inplace=True)
+
+    # Only columns that actually have gaps need a fill value
+    has_missing = missing_pct.drop(cols_to_drop)
+    has_missing = has_missing[has_missing > 0].index
 
     # Numeric
-    for col in df.select_dtypes(include="number"):
-        df[col] = df[col].fillna(df[col].median())
+    numeric_cols = df.select_dtypes(include="number").columns.intersection(has_missing)
+    if len(numeric_cols):
+        df.fillna(df[numeric_cols].median(), inplace=True)
 
     # Categorical
-    for col in df.select_dtypes(include="category"):
-        try:
-            df[col] = df[col].fillna(df[col].mode()[0])
-        except Exception:
-            df[col] = df[col].fillna("Unknown")
-    if "totalclaims" not in df.columns:
-        print(f"[] ❌ Column 'totalclaims' not found.")
-        return
-
-    # Ensure we have numeric dtype (NaN-safe)
-    s = pd.to_numeric(df["totalclaims"], errors="coerce")
-
-    non_zero = (s != 0).sum()
-    total    = s.notna().sum()          # ignore NaNs in denominator
-    pct      = (non_zero / total * 100) if total else 0.0
-
-    print(f"[] Non-zero totalclaims: {non_zero:,} / {total:,}  ({pct:.2f}%)")
+    fills = {}
+    for col in df.select_dtypes(include="category").columns.intersection(has_missing):
+        counts = df[col].value_counts(sort=False)
+        if counts.any():
+            fills[col] = counts.idxmax()
+        else:
+            df[col] = df[col].cat.add_categories(["Unknown"])
+            fills[col] = "Unknown"
+    if fills:
+        df.fillna(fills, inplace=True)
 
     return df
 
@@ -147,32 +153,25 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
 # 4. FEATURE ENGINEERING
 # ===============================
 
+@instrumented
 def add_derived_fields(df: pd.DataFrame) -> pd.DataFrame:
     """
     Adds:
-    - lossratio = totalclaims / totalpremium
+    - lossratio = totalclaims / totalpremium (0 where undefined)
     - has_claim = 1 if totalclaims > 0
     """
 
     if "totalclaims" in df.columns and "totalpremium" in df.columns:
-        df["lossratio"] = df["totalclaims"] / df["totalpremium"]
-        df["lossratio"] = df["lossratio"].replace([np.inf, -np.inf], np.nan)
-        df["lossratio"] = df["lossratio"].fillna(0)
+        claims = df["totalclaims"].to_numpy(dtype=float)
+        premium = df["totalpremium"].to_numpy(dtype=float)
+
+        ratio = np.zeros(len(df))
+        np.divide(claims, premium, out=ratio, where=premium != 0)
+        ratio[~np.isfinite(ratio)] = 0
+        df["lossratio"] = ratio
 
     if "totalclaims" in df.columns:
         df["has_claim"] = (df["totalclaims"] > 0).astype(int)
-    if "totalclaims" not in df.columns:
-        print(f"[] ❌ Column 'totalclaims' not found.")
-        return
-
-    # Ensure we have numeric dtype (NaN-safe)
-    s = pd.to_numeric(df["totalclaims"], errors="coerce")
-
-    non_zero = (s != 0).sum()
-    total    = s.notna().sum()          # ignore NaNs in denominator
-    pct      = (non_zero / total * 100) if total else 0.0
-
-    print(f"[] Non-zero totalclaims: {non_zero:,} / {total:,}  ({pct:.2f}%)")
 
     return df
 
@@ -182,54 +181,182 @@ def add_derived_fields(df: pd.DataFrame) -> pd.DataFrame:
 # ===============================
 
 def winsorize_series(series: pd.Series, lower=0.01, upper=0.99) -> pd.Series:
-    """Caps extreme values to reduce outlier influence."""
-    if series.dtype != "float" and series.dtype != "int":
+    """Caps extreme values to reduce outlier influence (exact quantiles)."""
+    # Any int/float width (int16, float32, ... from the dtype plan), not bools
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
         return series
 
     q_low, q_high = series.quantile([lower, upper])
-    
-    return np.clip(series, q_low, q_high)
-
 
-def apply_outlier_treatment(df: pd.DataFrame) -> pd.DataFrame:
-    numeric_cols = df.select_dtypes(include="number").columns
+    return series.clip(q_low, q_high)
 
-    for col in numeric_cols:
-        df[col] = winsorize_series(df[col])
-    if "totalclaims" not in df.columns:
-        print(f"[] ❌ Column 'totalclaims' not found.")
-        return
 
-    # Ensure we have numeric dtype (NaN-safe)
-    s = pd.to_numeric(df["totalclaims"], errors="coerce")
-
-    non_zero = (s != 0).sum()
-    total    = s.notna().sum()          # ignore NaNs in denominator
-    pct      = (non_zero / total * 100) if total else 0.0
+@instrumented
+def apply_outlier_treatment(
+    df: pd.DataFrame,
+    lower=0.01,
+    upper=0.99,
+    by=None,
+    exact: bool = False,
+    winsorizer: Winsorizer | None = None,
+    columns=None,
+) -> pd.DataFrame:
+    """
+    Caps `columns` (default: the OUTLIER_COLUMNS present, never the claim
+    targets or ID / code columns) at their [lower, upper] quantiles, per
+    segment of `by` (e.g. "covertype") when given. Quantiles of all columns
+    come from one pass of mergeable sketches (exact=True: exact quantiles).
 
-    print(f"[] Non-zero totalclaims: {non_zero:,} / {total:,}  ({pct:.2f}%)")
-    return df
+    Pass a fitted (e.g. loaded) outliers.Winsorizer to cap new data with
+    the caps learned on history instead of refitting.
+    """
+    if winsorizer is None:
+        if columns is None:
+            columns = [col for col in OUTLIER_COLUMNS if col in df.columns]
+        if not columns:
+            return df
+        winsorizer = Winsorizer(lower, upper, columns=list(columns), by=by, exact=exact)
+        winsorizer.fit(df)
+    return winsorizer.transform(df)
 
 
 # ===============================
 # 6. MAIN CLEANING PIPELINE
 # ===============================
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+# Declarative stage list run by clean_data, in order
+STAGES = [
+    ("clean_column_names", clean_column_names),
+    ("convert_data_types", convert_data_types),
+    ("handle_missing_values", handle_missing_values),
+    ("add_derived_fields", add_derived_fields),
+]
+
+OUTLIER_STAGE = ("apply_outlier_treatment", apply_outlier_treatment)
+
+# Stages that map each row to one output row independently of the others;
+# with a cache they can run per partition (e.g. per transaction month)
+ROW_WISE_STAGES = {"clean_column_names", "convert_data_types", "add_derived_fields"}
+
+
+class CleaningReport:
     """
-    Full cleaning pipeline:
+    Per-stage diagnostics collected by clean_data:
+    rows/columns, totalclaims non-zero share, wall time, frame memory
+    and (optionally) peak traced allocation during the stage.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records = []
+
+    def record(self, stage: str, df: pd.DataFrame, seconds: float, peak_bytes=None, cached=None):
+        record = {
+            "stage": stage,
+            "rows": len(df),
+            "columns": df.shape[1],
+            "seconds": seconds,
+            "frame_mb": df.memory_usage(deep=False).sum() / 1e6,
+            "peak_alloc_mb": peak_bytes / 1e6 if peak_bytes is not None else np.nan,
+        }
+        if cached is not None:
+            # Share of the stage served from the StageCache (0-1)
+            record["cached"] = float(cached)
+        record.update(totalclaims_summary(df))
+        self.records.append(record)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+    def __str__(self) -> str:
+        return self.to_frame().to_string(index=False, float_format=lambda v: f"{v:,.3f}")
+
+
+def totalclaims_summary(df: pd.DataFrame) -> dict:
+    """Non-zero totalclaims count over non-missing values."""
+    if "totalclaims" not in df.columns:
+        return {"claims_nonzero": np.nan, "claims_total": np.nan, "claims_pct": np.nan}
+
+    s = df["totalclaims"]
+    if not pd.api.types.is_numeric_dtype(s):
+        s = pd.to_numeric(s, errors="coerce")
+
+    non_zero = int((s != 0).sum())
+    total = int(s.notna().sum())
+    return {
+        "claims_nonzero": non_zero,
+        "claims_total": total,
+        "claims_pct": (non_zero / total * 100) if total else 0.0,
+    }
+
+
+def _clean_data_cached(df, stages, report, cache, fingerprint, partition_by):
+    from .stage_cache import Partitioned
+
+    if partition_by is not None:
+        leading = []
+        for name, stage in stages:
+            if name not in ROW_WISE_STAGES:
+                break
+            leading.append((name, stage))
+        if leading:
+            stages = [Partitioned(leading, partition_by)] + stages[len(leading):]
+
+    on_stage = None
+    if report is not None:
+        def on_stage(name, out, seconds, cached):
+            report.record(name, out, seconds, cached=cached)
+
+    df, _ = cache.run_chain(stages, df, fingerprint, on_stage)
+    return df
+
+
+@instrumented
+def clean_data(
+    df: pd.DataFrame,
+    report: CleaningReport | None = None,
+    outliers: bool = False,
+    cache=None,
+    fingerprint: str | None = None,
+    partition_by: str | None = None,
+) -> pd.DataFrame:
+    """
+    Full cleaning pipeline (runs in place on `df` where possible):
     1. Clean column names
     2. Convert data types
     3. Handle missing values
     4. Add derived fields (loss ratio, has_claim)
-    5. Apply outlier treatment
-    """
-    df = clean_column_names(df)
-    df = convert_data_types(df)
-    df = handle_missing_values(df)
-    df = add_derived_fields(df)
-    
+    5. Apply outlier treatment (only when outliers=True)
 
-    return df
+    Pass a CleaningReport to collect per-stage timing, memory and
+    totalclaims diagnostics.
 
+    With a stage_cache.StageCache, each stage is memoized on its input
+    (`fingerprint`, e.g. StageCache.load_key, or a content hash) and code;
+    `df` may then also be a zero-argument callable, only called when no
+    stored output can be reused. `partition_by` (a raw column such as
+    "TransactionMonth") runs the leading row-wise stages per partition, so a
+    new month only recomputes its own rows. Memory is not traced when cached.
+    """
+    stages = STAGES + [OUTLIER_STAGE] if outliers else STAGES
+
+    if cache is not None:
+        return _clean_data_cached(df, stages, report, cache, fingerprint, partition_by)
+
+    for name, stage in stages:
+        if report is None:
+            df = stage(df)
+            continue
+
+        if report.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        df = stage(df)
+        seconds = time.perf_counter() - start
+        peak = None
+        if report.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        report.record(name, df, seconds, peak)
 
+    return df
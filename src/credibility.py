@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.model_selection import KFold
+
+# Geographic hierarchy below the country level, coarsest first
+HIERARCHY = ["province", "postalcode"]
+
+
+def _group_stats(codes: np.ndarray, y: np.ndarray, n_groups: int, folds: np.ndarray | None = None,
+                 n_folds: int = 1) -> np.ndarray:
+    """
+    Count, sum and sum of squares of y per group → array (3, n_folds, n_groups),
+    from one bincount over the combined (fold, group) key.
+    """
+    if folds is None:
+        folds = np.zeros(len(codes), dtype=np.int64)
+    seen = codes >= 0
+    key = folds[seen] * n_groups + codes[seen]
+    size = n_folds * n_groups
+    y = y[seen]
+    stats = np.stack([
+        np.bincount(key, minlength=size),
+        np.bincount(key, weights=y, minlength=size),
+        np.bincount(key, weights=y * y, minlength=size),
+    ]).astype(float)
+    return stats.reshape(3, n_folds, n_groups)
+
+
+def credibility_rates(n: np.ndarray, s: np.ndarray, ss: np.ndarray, parent: np.ndarray,
+                      parent_rate: np.ndarray, k: float | None = None) -> tuple:
+    """
+    Bühlmann-Straub credibility estimates for one level of the hierarchy.
+
+    Each group's mean (s / n) is shrunk towards its parent's rate with
+    weight z = n / (n + k). Unless given, k = EPV / VHM is estimated from
+    the data: EPV is the pooled within-group variance, VHM the variance of
+    group means around their parent's exposure-weighted mean (not its
+    shrunk rate) net of sampling noise. When the groups
+    vary no more than noise would explain, k is infinite and every group
+    gets its parent's rate. Returns (rates, k).
+    """
+    p = parent_rate[parent]
+    has = n > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(has, s / n, p)
+
+        if k is None:
+            within = ss - np.where(has, s * s / n, 0.0)
+            dof = (n[has] - 1).sum()
+            epv = within[has].sum() / dof if dof > 0 else 0.0
+
+            parents_with_data = np.unique(parent[has])
+            parent_n = np.bincount(parent, weights=n, minlength=len(parent_rate))
+            parent_nsq = np.bincount(parent, weights=n * n, minlength=len(parent_rate))
+            parent_mean = np.bincount(parent, weights=s, minlength=len(parent_rate)) / parent_n
+            denom = n.sum() - (parent_nsq[parents_with_data] / parent_n[parents_with_data]).sum()
+            between = (n[has] * (mean[has] - parent_mean[parent[has]]) ** 2).sum()
+            vhm = (between - (has.sum() - len(parents_with_data)) * epv) / denom if denom > 0 else 0.0
+            k = epv / vhm if vhm > 0 else np.inf
+
+        z = n / (n + k) if np.isfinite(k) else np.zeros_like(n)
+    return z * mean + (1 - z) * p, float(k)
+
+
+class CredibilityEncoder(TransformerMixin, BaseEstimator):
+    """
+    Hierarchical credibility-weighted target encoding, e.g. claim rate by
+    country → province → postal code.
+
+    Every level's rate is its own mean shrunk towards its parent's
+    (already shrunk) rate, so sparse postal codes borrow strength from
+    their province. fit_transform returns out-of-fold encodings (each row
+    encoded from the other n_splits - 1 folds) so training rows never see
+    their own target; transform encodes new data with rates from all of
+    the fitted data, falling back to the parent for unseen levels.
+
+    Works inside an sklearn Pipeline / ColumnTransformer on the hierarchy
+    columns; outputs one <column>_risk feature per level. k fixes the
+    credibility constant (float, or one per level) instead of estimating it.
+    """
+
+    def __init__(self, hierarchy=tuple(HIERARCHY), n_splits: int = 5, k=None, random_state: int = 0):
+        self.hierarchy = hierarchy
+        self.n_splits = n_splits
+        self.k = k
+        self.random_state = random_state
+
+    # ---------- codes ----------
+
+    def _frame(self, X) -> pd.DataFrame:
+        if isinstance(X, pd.DataFrame):
+            return X[list(self.hierarchy)]
+        return pd.DataFrame(np.asarray(X, dtype=object), columns=list(self.hierarchy))
+
+    def _codes(self, X: pd.DataFrame) -> list:
+        """Per level, each row's group (a level value within its parent group); -1 if unseen."""
+        codes, parent = [], np.zeros(len(X), dtype=np.int64)
+        for level, col in enumerate(self.hierarchy):
+            values = self.categories_[level].get_indexer(X[col].to_numpy())
+            key = parent * len(self.categories_[level]) + values
+            group = self.groups_[level].get_indexer(key)
+            group[(values < 0) | (parent < 0)] = -1
+            codes.append(group)
+            parent = group
+        return codes
+
+    def _fit_groups(self, X: pd.DataFrame):
+        self.categories_, self.groups_, self.parents_ = [], [], []
+        parent = np.zeros(len(X), dtype=np.int64)
+        for col in self.hierarchy:
+            values, categories = pd.factorize(X[col].to_numpy())
+            valid = (values >= 0) & (parent >= 0)
+            group = np.full(len(X), -1, dtype=np.int64)
+            group[valid], keys = pd.factorize(parent[valid] * len(categories) + values[valid])
+            self.categories_.append(pd.Index(categories))
+            self.groups_.append(pd.Index(keys))
+            self.parents_.append(np.asarray(keys) // len(categories))
+            parent = group
+
+    # ---------- rates ----------
+
+    def _level_k(self, level: int):
+        if self.k is None or np.isscalar(self.k):
+            return self.k
+        return self.k[level]
+
+    def _rates(self, stats: list) -> tuple:
+        """Rates per level from group stats [(n, s, ss) per level] → (rates, ks)."""
+        n0 = sum(stats[0][0])
+        rate = np.array([sum(stats[0][1]) / n0 if n0 else 0.0])
+        rates, ks = [], []
+        for level, (n, s, ss) in enumerate(stats):
+            rate, k = credibility_rates(n, s, ss, self.parents_[level], rate, self._level_k(level))
+            rates.append(rate)
+            ks.append(k)
+        return rates, ks
+
+    def _encode(self, codes: list, rates: list, prior: float) -> np.ndarray:
+        out = np.empty((len(codes[0]), len(codes)))
+        fallback = np.full(len(codes[0]), prior)
+        for level, (group, rate) in enumerate(zip(codes, rates)):
+            fallback = np.where(group >= 0, rate[np.maximum(group, 0)], fallback)
+            out[:, level] = fallback
+        return out
+
+    # ---------- sklearn API ----------
+
+    def fit(self, X, y):
+        X = self._frame(X)
+        y = np.asarray(y, dtype=float)
+        self._fit_groups(X)
+        codes = self._codes(X)
+        stats = [_group_stats(c, y, len(g))[:, 0] for c, g in zip(codes, self.groups_)]
+        self.prior_ = float(y.mean())
+        self.rates_, self.k_ = self._rates(stats)
+        self.n_features_in_ = len(self.hierarchy)
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        return self._encode(self._codes(self._frame(X)), self.rates_, self.prior_)
+
+    def fit_transform(self, X, y=None, **fit_params) -> np.ndarray:
+        """Fits on all rows, then encodes every row out-of-fold."""
+        if y is None:
+            raise ValueError("CredibilityEncoder needs the target y to fit")
+        self.fit(X, y)
+        X = self._frame(X)
+        y = np.asarray(y, dtype=float)
+        codes = self._codes(X)
+
+        folds = np.empty(len(X), dtype=np.int64)
+        splitter = KFold(self.n_splits, shuffle=True, random_state=self.random_state)
+        for fold, (_, rows) in enumerate(splitter.split(folds)):
+            folds[rows] = fold
+
+        # Stats of every fold in one pass; out-of-fold = total - in-fold
+        by_fold = [_group_stats(c, y, len(g), folds, self.n_splits) for c, g in zip(codes, self.groups_)]
+        out = np.empty((len(X), len(self.hierarchy)))
+        for fold in range(self.n_splits):
+            stats = [level.sum(axis=1) - level[:, fold] for level in by_fold]
+            rates, _ = self._rates(stats)
+            rows = folds == fold
+            prior = (y.sum() - y[rows].sum()) / max(1, len(y) - rows.sum())
+            out[rows] = self._encode([c[rows] for c in codes], rates, prior)
+        return out
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.array([f"{col}_risk" for col in self.hierarchy], dtype=object)
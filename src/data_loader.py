@@ -1,29 +1,238 @@
 # src/data_loader.py
+import csv
+import shutil
 from pathlib import Path
 import pandas as pd
 
+from .dtype_planner import apply_plan, load_plan, plan_path, save_plan
+from .instrumentation import instrumented
+from .paths import DATA_DIR
 
-DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+# Declared schema for the raw MachineLearningRating_v3.txt columns.
+# Identifiers and vehicle specs are downcast; monetary columns stay float64
+# so premiums/claims keep full precision.
+RAW_DTYPES = {
+    "UnderwrittenCoverID": "int32",
+    "PolicyID": "int32",
+    "PostalCode": "int32",
+    "mmcode": "float64",
+    "RegistrationYear": "int16",
+    "Cylinders": "float32",
+    "cubiccapacity": "float32",
+    "kilowatts": "float32",
+    "NumberOfDoors": "float32",
+    "CustomValueEstimate": "float64",
+    "NumberOfVehiclesInFleet": "float32",
+    "SumInsured": "float64",
+    "CalculatedPremiumPerTerm": "float64",
+    "TotalPremium": "float64",
+    "TotalClaims": "float64",
+}
 
+# Low/medium-cardinality text (and code) columns read as categoricals
+RAW_CATEGORIES = [
+    "Province",
+    "PostalCode",
+    "make",
+    "Gender",
+    "MaritalStatus",
+    "Country",
+    "VehicleType",
+    "CoverCategory",
+    "CoverType",
+    "Product",
+]
 
+
+def sniff_separator(path: Path, sample_bytes: int = 8192) -> str:
+    """
+    Detects the field separator from the first few KB of a delimited file.
+    """
+    with open(path, "r", newline="", encoding="utf-8", errors="replace") as fh:
+        sample = fh.read(sample_bytes)
+
+    try:
+        return csv.Sniffer().sniff(sample, delimiters="|,\t;").delimiter
+    except csv.Error:
+        return ","
+
+
+def _apply_categories(df: pd.DataFrame, categories: list) -> pd.DataFrame:
+    for col in categories:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _parquet_categories(path: Path) -> list:
+    """
+    Columns stored as pandas categoricals in a Parquet dataset.
+
+    pyarrow only restores string dictionaries, so categoricals over codes
+    such as postalcode come back as plain ints without this.
+    """
+    import pyarrow.dataset as ds
+
+    meta = ds.dataset(path, format="parquet", partitioning="hive").schema.pandas_metadata or {}
+    return [
+        col["name"]
+        for col in meta.get("columns", [])
+        if col.get("pandas_type") == "categorical"
+    ]
+
+
+@instrumented
 def load_data(
     filename: str = "MachineLearningRating_v3.txt",
     sep: str | None = None,
     dtype_overrides: dict | None = None,
-) -> pd.DataFrame:
-    
+    engine: str = "python",
+    dtype: dict | None = None,
+    usecols: list | None = None,
+    categories: list | None = None,
+    chunksize: int | None = None,
+    filters: list | None = None,
+):
+    """
+    Loads a delimited file or a Parquet dataset from data/.
+
+    - engine="python" keeps the original behaviour (sep=None is sniffed by pandas)
+    - engine="c" / "pyarrow" sniff the separator once, then parse with the
+      fast reader using the declared `dtype`, `usecols` and `categories`
+    - chunksize returns an iterator of DataFrames instead (c engine only)
+    - *.parquet files/directories are read with column projection (`usecols`)
+      and partition/row-group predicate pushdown (`filters`), e.g.
+      filters=[("province", "==", "Gauteng")]; a dtype plan saved next to
+      the dataset (see save_data) is re-applied to the loaded columns
+    """
+
     path = DATA_DIR / filename
 
     if not path.exists():
         raise FileNotFoundError(f"Data file not found: {path}")
 
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path, columns=usecols, filters=filters)
+        df = _apply_categories(df, _parquet_categories(path))
+        plan = load_plan(plan_path(path))
+        if plan:
+            df = apply_plan(df, plan)
+        if dtype_overrides:
+            df = df.astype(dtype_overrides)
+        return df
+
+    if engine == "python":
+        df = pd.read_csv(
+            path,
+            sep=sep,          # e.g., ',' or '|' or '\t'
+            engine="python",  # safer when sep is None or complex
+            usecols=usecols,
+            dtype=dtype,
+            chunksize=chunksize,
+        )
+        if chunksize:
+            return df
+        if dtype_overrides:
+            df = df.astype(dtype_overrides)
+        return df
+
+    if sep is None:
+        sep = sniff_separator(path)
+
+    if usecols is not None and dtype is not None:
+        dtype = {col: t for col, t in dtype.items() if col in usecols}
+    categories = [c for c in (categories or []) if usecols is None or c in usecols]
+
+    if chunksize:
+        # pyarrow has no chunked reader; the C engine streams the file
+        reader = pd.read_csv(
+            path,
+            sep=sep,
+            engine="c",
+            dtype=dtype,
+            usecols=usecols,
+            chunksize=chunksize,
+            low_memory=False,
+        )
+        return (
+            _apply_categories(chunk.astype(dtype_overrides) if dtype_overrides else chunk, categories)
+            for chunk in reader
+        )
+
+    read_kwargs = {} if engine == "pyarrow" else {"low_memory": False}
     df = pd.read_csv(
         path,
-        sep=sep,          # e.g., ',' or '|' or '\t'
-        engine="python",  # safer when sep is None or complex
+        sep=sep,
+        engine=engine,
+        dtype=dtype,
+        usecols=usecols,
+        **read_kwargs,
     )
 
     if dtype_overrides:
         df = df.astype(dtype_overrides)
 
-    return df
+    return _apply_categories(df, categories)
+
+
+@instrumented
+def load_raw(
+    filename: str = "MachineLearningRating_v3.txt",
+    usecols: list | None = None,
+    chunksize: int | None = None,
+    engine: str = "c",
+):
+    """Fast path for the raw policy file: sniffed separator + declared schema."""
+    return load_data(
+        filename,
+        engine=engine,
+        dtype=RAW_DTYPES,
+        usecols=usecols,
+        categories=RAW_CATEGORIES,
+        chunksize=chunksize,
+    )
+
+
+@instrumented
+def save_data(
+    df: pd.DataFrame,
+    filename: str = "clean_data.parquet",
+    partition_cols: list | None = None,
+    sort_by: str | None = None,
+    row_group_size: int = 100_000,
+    dtype_plan: dict | None = None,
+) -> Path:
+    """
+    Writes a DataFrame to data/ as Parquet, keeping category and datetime dtypes.
+
+    - partition_cols splits the dataset into one directory per value
+    - sort_by orders rows first so row-group min/max statistics are tight,
+      which is what lets `filters` on that column skip row groups
+    - dtype_plan (see dtype_planner.plan_dtypes) is applied and persisted
+      as <name>.dtypes.json next to the dataset so load_data can reuse it
+    - an existing artifact (and its dtype plan) is replaced, never appended to
+    """
+    path = DATA_DIR / filename
+
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+    plan_path(path).unlink(missing_ok=True)
+
+    if dtype_plan:
+        df = apply_plan(df, dtype_plan)
+
+    if sort_by and sort_by in df.columns:
+        df = df.sort_values(sort_by, kind="stable")
+
+    df.to_parquet(
+        path,
+        engine="pyarrow",
+        index=False,
+        partition_cols=partition_cols,
+        row_group_size=row_group_size,
+    )
+    if dtype_plan:
+        save_plan(dtype_plan, plan_path(path))
+    return path
@@ -0,0 +1,186 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+
+# Declared business key of the policy table: one row per cover, policy and month
+BUSINESS_KEY = ["underwrittencoverid", "policyid", "transactionmonth"]
+
+# Column used to say where duplicates are
+LOCATION_COLUMN = "transactionmonth"
+
+
+def row_hash(df: pd.DataFrame, columns: list | None = None) -> np.ndarray:
+    """
+    One vectorized 64-bit hash per row over `columns` (default: all, in
+    sorted order so column order does not matter). Categoricals hash by
+    value, so chunks with different category sets hash consistently.
+    """
+    columns = list(columns) if columns is not None else sorted(df.columns)
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def _first_positions(codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """Position of the first row in each group of factorized codes."""
+    first = np.empty(n_groups, dtype=np.int64)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]
+    return first
+
+
+def _rows_equal(a: pd.DataFrame, b: pd.DataFrame) -> np.ndarray:
+    a, b = a.reset_index(drop=True), b.reset_index(drop=True)
+    same = a.eq(b) | (a.isna() & b.isna())
+    return same.all(axis=1).to_numpy()
+
+
+class DuplicateReport:
+    """
+    What find_duplicates flagged: the key used ("all columns" for row
+    hashes), how many rows and, per duplicate, its index label, the label of
+    the first occurrence it repeats and its LOCATION_COLUMN value.
+    """
+
+    def __init__(self, key, n_rows: int, locations: pd.DataFrame):
+        self.key = key
+        self.n_rows = n_rows
+        self.locations = locations
+
+    @property
+    def n_duplicates(self) -> int:
+        return len(self.locations)
+
+    def by_location(self) -> pd.Series:
+        if LOCATION_COLUMN not in self.locations.columns:
+            return pd.Series(dtype=int)
+        return self.locations[LOCATION_COLUMN].value_counts().sort_index()
+
+    def summary(self) -> dict:
+        return {
+            "key": self.key,
+            "rows": self.n_rows,
+            "duplicates": self.n_duplicates,
+            f"by_{LOCATION_COLUMN}": {str(k): int(v) for k, v in self.by_location().items()},
+        }
+
+    def __str__(self) -> str:
+        key = self.key if isinstance(self.key, str) else " + ".join(self.key)
+        lines = [f"{self.n_duplicates:,} duplicate(s) in {self.n_rows:,} rows (key: {key})"]
+        by_location = self.by_location()
+        if len(by_location):
+            lines.append(by_location.to_string())
+        return "\n".join(lines)
+
+
+def _repeated_rows(values: pd.DataFrame) -> tuple:
+    """
+    Positions of rows repeating an earlier row of `values`, and of the rows
+    they repeat. Rows are grouped by 64-bit hash and checked column by
+    column, so a hash collision is never taken for a duplicate.
+    """
+    codes, uniques = pd.factorize(row_hash(values, values.columns))
+    first = _first_positions(codes, len(uniques))
+    positions = np.flatnonzero(first[codes] != np.arange(len(values)))
+    originals = first[codes[positions]]
+
+    if len(positions) and not _rows_equal(values.iloc[positions], values.iloc[originals]).all():
+        # A genuine 64-bit collision: group exactly instead
+        columns = list(values.columns)
+        groups = values.groupby(columns, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+        first = _first_positions(groups, groups.max() + 1)
+        positions = np.flatnonzero(first[groups] != np.arange(len(values)))
+        originals = first[groups[positions]]
+    return positions, originals
+
+
+def find_duplicates(df: pd.DataFrame, key: list | None = None) -> tuple:
+    """
+    Flags repeated rows, keeping the first occurrence → (mask, DuplicateReport).
+
+    - key: columns of a business key (e.g. BUSINESS_KEY); rows repeating it
+      are duplicates even if other columns differ
+    - key=None, or key columns missing from df: exact full-row duplicates.
+      Numeric, datetime and categorical columns are hashed first; rows whose
+      values there are unique cannot be duplicates, so the slower text
+      columns are only hashed for the remaining candidates
+    """
+    use_key = key is not None and all(col in df.columns for col in key)
+    candidates = np.arange(len(df))
+    if use_key:
+        columns = list(key)
+    else:
+        columns = sorted(df.columns)
+        cheap = sorted(df.select_dtypes(exclude=["object", "string"]).columns)
+        if cheap and len(cheap) < len(columns):
+            repeated = pd.Series(row_hash(df, cheap)).duplicated(keep=False).to_numpy()
+            candidates = np.flatnonzero(repeated)
+
+    positions, originals = _repeated_rows(df[columns].iloc[candidates])
+    positions, originals = candidates[positions], candidates[originals]
+
+    mask = np.zeros(len(df), dtype=bool)
+    mask[positions] = True
+
+    locations = pd.DataFrame({
+        "index": df.index[positions],
+        "first_index": df.index[originals],
+    })
+    if LOCATION_COLUMN in df.columns:
+        locations[LOCATION_COLUMN] = df[LOCATION_COLUMN].to_numpy()[positions]
+
+    report = DuplicateReport(list(key) if use_key else "all columns", len(df), locations)
+    return mask, report
+
+
+@instrumented
+def drop_duplicates(df: pd.DataFrame, key: list | None = None) -> tuple:
+    """
+    find_duplicates, then a copy without the duplicates → (df, DuplicateReport).
+    With key=None the rows kept are exactly those of df.drop_duplicates().
+    """
+    mask, report = find_duplicates(df, key)
+    # take() builds a new frame (not a flagged slice of df), so callers can
+    # assign columns to it without SettingWithCopyWarning
+    return df.take(np.flatnonzero(~mask)), report
+
+
+class StreamingDeduplicator:
+    """
+    Chunked / incremental dedup with a persisted hash set.
+
+    Each chunk is reduced to the rows whose 64-bit hash of `key` (default:
+    all columns) was not seen earlier in the stream or in previous runs. The
+    sorted hash set is saved as .npy at `path`, so loading a new month only
+    keeps rows that are new. Chunks must share dtypes (e.g. load_raw's
+    declared schema) for hashes to match across runs.
+    """
+
+    def __init__(self, key: list | None = None, path: Path | str | None = None):
+        self.key = key
+        self.path = Path(path) if path else None
+        if self.path is not None and self.path.exists():
+            self.seen = np.load(self.path)
+        else:
+            self.seen = np.empty(0, dtype=np.uint64)
+        self.rows = 0
+        self.duplicates = 0
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        hashes = row_hash(chunk, self.key)
+        new = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self.seen):
+            idx = np.minimum(np.searchsorted(self.seen, hashes), len(self.seen) - 1)
+            new &= self.seen[idx] != hashes
+
+        added = np.sort(hashes[new])
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, added), added)
+        self.rows += len(chunk)
+        self.duplicates += int((~new).sum())
+        return chunk[new] if not new.all() else chunk
+
+    def save(self) -> Path | None:
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(self.path, self.seen)
+        return self.path
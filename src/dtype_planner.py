@@ -0,0 +1,130 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Text columns with at most this share of distinct values become categoricals
+MAX_CATEGORY_RATIO = 0.5
+
+_INT_TYPES = [
+    ("int8", np.iinfo(np.int8)),
+    ("int16", np.iinfo(np.int16)),
+    ("int32", np.iinfo(np.int32)),
+    ("int64", np.iinfo(np.int64)),
+]
+
+
+def _smallest_int(low, high, nullable=False) -> str:
+    for name, info in _INT_TYPES:
+        if info.min <= low and high <= info.max:
+            return name.capitalize() if nullable else name
+    return "Int64" if nullable else "int64"
+
+
+def _plan_float(values: np.ndarray, has_missing: bool, float_rtol: float) -> str:
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return "float32"
+    if np.isfinite(values).all() and (values == np.round(values)).all():
+        return _smallest_int(values.min(), values.max(), nullable=has_missing)
+
+    as32 = values.astype(np.float32).astype(np.float64)
+    if float_rtol == 0:
+        lossless = np.array_equal(as32, values, equal_nan=True)
+    else:
+        with np.errstate(invalid="ignore"):
+            lossless = bool((np.abs(as32 - values) <= float_rtol * np.abs(values)).all())
+    return "float32" if lossless else "float64"
+
+
+def _plan_column(series: pd.Series, max_category_ratio: float, float_rtol: float) -> str:
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+        return str(dtype)
+    if pd.api.types.is_bool_dtype(dtype):
+        return str(dtype)
+
+    if pd.api.types.is_integer_dtype(dtype):
+        nonnull = series.dropna()
+        if nonnull.empty:
+            return str(dtype)
+        return _smallest_int(
+            nonnull.min(), nonnull.max(),
+            nullable=pd.api.types.is_extension_array_dtype(dtype),
+        )
+
+    if pd.api.types.is_float_dtype(dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return _plan_float(values, bool(np.isnan(values).any()), float_rtol)
+
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        nonnull = series.dropna()
+        uniques = pd.unique(nonnull)
+        if len(uniques) and all(isinstance(u, (bool, np.bool_)) for u in uniques):
+            return "boolean" if len(nonnull) < len(series) else "bool"
+        if len(uniques) <= max(1, max_category_ratio * len(nonnull)):
+            return "category"
+
+    return str(dtype)
+
+
+def plan_dtypes(
+    df: pd.DataFrame,
+    max_category_ratio: float = MAX_CATEGORY_RATIO,
+    float_rtol: float = 0.0,
+) -> dict:
+    """
+    Cheapest exact dtype per column, from one profile of its values.
+
+    - integers (and integral floats) → smallest int8/16/32/64 holding the
+      range; nullable Int* when values are missing
+    - floats → float32 when the round trip is exact (or within `float_rtol`),
+      so monetary columns keep float64 unless they happen to fit
+    - text → category when distinct values are at most `max_category_ratio`
+      of the non-missing rows; Yes/No flags stay text categories (1 byte per
+      row, same as a bool) so existing comparisons keep working
+    - object columns holding Python bools → bool / nullable boolean
+    - categoricals, datetimes and bools are kept as they are
+    """
+    return {
+        col: _plan_column(df[col], max_category_ratio, float_rtol)
+        for col in df.columns
+    }
+
+
+def apply_plan(df: pd.DataFrame, plan: dict) -> pd.DataFrame:
+    """Casts every planned column that is present in a single astype call."""
+    changes = {
+        col: dtype for col, dtype in plan.items()
+        if col in df.columns and str(df[col].dtype) != dtype
+    }
+    return df.astype(changes) if changes else df
+
+
+def plan_path(artifact: Path) -> Path:
+    """data/clean_data.parquet → data/clean_data.dtypes.json"""
+    return Path(artifact).with_suffix(".dtypes.json")
+
+
+def save_plan(plan: dict, path: Path) -> Path:
+    path = Path(path)
+    path.write_text(json.dumps(plan, indent=2))
+    return path
+
+
+def load_plan(path: Path) -> dict | None:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Deep memory per column before/after a plan, largest savings first."""
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+        "mb_before": before.memory_usage(deep=True, index=False) / 2 ** 20,
+        "mb_after": after.memory_usage(deep=True, index=False) / 2 ** 20,
+    })
+    report["saved_mb"] = report["mb_before"] - report["mb_after"]
+    return report.sort_values("saved_mb", ascending=False)
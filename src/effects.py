@@ -1,7 +1,8 @@
 import numpy as np
-from scipy.stats.contingency import association
 
 def cramers_v(cont_table):
+    from scipy.stats.contingency import association
+
     return association(cont_table, method="cramer")
 
 def cohens_d(g1, g2):
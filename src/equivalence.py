@@ -1,36 +1,210 @@
 import numpy as np
 import pandas as pd
-from scipy.stats import chi2_contingency, ttest_ind
-from effects import cramers_v, cohens_d
+from .effects import cramers_v
 
-def check_equivalence(df, group_col, vars_list):
+# Numeric covariates with at most this many distinct values are tested as categorical
+CATEGORICAL_MAX_LEVELS = 10
+
+
+def _skip(feature, reason):
+    return {"feature": feature, "type": "skipped", "test": None, "status": "skipped", "reason": reason}
+
+
+def _numeric_moments(codes, values):
     """
-    Check confounding balance using t-tests + chi-square tests.
-    Returns a dictionary of results.
+    (n, mean - shift, var, shift) per group (0 = A, 1 = B) of one column
+    from bincounts, NaN ignored.
     """
-    results = {}
+    valid = ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    # Sums around one of the values and a second pass around the group
+    # means keep means and variances exact for large, offset values
+    shift = values[0] if len(values) else 0.0
+    values = values - shift
+    n = np.bincount(codes, minlength=2).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=values, minlength=2) / n
+        deviation = values - mean[codes]
+        var = np.bincount(codes, weights=deviation * deviation, minlength=2) / (n - 1)
+    return n, mean, var, shift
+
+
+def _numeric_balance(codes, name, values):
+    """
+    Welch t-test and SMD for one numeric covariate (float array over the A/B
+    rows) from bincounts over the group codes, so memory stays at a few
+    arrays of one column however many covariates are tested.
+    """
+    from scipy.stats import t as t_dist
+
+    n, mean, var, shift = _numeric_moments(codes, values)
+    if min(n) < 2:
+        return _skip(name, "fewer than 2 non-missing values in a group")
+    pooled = np.sqrt((var[0] + var[1]) / 2)
+    if pooled == 0:
+        return _skip(name, "zero variance in both groups")
+    se_a, se_b = var[0] / n[0], var[1] / n[1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (mean[0] - mean[1]) / np.sqrt(se_a + se_b)
+        dof = (se_a + se_b) ** 2 / (se_a ** 2 / (n[0] - 1) + se_b ** 2 / (n[1] - 1))
+    smd = (mean[0] - mean[1]) / pooled
+    return {
+        "feature": name,
+        "type": "numeric",
+        "test": "T-Test",
+        "n_a": int(n[0]),
+        "n_b": int(n[1]),
+        "mean_a": mean[0] + shift,
+        "mean_b": mean[1] + shift,
+        "smd": smd,
+        "statistic": t,
+        "p_value": 2 * t_dist.sf(np.abs(t), dof),
+        "effect_size": smd,
+    }
+
+
+def _is_categorical(col: pd.Series, max_levels: int) -> bool:
+    """
+    Categorical by dtype: object, category and bool columns, and integer
+    columns whose value range spans at most max_levels values (flags,
+    small codes). Floats are numeric. Needs a min/max, not a distinct count.
+    """
+    if not pd.api.types.is_numeric_dtype(col) or pd.api.types.is_bool_dtype(col):
+        return True
+    if pd.api.types.is_integer_dtype(col):
+        low, high = col.min(), col.max()
+        return pd.isna(low) or high - low < max_levels
+    return False
+
+
+def _categorical_balance(codes, series):
+    """Contingency table from one bincount; chi-squared, Cramér's V, max level SMD."""
+    from scipy.stats import chi2_contingency
+
+    levels, uniques = pd.factorize(series)
+    keep = levels >= 0
+    if keep.sum() == 0:
+        return _skip(series.name, "all values missing")
+    n_levels = len(uniques)
+    if n_levels < 2:
+        return _skip(series.name, "single level")
+
+    table = np.bincount(
+        codes[keep] * n_levels + levels[keep], minlength=2 * n_levels
+    ).reshape(2, n_levels)
+    table = table[:, table.sum(axis=0) > 0]
+    if (table.sum(axis=1) == 0).any():
+        return _skip(series.name, "no non-missing values in a group")
+
+    chi2, p, _, _ = chi2_contingency(table)
+    props = table / table.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denom = np.sqrt((props[0] * (1 - props[0]) + props[1] * (1 - props[1])) / 2)
+        level_smd = np.where(denom > 0, (props[0] - props[1]) / denom, 0.0)
 
-    for var in vars_list:
-        if var not in df.columns:
+    return {
+        "feature": series.name,
+        "type": "categorical",
+        "test": "Chi-Squared",
+        "n_a": int(table[0].sum()),
+        "n_b": int(table[1].sum()),
+        "smd": level_smd[np.argmax(np.abs(level_smd))],
+        "statistic": chi2,
+        "p_value": p,
+        "effect_size": cramers_v(table),
+    }
+
+
+def balance_table(df, group_col, covariates, groups=None, alpha=0.05,
+                  max_missing=None, categorical_max_levels=CATEGORICAL_MAX_LEVELS):
+    """
+    Confounder balance between two groups across many covariates.
+
+    - The group column is factorized once; `groups` picks the (A, B) levels
+      (default: first two levels in order of appearance)
+    - Numeric covariates (floats, integers with a wide range): Welch t-test
+      + standardized mean difference (SMD) from bincounts per column
+    - Categorical covariates (object/category/bool, or integers spanning at
+      most categorical_max_levels values): chi-squared + Cramér's V from one
+      bincount per column; smd is the largest level-share SMD
+    - Covariates that cannot be tested are returned with status "skipped"
+      and a reason instead of being dropped
+    """
+    codes, levels = pd.factorize(df[group_col])
+    if groups is None:
+        if len(levels) < 2:
+            raise ValueError(f"'{group_col}' needs at least two groups")
+        groups = tuple(levels[:2])
+
+    group_index = {level: i for i, level in enumerate(levels)}
+    missing = [g for g in groups if g not in group_index]
+    if missing:
+        raise ValueError(f"Groups not found in '{group_col}': {missing}")
+
+    # Map to 0 (A), 1 (B), -1 (other) and keep A/B rows only
+    remap = np.full(len(levels) + 1, -1)
+    remap[group_index[groups[0]]] = 0
+    remap[group_index[groups[1]]] = 1
+    ab = remap[codes]
+    rows_ab = np.flatnonzero(ab >= 0)
+    ab = ab[rows_ab]
+    # A/B rows are taken one column at a time, never as a copy of the frame
+    everyone = len(rows_ab) == len(df)
+
+    results = []
+    for feature in covariates:
+        if feature == group_col:
+            continue
+        if feature not in df.columns:
+            results.append(_skip(feature, "column not found"))
+            continue
+        col = df[feature] if everyone else df[feature].take(rows_ab)
+        if max_missing is not None and col.isna().mean() > max_missing:
+            results.append(_skip(feature, f"more than {max_missing:.0%} missing"))
             continue
 
-        if df[var].dtype == "object" or df[var].nunique() <= 10:
-            cont = pd.crosstab(df[group_col], df[var])
-            chi2, p, _, _ = chi2_contingency(cont)
-            results[var] = {
-                "type": "categorical",
-                "p_value": p,
-                "effect_size": cramers_v(cont)
-            }
+        if pd.api.types.is_datetime64_any_dtype(col) or pd.api.types.is_timedelta64_dtype(col):
+            results.append(_skip(feature, f"unsupported dtype {col.dtype}"))
+        elif _is_categorical(col, categorical_max_levels):
+            try:
+                results.append(_categorical_balance(ab, col))
+            except ValueError as exc:
+                results.append(_skip(feature, f"error: {exc}"))
         else:
-            gA = df[df[group_col] == "A_Control"][var].dropna()
-            gB = df[df[group_col] == "B_Test"][var].dropna()
-
-            t, p = ttest_ind(gA, gB, equal_var=False)
-            results[var] = {
-                "type": "numeric",
-                "p_value": p,
-                "effect_size": cohens_d(gA, gB)
-            }
+            results.append(_numeric_balance(ab, feature, col.to_numpy(dtype=float, na_value=np.nan)))
+
+    table = pd.DataFrame(results)
+    for column in ("n_a", "n_b", "mean_a", "mean_b", "smd", "statistic", "p_value", "effect_size", "reason"):
+        if column not in table.columns:
+            table[column] = np.nan
+    tested = table["type"] != "skipped"
+    table.loc[tested, "status"] = np.where(
+        table.loc[tested, "p_value"] >= alpha, "✓ EQUIVALENT", "✗ DIFFERENT"
+    )
+
+    order = {f: i for i, f in enumerate(covariates)}
+    table = table.sort_values("feature", key=lambda s: s.map(order)).reset_index(drop=True)
+    table.attrs["groups"] = groups
+    return table
+
+
+def check_equivalence(df, group_col, vars_list):
+    """
+    Check confounding balance using t-tests + chi-square tests.
+    Returns a dictionary of results; untestable variables are included
+    with type "skipped" and the reason.
+    """
+    groups = ("A_Control", "B_Test") if {"A_Control", "B_Test"} <= set(df[group_col].unique()) else None
+    table = balance_table(df, group_col, vars_list, groups=groups)
+
+    results = {}
+    for row in table.to_dict("records"):
+        results[row["feature"]] = {
+            "type": row["type"],
+            "p_value": row["p_value"],
+            "effect_size": row["effect_size"],
+        }
+        if row["type"] == "skipped":
+            results[row["feature"]]["reason"] = row["reason"]
 
     return results
@@ -0,0 +1,34 @@
+import pandas as pd
+
+# Reference year for vehicle_age (last year in the dataset)
+REFERENCE_YEAR = 2015
+
+
+def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Task 4 modelling features, as built in the notebook:
+    - margin, has_claim when the input has totalclaims but not them yet
+      (records scored for pricing have no claims)
+    - vehicle_age (clipped to 0-50), power_ratio
+    - premium_to_sum_ratio
+    - has_alarm, has_tracking
+    Returns a new frame; the input is not modified. Province / postal code
+    risk is target-dependent, so it is left to credibility.CredibilityEncoder
+    inside the model pipeline.
+    """
+    df_model = df.copy()
+
+    if "margin" not in df_model.columns and "totalclaims" in df_model.columns:
+        df_model["margin"] = df_model["totalpremium"] - df_model["totalclaims"]
+    if "has_claim" not in df_model.columns and "totalclaims" in df_model.columns:
+        df_model["has_claim"] = (df_model["totalclaims"] > 0).astype(int)
+
+    df_model["vehicle_age"] = (REFERENCE_YEAR - df_model["registrationyear"]).clip(lower=0, upper=50)
+    df_model["power_ratio"] = df_model["kilowatts"] / (df_model["cubiccapacity"] + 1)
+
+    df_model["premium_to_sum_ratio"] = df_model["totalpremium"] / (df_model["suminsured"] + 1)
+
+    df_model["has_alarm"] = (df_model["alarmimmobiliser"] == "Yes").astype(int)
+    df_model["has_tracking"] = (df_model["trackingdevice"] == "Yes").astype(int)
+
+    return df_model
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import DATA_DIR
+from .effects import cramers_v
+from .instrumentation import instrumented
+from .multigroup import KGroupTests
+from .stage_cache import data_fingerprint
+from .statistical_tests import (
+    anova_from_moments,
+    cohens_d_from_moments,
+    welch_t_from_moments,
+)
+
+CACHE_DIR = DATA_DIR / "cache" / "hypotheses"
+
+TEST_NAMES = {
+    "chi2": "Chi-Squared Test",
+    "anova": "One-Way ANOVA",
+    "welch_anova": "Welch's ANOVA",
+    "kruskal": "Kruskal-Wallis H Test",
+    "ttest": "Welch's T-Test",
+    "mannwhitney": "Mann-Whitney U Test",
+}
+
+# Example declarative suite mirroring Task 3
+TASK3_HYPOTHESES = [
+    {"id": "1A", "null_hypothesis": "No claim frequency differences across provinces",
+     "feature": "province", "metric": "has_claim", "test": "chi2"},
+    {"id": "1B", "null_hypothesis": "No claim severity differences across provinces",
+     "feature": "province", "metric": "totalclaims", "test": "anova", "positive_only": True},
+    {"id": "2A", "null_hypothesis": "No claim frequency differences between zip codes",
+     "feature": "postalcode", "metric": "has_claim", "test": "chi2", "top_n": 20},
+    {"id": "2B", "null_hypothesis": "No claim severity differences between zip codes",
+     "feature": "postalcode", "metric": "totalclaims", "test": "anova", "top_n": 20,
+     "positive_only": True},
+    {"id": "3", "null_hypothesis": "No margin (profit) differences between zip codes",
+     "feature": "postalcode", "metric": "margin", "test": "anova", "top_n": 20},
+    {"id": "4A", "null_hypothesis": "No claim frequency differences between Women and Men",
+     "feature": "gender", "metric": "has_claim", "test": "chi2", "groups": ["Male", "Female"]},
+    {"id": "4B", "null_hypothesis": "No claim severity differences between Women and Men",
+     "feature": "gender", "metric": "totalclaims", "test": "ttest", "groups": ["Male", "Female"],
+     "positive_only": True},
+]
+
+
+# ===============================
+# 1. SPECS, FINGERPRINTS, CACHE
+# ===============================
+
+def normalize_spec(spec: dict) -> dict:
+    """
+    Fills defaults for a hypothesis spec:
+    - feature, metric, test ("chi2" | "anova" | "welch_anova" | "kruskal" |
+      "ttest" | "mannwhitney")
+    - groups: explicit levels, or top_n most frequent levels, or all levels
+    - positive_only: restrict to totalclaims > 0 (severity tests)
+    """
+    spec = dict(spec)
+    if spec.get("test") not in TEST_NAMES:
+        raise ValueError(f"Unknown test type {spec.get('test')!r} in {spec}")
+    spec.setdefault("id", f"{spec['feature']}:{spec['metric']}:{spec['test']}")
+    spec.setdefault("null_hypothesis", "")
+    spec.setdefault("groups", None)
+    spec.setdefault("top_n", None)
+    spec.setdefault("positive_only", False)
+    return spec
+
+
+def _cache_key(fingerprint: str, spec: dict) -> str:
+    payload = json.dumps(spec, sort_keys=True, default=str)
+    return hashlib.sha256(f"{fingerprint}|{payload}".encode()).hexdigest()[:32]
+
+
+def _to_builtin(value):
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# ===============================
+# 2. SINGLE HYPOTHESIS
+# ===============================
+
+def _spec_columns(spec: dict) -> list:
+    return list(dict.fromkeys([spec["feature"], spec["metric"]] + (["totalclaims"] if spec["positive_only"] else [])))
+
+
+def _select(df: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    data = df[_spec_columns(spec)]
+
+    if spec["groups"] is not None:
+        levels = list(spec["groups"])
+    elif spec["top_n"]:
+        levels = data[spec["feature"]].value_counts().head(spec["top_n"]).index.tolist()
+    else:
+        levels = None
+
+    if levels is not None:
+        data = data[data[spec["feature"]].isin(levels)]
+    if spec["positive_only"]:
+        data = data[data["totalclaims"] > 0]
+    return data
+
+
+@instrumented
+def run_hypothesis(df: pd.DataFrame, spec: dict) -> dict:
+    """Runs one normalized spec and returns a result record."""
+    from scipy.stats import chi2_contingency, mannwhitneyu
+
+    data = _select(df, spec)
+    feature, metric, test = spec["feature"], spec["metric"], spec["test"]
+
+    grouped = data.groupby(feature, observed=True)[metric]
+    summary = grouped.agg(["count", "mean", "var"])
+    if spec["groups"] is not None:
+        summary = summary.loc[[g for g in spec["groups"] if g in summary.index]]
+    record = {
+        **spec,
+        "test_name": TEST_NAMES[test],
+        "groups_tested": [_to_builtin(g) for g in summary.index],
+        "group_n": summary["count"].tolist(),
+        "group_mean": summary["mean"].tolist(),
+        "dof": None,
+        "effect_name": None,
+        "effect_size": None,
+    }
+
+    if test == "chi2":
+        table = pd.crosstab(data[feature], data[metric])
+        statistic, p_value, dof, _ = chi2_contingency(table)
+        record.update(dof=int(dof), effect_name="cramers_v", effect_size=cramers_v(table))
+    elif test == "anova":
+        statistic, p_value = anova_from_moments(summary["count"], summary["mean"], summary["var"])
+    elif test in ("welch_anova", "kruskal"):
+        result = getattr(KGroupTests(data, feature, metric), test)()
+        statistic, p_value = result["statistic"], result["p_value"]
+        record.update(dof=result["dof"], effect_name=result["effect_name"], effect_size=result["effect_size"])
+    elif len(summary) != 2:
+        raise ValueError(f"{test} needs exactly two groups, got {len(summary)} for {spec['id']}")
+    elif test == "ttest":
+        (n1, m1, v1), (n2, m2, v2) = summary[["count", "mean", "var"]].to_numpy()
+        statistic, p_value = welch_t_from_moments(n1, m1, v1, n2, m2, v2)
+        record.update(effect_name="cohens_d", effect_size=cohens_d_from_moments(m1, v1, m2, v2))
+    else:
+        a, b = (data.loc[data[feature] == level, metric] for level in summary.index)
+        statistic, p_value = mannwhitneyu(a, b, alternative="two-sided")
+
+    record.update(statistic=float(statistic), p_value=float(p_value))
+    return _to_builtin(record)
+
+
+# ===============================
+# 3. POOL WORKERS (memory-mapped frame)
+# ===============================
+
+_SHARED = {}
+
+
+def _init_worker(arrow_path: str):
+    import pyarrow as pa
+
+    # The table stays backed by the memory map; nothing is copied here
+    source = pa.memory_map(arrow_path, "r")
+    _SHARED["table"] = pa.ipc.open_file(source).read_all()
+
+
+def _shared_columns(columns: list) -> pd.DataFrame:
+    """
+    The given columns of the shared table as a DataFrame. Numeric columns
+    without nulls are read-only numpy views of the memory map (zero-copy);
+    other columns (categoricals, booleans, nulls) are converted.
+    """
+    import pyarrow as pa
+
+    table = _SHARED["table"]
+    data = {}
+    for col in columns:
+        chunked = table.column(col)
+        numeric = pa.types.is_integer(chunked.type) or pa.types.is_floating(chunked.type)
+        if numeric and chunked.num_chunks == 1 and chunked.null_count == 0:
+            data[col] = chunked.chunk(0).to_numpy(zero_copy_only=True)
+        else:
+            data[col] = chunked.to_pandas()
+    return pd.DataFrame(data, copy=False)
+
+
+def _worker(spec: dict) -> dict:
+    return run_hypothesis(_shared_columns(_spec_columns(spec)), spec)
+
+
+def _write_shared(df: pd.DataFrame, directory: str) -> str:
+    import pyarrow as pa
+
+    path = os.path.join(directory, "frame.arrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+# ===============================
+# 4. RUNNER
+# ===============================
+
+@instrumented
+def run_hypotheses(
+    df: pd.DataFrame,
+    hypotheses: list,
+    n_jobs: int = 1,
+    cache_dir: Path | str | None = CACHE_DIR,
+    alpha: float = 0.05,
+) -> pd.DataFrame:
+    """
+    Runs a declarative list of hypotheses and returns one record per row.
+
+    - Results are cached as JSON keyed by (data fingerprint, spec), and
+      each is written as soon as it finishes, so an interrupted or
+      restarted session only runs what is missing
+    - n_jobs > 1 runs tests in a process pool; workers share one
+      read-only Arrow IPC copy of the needed columns via memory mapping,
+      and each test reads its numeric columns as zero-copy views of it
+    """
+    specs = [normalize_spec(h) for h in hypotheses]
+    columns = sorted({c for s in specs for c in _spec_columns(s)})
+    frame = df[columns]
+
+    cache = Path(cache_dir) if cache_dir else None
+    fingerprint = data_fingerprint(frame) if cache else None
+
+    records, pending = {}, []
+    for spec in specs:
+        path = cache / f"{_cache_key(fingerprint, spec)}.json" if cache else None
+        if path is not None and path.exists():
+            records[spec["id"]] = {**json.loads(path.read_text()), "cached": True}
+        else:
+            pending.append((spec, path))
+
+    def store(spec, path, record):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(record))
+        records[spec["id"]] = {**record, "cached": False}
+
+    if n_jobs == 1 or len(pending) <= 1:
+        for spec, path in pending:
+            store(spec, path, run_hypothesis(frame, spec))
+    elif pending:
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = _write_shared(frame, tmp)
+            with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(shared,)) as pool:
+                futures = {pool.submit(_worker, spec): (spec, path) for spec, path in pending}
+                for future in as_completed(futures):
+                    store(*futures[future], future.result())
+
+    results = pd.DataFrame([records[s["id"]] for s in specs])
+    results["decision"] = np.where(results["p_value"] < alpha, "REJECT", "FAIL TO REJECT")
+    return results
@@ -0,0 +1,341 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import shutil
+import signal
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .paths import DATA_DIR
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS, tracemalloc only
+    resource = None
+
+RUN_DIR = DATA_DIR / "runs"
+
+# Stages taking at least this share of a run's time are flagged as hot
+HOT_SHARE = 0.2
+
+PROFILERS = ("cprofile", "py-spy")
+
+_ACTIVE = contextvars.ContextVar("instrumentation_run", default=None)
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return np.nan
+    # ru_maxrss is in KB on Linux (bytes on macOS, close enough for deltas there too)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _frame_of(value):
+    """The DataFrame in a stage's argument or result (first of a tuple), if any."""
+    if isinstance(value, pd.DataFrame):
+        return value
+    if isinstance(value, tuple) and value and isinstance(value[0], pd.DataFrame):
+        return value[0]
+    return None
+
+
+# ===============================
+# 1. SPANS
+# ===============================
+
+class Span:
+    """One timed stage call; used through span() / @instrumented."""
+
+    def __init__(self, run: "RunLog", name: str, df=None):
+        self.run = run
+        self.name = name
+        self.parent = run._stack[-1] if run._stack else None
+        self.record = {
+            "stage": name,
+            "parent": self.parent.name if self.parent else None,
+            "depth": len(run._stack),
+            "rows_in": len(df) if df is not None else None,
+            "columns_in": df.shape[1] if df is not None else None,
+            "rows_out": None,
+            "columns_out": None,
+        }
+        self.children_s = 0.0
+        self.peak_seen = 0
+
+    def output(self, df):
+        """Records the rows / columns a stage produced."""
+        frame = _frame_of(df)
+        if frame is not None:
+            self.record["rows_out"] = len(frame)
+            self.record["columns_out"] = frame.shape[1]
+        return df
+
+    def __enter__(self):
+        run = self.run
+        if run.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                self.parent.peak_seen = max(self.parent.peak_seen, peak)
+            tracemalloc.reset_peak()
+            self.start_traced = current
+        self.start_rss = _peak_rss_mb()
+        run._stack.append(self)
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        run = self.run
+        run._stack.pop()
+
+        peak_mb = np.nan
+        if run.trace_memory:
+            peak = max(self.peak_seen, tracemalloc.get_traced_memory()[1])
+            peak_mb = (peak - self.start_traced) / 2 ** 20
+            if self.parent is not None:
+                self.parent.peak_seen = max(self.parent.peak_seen, peak)
+        if self.parent is not None:
+            self.parent.children_s += wall
+
+        self.record.update({
+            "start_s": self.start_wall - run.start_wall,
+            "wall_s": wall,
+            "self_s": wall - self.children_s,
+            "cpu_s": cpu,
+            "peak_mb": peak_mb,
+            "rss_peak_delta_mb": _peak_rss_mb() - self.start_rss,
+            "error": exc_type.__name__ if exc_type else None,
+        })
+        run.records.append(self.record)
+        return False
+
+
+class _NoSpan:
+    def output(self, df):
+        return df
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, df=None):
+    """
+    Context manager timing a block in the active RunLog (a no-op without
+    one); `df` is the input frame, s.output(frame) records the output:
+
+        with span("dedup", df) as s:
+            df = s.output(drop_duplicates(df)[0])
+    """
+    run = _ACTIVE.get()
+    return Span(run, name, _frame_of(df)) if run is not None else _NO_SPAN
+
+
+def instrumented(fn=None, *, name: str | None = None):
+    """
+    Decorator recording each call of a pipeline function in the active
+    RunLog: wall and CPU time, memory, rows/columns of the first DataFrame
+    argument and of the returned frame. Outside a RunLog it only costs one
+    context-variable lookup.
+    """
+    if fn is None:
+        return functools.partial(instrumented, name=name)
+    stage = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        run = _ACTIVE.get()
+        if run is None:
+            return fn(*args, **kwargs)
+        df = next((f for f in map(_frame_of, (*args, *kwargs.values())) if f is not None), None)
+        with Span(run, stage, df) as s:
+            return s.output(fn(*args, **kwargs))
+
+    return wrapper
+
+
+# ===============================
+# 2. RUN LOG
+# ===============================
+
+class RunLog:
+    """
+    Structured log of one pipeline run (load → clean → preprocess → test).
+
+    Inside `with RunLog("clean") as run:` every @instrumented function and
+    span() block appends a record: stage, parent, wall / self / CPU seconds,
+    growth of the process peak RSS, rows and columns in and out.
+    trace_memory=True adds the tracemalloc peak above the stage's starting
+    allocation (slower). profile="cprofile" profiles the whole run
+    (.prof file + top functions in the report); profile="py-spy" samples it
+    with an external py-spy process (flame graph SVG).
+
+    save() writes <run_id>.json (run metadata + records) and <run_id>.csv;
+    report() flags the hottest stages by self time.
+    """
+
+    def __init__(self, name: str = "run", directory: Path | str = RUN_DIR, trace_memory: bool = False,
+                 profile: str | None = None, hot_share: float = HOT_SHARE):
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"profile must be one of {PROFILERS}")
+        self.name = name
+        self.directory = Path(directory)
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.hot_share = hot_share
+        self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}"
+        self.records = []
+        self.profile_path = None
+        self.profile_text = None
+        self._stack = []
+        self._token = None
+
+    # ---------- lifecycle ----------
+
+    def __enter__(self):
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+        else:
+            self._own_tracing = False
+        self._start_profiler()
+        self._token = _ACTIVE.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _ACTIVE.reset(self._token)
+        self._stop_profiler()
+        if self._own_tracing:
+            tracemalloc.stop()
+        self.wall_s = time.perf_counter() - self.start_wall
+        self.cpu_s = time.process_time() - self.start_cpu
+        self.error = exc_type.__name__ if exc_type else None
+        return False
+
+    def _start_profiler(self):
+        self._profiler = None
+        if self.profile == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profile == "py-spy":
+            if shutil.which("py-spy") is None:
+                raise RuntimeError("py-spy is not installed (pip install py-spy)")
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.profile_path = self.directory / f"{self.run_id}.svg"
+            self._profiler = subprocess.Popen(
+                ["py-spy", "record", "--pid", str(os.getpid()), "--output", str(self.profile_path)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+
+    def _stop_profiler(self):
+        if self._profiler is None:
+            return
+        if self.profile == "cprofile":
+            self._profiler.disable()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.profile_path = self.directory / f"{self.run_id}.prof"
+            self._profiler.dump_stats(self.profile_path)
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(20)
+            self.profile_text = out.getvalue()
+        else:
+            # py-spy writes its output when interrupted
+            self._profiler.send_signal(signal.SIGINT)
+            self._profiler.wait(timeout=30)
+
+    # ---------- results ----------
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per recorded call, in order of completion."""
+        records = pd.DataFrame(self.records)
+        if not records.empty:
+            counts = ["rows_in", "columns_in", "rows_out", "columns_out"]
+            records[counts] = records[counts].astype("Int64")
+        return records
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Per stage: calls, total wall / self / CPU seconds, share of the run's
+        wall time (by self time), largest memory figures and the rows of the
+        first call in and the last call out; `hot` marks stages whose share
+        is at least hot_share, and the top stage.
+        """
+        records = self.to_frame()
+        if records.empty:
+            return records
+        grouped = records.groupby("stage", sort=False)
+        table = grouped.agg(
+            calls=("wall_s", "size"),
+            wall_s=("wall_s", "sum"),
+            self_s=("self_s", "sum"),
+            cpu_s=("cpu_s", "sum"),
+            peak_mb=("peak_mb", "max"),
+            rss_peak_delta_mb=("rss_peak_delta_mb", "sum"),
+            rows_in=("rows_in", "first"),
+            rows_out=("rows_out", "last"),
+        )
+        total = getattr(self, "wall_s", None) or records.loc[records["depth"] == 0, "wall_s"].sum()
+        table["share"] = table["self_s"] / total if total else np.nan
+        table = table.sort_values("self_s", ascending=False)
+        table["hot"] = (table["share"] >= self.hot_share) | (np.arange(len(table)) == 0)
+        return table
+
+    def report(self) -> str:
+        lines = [f"Run {self.run_id}: {getattr(self, 'wall_s', np.nan):.3f} s wall, "
+                 f"{getattr(self, 'cpu_s', np.nan):.3f} s CPU, {len(self.records)} stage call(s)"
+                 + (f", failed: {self.error}" if getattr(self, "error", None) else "")]
+        table = self.summary()
+        if not table.empty:
+            lines.append(table.to_string(float_format=lambda v: f"{v:,.3f}"))
+            hot = table[table["hot"]]
+            lines.append("Hottest: " + ", ".join(
+                f"{stage} ({row.share:.0%} of the run)" for stage, row in hot.iterrows()
+            ))
+        if self.profile_path is not None:
+            lines.append(f"Profile: {self.profile_path}")
+        if self.profile_text:
+            lines.append(self.profile_text)
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.report()
+
+    def save(self) -> tuple:
+        """<directory>/<run_id>.json and .csv → their paths."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        records = self.to_frame()
+        json_path = self.directory / f"{self.run_id}.json"
+        csv_path = self.directory / f"{self.run_id}.csv"
+        meta = {
+            "run_id": self.run_id,
+            "name": self.name,
+            "started": getattr(self, "started", None),
+            "wall_s": getattr(self, "wall_s", None),
+            "cpu_s": getattr(self, "cpu_s", None),
+            "error": getattr(self, "error", None),
+            "profile": str(self.profile_path) if self.profile_path else None,
+            "records": json.loads(records.to_json(orient="records")),
+            "hot": self.summary().query("hot").index.tolist() if len(records) else [],
+        }
+        json_path.write_text(json.dumps(meta, indent=2))
+        records.to_csv(csv_path, index=False)
+        return json_path, csv_path
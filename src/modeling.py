@@ -0,0 +1,351 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    mean_absolute_error,
+    mean_squared_error,
+    precision_score,
+    r2_score,
+    recall_score,
+    roc_auc_score,
+)
+from sklearn.model_selection import KFold, ParameterGrid, StratifiedKFold
+
+from .data_loader import DATA_DIR
+from .stage_cache import data_fingerprint
+
+MODEL_DIR = DATA_DIR / "cache" / "models"
+
+# Fold label of the final fit on all training rows, scored on the test set
+TEST_FOLD = "test"
+
+# Metric each task type is ranked by, and whether higher is better
+RANK_METRIC = {"regression": ("rmse", False), "classification": ("roc_auc", True)}
+
+
+# ===============================
+# 1. MATRICES
+# ===============================
+
+def _save_matrix(path: Path, X):
+    """Dense → <path>.npy; CSR → <path>.data/.indices/.indptr/.shape.npy."""
+    if sparse.issparse(X):
+        X = sparse.csr_matrix(X)
+        for part in ("data", "indices", "indptr"):
+            np.save(path.with_name(f"{path.name}.{part}.npy"), getattr(X, part))
+        np.save(path.with_name(f"{path.name}.shape.npy"), np.array(X.shape))
+    else:
+        np.save(path.with_name(f"{path.name}.npy"), np.asarray(X))
+
+
+def _load_matrix(path: Path):
+    """Memory-mapped matrix written by _save_matrix (None if absent)."""
+    dense = path.with_name(f"{path.name}.npy")
+    if dense.exists():
+        return np.load(dense, mmap_mode="r")
+    if not path.with_name(f"{path.name}.shape.npy").exists():
+        return None
+    parts = [np.load(path.with_name(f"{path.name}.{p}.npy"), mmap_mode="r") for p in ("data", "indices", "indptr")]
+    shape = tuple(np.load(path.with_name(f"{path.name}.shape.npy")))
+    return sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+def _rows(X, idx):
+    return X[idx] if sparse.issparse(X) else np.asarray(X[idx])
+
+
+# ===============================
+# 2. METRICS
+# ===============================
+
+def regression_metrics(y_true, y_pred) -> dict:
+    return {
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "r2": float(r2_score(y_true, y_pred)),
+    }
+
+
+def classification_metrics(y_true, proba) -> dict:
+    pred = (proba >= 0.5).astype(int)
+    return {
+        "roc_auc": float(roc_auc_score(y_true, proba)) if len(np.unique(y_true)) > 1 else np.nan,
+        "f1": float(f1_score(y_true, pred, zero_division=0)),
+        "precision": float(precision_score(y_true, pred, zero_division=0)),
+        "recall": float(recall_score(y_true, pred, zero_division=0)),
+        "accuracy": float(accuracy_score(y_true, pred)),
+    }
+
+
+# ===============================
+# 3. WORKER
+# ===============================
+
+def _rss_mb() -> tuple:
+    """(current, peak) resident set size of this process in MB; NaN where unknown."""
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return np.nan, np.nan
+    # No current RSS: the peak stands in for both (growth of the peak only)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return peak, peak
+
+
+def _reset_peak_rss():
+    """Resets the process peak RSS to the current RSS (Linux), so a pool worker measures each task."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _run_task(run_dir: str, task: str, name: str, estimator, fold):
+    """
+    Fits one candidate on one CV fold (or on all training rows for
+    TEST_FOLD) from the memory-mapped matrices → result record.
+    """
+    run_dir = Path(run_dir)
+    X = _load_matrix(run_dir / "X_train")
+    y = np.load(run_dir / "y_train.npy", mmap_mode="r")
+    if fold == TEST_FOLD:
+        X_fit, y_fit = X, np.asarray(y)
+        X_eval = _load_matrix(run_dir / "X_test")
+        y_eval = np.load(run_dir / "y_test.npy")
+    else:
+        folds = np.load(run_dir / "folds.npy")
+        fit_idx, eval_idx = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+        X_fit, y_fit = _rows(X, fit_idx), y[fit_idx]
+        X_eval, y_eval = _rows(X, eval_idx), y[eval_idx]
+
+    # Timed without tracemalloc (its hooks slow the fit down, and it misses
+    # native allocations of sklearn / xgboost): memory is the peak RSS above
+    # the RSS at the start of the task
+    _reset_peak_rss()
+    rss_start, _ = _rss_mb()
+    start = time.perf_counter()
+    model = clone(estimator).fit(X_fit, y_fit)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if task == "classification":
+        pred = model.predict_proba(X_eval)[:, 1]
+    else:
+        pred = model.predict(X_eval)
+    predict_s = time.perf_counter() - start
+    _, rss_peak = _rss_mb()
+
+    metrics = classification_metrics(y_eval, pred) if task == "classification" else regression_metrics(y_eval, pred)
+    if fold == TEST_FOLD:
+        with open(run_dir / f"{name}.model.pkl", "wb") as f:
+            pickle.dump(model, f)
+        np.save(run_dir / f"{name}.pred.npy", pred)
+
+    return {
+        "model": name,
+        "fold": fold,
+        "fit_s": fit_s,
+        "predict_s": predict_s,
+        "peak_mb": max(rss_peak - rss_start, 0.0),
+        "n_fit": len(y_fit),
+        "n_eval": len(y_eval),
+        **metrics,
+    }
+
+
+# ===============================
+# 4. HARNESS
+# ===============================
+
+def expand_grid(name: str, estimator, param_grid: dict) -> dict:
+    """GridSearchCV-style candidates: {"name[a=1,b=2]": estimator with those params}."""
+    candidates = {}
+    for params in ParameterGrid(param_grid):
+        label = ",".join(f"{k}={v}" for k, v in sorted(params.items()))
+        candidates[f"{name}[{label}]"] = clone(estimator).set_params(**params)
+    return candidates
+
+
+def _config_hash(estimator) -> str:
+    """
+    Hash of an estimator's full configuration (get_params(deep=True),
+    nested estimators included). repr() is not usable as a key: sklearn
+    shortens long reprs, so different pipelines can print the same.
+    """
+    return joblib.hash(estimator.get_params(deep=True))
+
+
+class TrainingHarness:
+    """
+    Cached, parallel model comparison for one prepared dataset.
+
+    prepare() fits the preprocessor once and stores the transformed train /
+    test matrices and the CV fold assignment under MODEL_DIR, keyed by the
+    data and preprocessor; workers memory-map them instead of receiving
+    copies. run() fits every (candidate, fold) pair plus a final fit per
+    candidate on all training rows scored on the test set, in a pool of
+    max_workers processes, and appends each finished task to
+    results.jsonl, so an interrupted sweep resumes from the last completed
+    fold. Candidates whose estimator parameters change are re-run.
+    """
+
+    def __init__(self, task: str = "regression", n_splits: int = 5, max_workers: int | None = None,
+                 root: Path | str = MODEL_DIR, random_state: int = 42):
+        if task not in RANK_METRIC:
+            raise ValueError(f"task must be one of {list(RANK_METRIC)}")
+        self.task = task
+        self.n_splits = n_splits
+        self.max_workers = max_workers or os.cpu_count()
+        self.root = Path(root)
+        self.random_state = random_state
+        self.run_dir = None
+        self.preprocessor = None
+
+    # ---------- data ----------
+
+    def prepare(self, preprocessor, X_train: pd.DataFrame, y_train, X_test: pd.DataFrame, y_test,
+                fingerprint: str | None = None) -> Path:
+        """Fits the preprocessor on the training rows once; reuses stored matrices if present."""
+        y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+        if fingerprint is None:
+            fingerprint = data_fingerprint(X_train) + data_fingerprint(X_test)
+        payload = json.dumps(
+            {
+                "data": fingerprint,
+                "y": hashlib.sha256(y_train.tobytes() + y_test.tobytes()).hexdigest(),
+                "preprocessor": _config_hash(preprocessor),
+                "task": self.task,
+                "folds": [self.n_splits, self.random_state],
+            },
+            sort_keys=True,
+        )
+        self.run_dir = self.root / hashlib.sha256(payload.encode()).hexdigest()[:32]
+        fitted = self.run_dir / "preprocessor.pkl"
+
+        if fitted.exists():
+            with open(fitted, "rb") as f:
+                self.preprocessor = pickle.load(f)
+            return self.run_dir
+
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.preprocessor = clone(preprocessor)
+        _save_matrix(self.run_dir / "X_train", self.preprocessor.fit_transform(X_train, y_train))
+        _save_matrix(self.run_dir / "X_test", self.preprocessor.transform(X_test))
+        np.save(self.run_dir / "y_train.npy", y_train)
+        np.save(self.run_dir / "y_test.npy", y_test)
+
+        splitter_cls = StratifiedKFold if self.task == "classification" else KFold
+        splitter = splitter_cls(self.n_splits, shuffle=True, random_state=self.random_state)
+        folds = np.empty(len(y_train), dtype=np.int64)
+        for fold, (_, rows) in enumerate(splitter.split(np.zeros(len(y_train)), y_train)):
+            folds[rows] = fold
+        np.save(self.run_dir / "folds.npy", folds)
+
+        # Written last: its presence marks a complete preparation
+        with open(fitted, "wb") as f:
+            pickle.dump(self.preprocessor, f)
+        return self.run_dir
+
+    def feature_names(self) -> list:
+        return self.preprocessor.get_feature_names_out().tolist()
+
+    # ---------- runs ----------
+
+    def _results_file(self) -> Path:
+        return self.run_dir / "results.jsonl"
+
+    def _completed(self) -> dict:
+        path = self._results_file()
+        if not path.exists():
+            return {}
+        records = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+        return {(r["model"], r["params"], str(r["fold"])): r for r in records}
+
+    def run(self, models: dict, cv: bool = True) -> pd.DataFrame:
+        """
+        Fits each candidate ({name: estimator}, see expand_grid) on every
+        CV fold (cv=True) and on all training rows → results table with
+        fit/predict seconds, peak RSS growth (peak_mb) and metrics per
+        (model, fold).
+        """
+        if self.run_dir is None:
+            raise RuntimeError("call prepare() before run()")
+        done = self._completed()
+        folds = (list(range(self.n_splits)) if cv else []) + [TEST_FOLD]
+
+        pending = []
+        for name, estimator in models.items():
+            params = _config_hash(estimator)
+            for fold in folds:
+                if (name, params, str(fold)) not in done:
+                    pending.append((name, params, estimator, fold))
+
+        if pending:
+            workers = max(1, min(self.max_workers, len(pending)))
+            with ProcessPoolExecutor(max_workers=workers) as pool, open(self._results_file(), "a") as out:
+                futures = {
+                    pool.submit(_run_task, str(self.run_dir), self.task, name, estimator, fold): params
+                    for name, params, estimator, fold in pending
+                }
+                for future in as_completed(futures):
+                    record = {**future.result(), "params": futures[future]}
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+
+        current = {(name, _config_hash(est)) for name, est in models.items()}
+        records = [r for r in self._completed().values() if (r["model"], r["params"]) in current]
+        return pd.DataFrame(records).drop(columns="params")
+
+    def summary(self, results: pd.DataFrame) -> pd.DataFrame:
+        """Per model: mean and std of CV metrics and timings, the test-set metrics, best first."""
+        cv = results[results["fold"] != TEST_FOLD]
+        test = results[results["fold"] == TEST_FOLD].set_index("model")
+        metric, higher = RANK_METRIC[self.task]
+        numeric = [c for c in results.columns if c not in ("model", "fold", "n_fit", "n_eval")]
+
+        table = test[numeric].add_prefix("test_")
+        if len(cv):
+            stats = cv.groupby("model")[numeric].agg(["mean", "std"])
+            stats.columns = [f"cv_{col}_{stat}" for col, stat in stats.columns]
+            table = stats.join(table, how="outer")
+            order = f"cv_{metric}_mean"
+        else:
+            order = f"test_{metric}"
+        return table.sort_values(order, ascending=not higher)
+
+    def model(self, name: str):
+        """The candidate fitted on all training rows."""
+        with open(self.run_dir / f"{name}.model.pkl", "rb") as f:
+            return pickle.load(f)
+
+    def predictions(self, name: str) -> np.ndarray:
+        """Test-set predictions (probabilities for classification)."""
+        return np.load(self.run_dir / f"{name}.pred.npy")
+
+    def matrices(self) -> tuple:
+        """(X_train, y_train, X_test, y_test), memory-mapped."""
+        return (
+            _load_matrix(self.run_dir / "X_train"),
+            np.load(self.run_dir / "y_train.npy", mmap_mode="r"),
+            _load_matrix(self.run_dir / "X_test"),
+            np.load(self.run_dir / "y_test.npy", mmap_mode="r"),
+        )
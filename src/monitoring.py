@@ -0,0 +1,245 @@
+"""
+Monthly loss-ratio monitoring from an append-only store of per-month,
+per-segment aggregates.
+
+    acis-monitor build                   # from data/clean_data.parquet
+    acis-monitor append new_month.parquet
+    acis-monitor show --by province --window 3
+    python -m src.monitoring show        # same, without installing
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .data_loader import DATA_DIR, load_data
+from .stage_cache import data_fingerprint
+from .stats_cube import MEASURES, _cells, _from_sumsq, _rollup
+
+MONITOR_DIR = DATA_DIR / "monitoring"
+
+# Segment columns kept per month (moderate cardinality, so the store stays
+# a few thousand rows per month)
+DEFAULT_SEGMENTS = ["province", "covertype", "vehicletype", "gender"]
+
+# Output columns of MonthlyMonitor.series
+SERIES = [
+    "policies",
+    "claim_count",
+    "premium",
+    "claims",
+    "loss_ratio",
+    "claim_frequency",
+    "claim_severity",
+]
+
+PARTITION_FILE = "cells.parquet"
+
+# Parquet metadata key of a partition: fingerprints of the batches added to it
+SOURCES_KEY = b"acis.sources"
+
+
+def _month_dir(root: Path, month: pd.Timestamp) -> Path:
+    return root / f"month={month:%Y-%m}"
+
+
+class MonthlyMonitor:
+    """
+    Append-only columnar store of stats_cube measures per (month, segment).
+
+    Each transaction month is one Parquet partition (<root>/month=YYYY-MM/).
+    append() aggregates only the incoming rows and rewrites only the months
+    they fall in (adding to what is stored, or replacing it), so the cost
+    of a new month does not depend on the length of history. Each partition
+    records the fingerprints of the batches added to it, so appending the
+    same rows again (a retried job) is skipped instead of double-counted.
+    Missing segment values are kept as nulls, apart from any level. series()
+    answers from the aggregates alone: the store holds months × segment
+    combinations, not policies, and is cached in memory until a partition
+    changes on disk.
+    """
+
+    def __init__(self, root: Path | str = MONITOR_DIR, segments=None):
+        self.root = Path(root)
+        self.segments = list(segments or DEFAULT_SEGMENTS)
+        self._cache = None
+        self._cache_key = None
+
+    # ---------- writing ----------
+
+    def _aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        segments = [c for c in self.segments if c in df.columns]
+        missing = set(self.segments) - set(segments)
+        if missing:
+            raise ValueError(f"rows lack segment columns: {sorted(missing)}")
+        cells = _cells(df, ["month"] + segments).reset_index()
+        for col in segments:
+            # Plain strings (categories of different months do not align);
+            # missing values stay null rather than becoming the string "None"
+            values = cells[col].astype(object)
+            cells[col] = values.astype(str).where(values.notna(), None)
+        return cells
+
+    def _read_partition(self, month: pd.Timestamp) -> tuple:
+        """(cells, source fingerprints) of a stored month, or (None, [])."""
+        path = _month_dir(self.root, month) / PARTITION_FILE
+        if not path.exists():
+            return None, []
+        table = pq.read_table(path)
+        sources = json.loads((table.schema.metadata or {}).get(SOURCES_KEY, b"[]"))
+        return _from_sumsq(table.to_pandas()), sources
+
+    def _write_partition(self, month: pd.Timestamp, cells: pd.DataFrame, sources: list):
+        directory = _month_dir(self.root, month)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{PARTITION_FILE}.tmp"
+        table = pa.Table.from_pandas(cells, preserve_index=False)
+        table = table.replace_schema_metadata({**table.schema.metadata, SOURCES_KEY: json.dumps(sources)})
+        pq.write_table(table, tmp)
+        # Readers see either the old or the new partition, never half of one
+        os.replace(tmp, directory / PARTITION_FILE)
+
+    def append(self, df: pd.DataFrame, replace: bool = False) -> list:
+        """
+        Adds the rows of df (any months) to the store: each month's cells
+        are merged into its partition, or overwrite it with replace=True
+        (e.g. a restated month). A month whose rows were already added
+        (same aggregates, e.g. a retried job) is skipped. Returns the
+        months written.
+        """
+        cells = self._aggregate(df)
+        written = []
+        for month, new in cells.groupby("month", sort=True):
+            new = new.drop(columns="month").reset_index(drop=True)
+            source = data_fingerprint(new)
+            stored, sources = (None, []) if replace else self._read_partition(month)
+            if source in sources:
+                continue
+            if stored is not None:
+                new = pd.concat([stored, new], ignore_index=True)
+                new = _rollup(new, self.segments, sort=False, dropna=False).reset_index()
+            self._write_partition(month, new, sources + [source])
+            written.append(month)
+        return written
+
+    def rebuild(self, df: pd.DataFrame) -> list:
+        """Replaces every month present in df (e.g. from the full cleaned artifact)."""
+        return self.append(df, replace=True)
+
+    # ---------- reading ----------
+
+    def _partitions(self) -> list:
+        return sorted(self.root.glob(f"month=*/{PARTITION_FILE}"))
+
+    def months(self) -> list:
+        return [pd.Timestamp(p.parent.name.split("=", 1)[1]) for p in self._partitions()]
+
+    def cells(self) -> pd.DataFrame:
+        """All stored cells with a month column; re-read only after a partition changed."""
+        partitions = self._partitions()
+        key = tuple((p, p.stat().st_mtime_ns) for p in partitions)
+        if key != self._cache_key:
+            if partitions:
+                dataset = ds.dataset(self.root, format="parquet", partitioning="hive")
+                cells = dataset.to_table().to_pandas()
+                cells["month"] = pd.to_datetime(cells["month"].astype(str))
+            else:
+                cells = pd.DataFrame(columns=["month"] + self.segments + MEASURES)
+            self._cache, self._cache_key = cells, key
+        return self._cache
+
+    def series(self, by=None, filters: dict | None = None, window: int | None = None,
+               cumulative: bool = False) -> pd.DataFrame:
+        """
+        SERIES per month (and per `by` segment), from the stored cells:
+        - filters: {segment column: value or list of values; None selects missing}
+        - window: rolling sums over that many months before the ratios
+        - cumulative: running sums from the first month
+        Ratios are taken of the summed measures, so rolling and cumulative
+        loss ratio, frequency and severity are exact, not means of ratios.
+        Months without rows count as zero in the windows. policies counts
+        policy-month records (the exposure of segment_metrics).
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        cells = self.cells()
+        if filters:
+            mask = np.ones(len(cells), dtype=bool)
+            for col, value in filters.items():
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                mask &= cells[col].isin([None if v is None else str(v) for v in values]).to_numpy()
+            cells = cells[mask]
+
+        # Only counts and sums are needed here, and those add up across months
+        sums = cells.groupby(by + ["month"], sort=True, dropna=False)[[m for m in MEASURES if not m.endswith("_m2")]].sum()
+        if by:
+            months = pd.DatetimeIndex(self.months(), name="month")
+            full = pd.MultiIndex.from_tuples(
+                [(*(g if isinstance(g, tuple) else (g,)), m)
+                 for g in sums.index.droplevel("month").unique() for m in months],
+                names=by + ["month"],
+            )
+            sums = sums.reindex(full, fill_value=0)
+            grouped = sums.groupby(level=by, sort=False)
+            if window:
+                sums = grouped.rolling(window, min_periods=1).sum().droplevel(list(range(len(by))))
+            elif cumulative:
+                sums = grouped.cumsum()
+        else:
+            sums = sums.reindex(pd.DatetimeIndex(self.months(), name="month"), fill_value=0)
+            if window:
+                sums = sums.rolling(window, min_periods=1).sum()
+            elif cumulative:
+                sums = sums.cumsum()
+
+        out = pd.DataFrame(index=sums.index)
+        # Rolling sums come back as floats; counts stay integers
+        out["policies"] = sums["n"].round().astype("int64")
+        out["claim_count"] = sums["claims"].round().astype("int64")
+        out["premium"] = sums["premium_sum"]
+        # margin = premium - claims per row, so the claims total is their difference
+        out["claims"] = sums["premium_sum"] - sums["margin_sum"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["loss_ratio"] = out["claims"] / out["premium"]
+            out["claim_frequency"] = sums["claims"] / sums["n"]
+            out["claim_severity"] = sums["severity_sum"] / sums["severity_n"]
+        return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monthly loss-ratio monitoring store.")
+    parser.add_argument("--root", default=str(MONITOR_DIR))
+    parser.add_argument("--segments", nargs="*", default=DEFAULT_SEGMENTS)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="(Re)build every month from a cleaned artifact")
+    build.add_argument("source", nargs="?", default="clean_data.parquet")
+    add = sub.add_parser("append", help="Add new rows; only their months are rewritten")
+    add.add_argument("source", help="Cleaned Parquet file / dataset with the new rows")
+    add.add_argument("--replace", action="store_true", help="Overwrite the months instead of adding")
+    show = sub.add_parser("show", help="Print the monthly series")
+    show.add_argument("--by", nargs="*", default=None)
+    show.add_argument("--window", type=int, default=None)
+    show.add_argument("--cumulative", action="store_true")
+    args = parser.parse_args(argv)
+
+    monitor = MonthlyMonitor(args.root, args.segments)
+    if args.command == "show":
+        print(monitor.series(args.by, window=args.window, cumulative=args.cumulative).to_string())
+        return
+
+    columns = ["transactionmonth", "totalpremium", "totalclaims"] + args.segments
+    df = load_data(args.source, usecols=columns)
+    written = monitor.rebuild(df) if args.command == "build" else monitor.append(df, replace=args.replace)
+    print(f"Wrote {len(written)} month(s) to {monitor.root}: "
+          f"{', '.join(f'{m:%Y-%m}' for m in written) or 'none (already added)'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+k-group tests straight from factorized group codes: classic and Welch
+one-way ANOVA from grouped moments, Kruskal-Wallis from one global rank
+pass, and vectorized Dunn / Games-Howell post-hoc comparisons of every
+pair of groups.
+
+    tests = KGroupTests(df, "postalcode", "totalclaims", where=df["totalclaims"] > 0)
+    tests.welch_anova(), tests.kruskal()
+    tests.dunn().query("reject")
+
+No per-group arrays are materialized, so every postal code of the full
+frame can be tested at once instead of the top 20.
+"""
+import numpy as np
+import pandas as pd
+
+from .Hypothesis_helper import adjust_pvalues
+from .statistical_tests import anova_from_moments, grouped_moments
+
+TEST_NAMES = {
+    "anova": "One-Way ANOVA",
+    "welch_anova": "Welch's ANOVA",
+    "kruskal": "Kruskal-Wallis H Test",
+    "dunn": "Dunn's Test",
+    "games_howell": "Games-Howell Test",
+}
+
+# Groups with fewer rows are left out of every test (no variance)
+DEFAULT_MIN_N = 2
+
+
+# ===============================
+# 1. STUDENTIZED RANGE TAIL
+# ===============================
+
+# scipy's studentized_range.sf integrates numerically per point (~10 ms
+# each at finite dof), far too slow for hundreds of thousands of pairs.
+# Its dof = inf limit is cheap, so the finite-dof tail is obtained by
+# integrating that limit over the distribution of s / sigma, once per k on
+# a (dof, q) grid, and interpolated in log-log space per pair.
+_SR_DOF = np.geomspace(1, 1e5, 101)
+_SR_Q = np.geomspace(1e-2, 1e4, 600)
+_SR_S = 401
+_SR_TABLES = {}
+
+
+def _log_sf_inf(k: int) -> np.ndarray:
+    from scipy.stats import studentized_range
+
+    live = _SR_Q < 60  # beyond this the dof = inf tail underflows for any k
+    sf = np.zeros(len(_SR_Q))
+    sf[live] = studentized_range.sf(_SR_Q[live], k, np.inf)
+    return np.log(np.clip(sf, 1e-300, 1.0))
+
+
+def _studentized_range_table(k: int) -> np.ndarray:
+    """log P(Q > q) for rows _SR_DOF + [inf] and columns _SR_Q."""
+    from scipy.stats import chi2
+
+    table = _SR_TABLES.get(k)
+    if table is not None:
+        return table
+    log_q = np.log(_SR_Q)
+    log_inf = _log_sf_inf(k)
+    rows = []
+    for dof in _SR_DOF:
+        # s = sqrt(chi2_dof / dof) on a log grid covering all but 1e-12 of its mass
+        lo, hi = np.sqrt(chi2.ppf([1e-12, 1 - 1e-12], dof) / dof)
+        t = np.linspace(np.log(lo), np.log(hi), _SR_S)
+        s = np.exp(t)
+        weight = np.exp(chi2.logpdf(dof * s * s, dof)) * 2 * dof * s * s  # density in t
+        weight /= weight.sum()
+        x = log_q[:, None] + t[None, :]
+        inner = np.exp(np.interp(x, log_q, log_inf, left=0.0, right=-690.0))
+        rows.append(inner @ weight)
+    table = np.log(np.clip(np.vstack(rows + [np.exp(log_inf)]), 1e-300, 1.0))
+    _SR_TABLES[k] = table
+    return table
+
+
+def studentized_range_sf(q, k: int, dof) -> np.ndarray:
+    """
+    Vectorized P(Q > q) of the studentized range of k means with `dof`
+    degrees of freedom (arrays broadcast); matches scipy's
+    studentized_range.sf to within 1% relative error for p-values above 1e-9.
+    """
+    q, dof = np.broadcast_arrays(np.asarray(q, dtype=float), np.asarray(dof, dtype=float))
+    table = _studentized_range_table(k)
+    log_q = np.log(_SR_Q)
+
+    # Fractional positions in the (uniform in log) q and dof grids
+    x = (np.log(np.maximum(q, 1e-300)) - log_q[0]) / (log_q[1] - log_q[0])
+    log_dof = np.log(_SR_DOF)
+    y = (np.log(np.clip(dof, _SR_DOF[0], _SR_DOF[-1])) - log_dof[0]) / (log_dof[1] - log_dof[0])
+    y = np.where(dof > _SR_DOF[-1], len(_SR_DOF), y)  # dof above the grid: inf row
+    missing = np.isnan(q) | np.isnan(dof)  # e.g. Welch dof of two zero-variance groups
+    x, y = np.where(missing, 0.0, x), np.where(missing, 0.0, y)
+
+    last = len(_SR_Q) - 1
+    x0 = np.clip(np.floor(x), 0, last - 1).astype(np.intp)
+    # Past the last q node the tail is extrapolated linearly in log-log (power law)
+    fx = x - x0
+
+    def row(yi):
+        return table[yi, x0] + fx * (table[yi, x0 + 1] - table[yi, x0])
+
+    # Quadratic in log dof through the three nearest finite-dof rows: the
+    # far tail is convex in dof, and linear interpolation between rows
+    # underestimates it by over 1% at small dof
+    y0 = np.clip(np.rint(y) - 1, 0, len(_SR_DOF) - 3).astype(np.intp)
+    t = y - y0
+    log_sf = (row(y0) * (t - 1) * (t - 2) / 2 - row(y0 + 1) * t * (t - 2)
+              + row(y0 + 2) * t * (t - 1) / 2)
+    log_sf = np.where(y >= len(_SR_DOF), row(len(_SR_DOF)), log_sf)  # inf row
+    sf = np.where(log_sf < np.log(1e-300), 0.0, np.exp(np.minimum(log_sf, 0.0)))
+    return np.where(missing, np.nan, np.where(x < 0, 1.0, sf))
+
+
+# ===============================
+# 2. K-GROUP TESTS
+# ===============================
+
+class KGroupTests:
+    """
+    One metric compared across the groups of one column.
+
+    The frame is reduced once to (group code, value) arrays: NaN values and
+    groups are dropped, `groups` keeps only those levels, `where` (boolean
+    mask) selects rows, and groups with fewer than min_n rows are left out.
+    Moments (three bincounts) and ranks (one global sort) are computed on
+    first use and shared by every test and post-hoc comparison.
+    """
+
+    def __init__(self, df: pd.DataFrame, group_col: str, metric: str, groups=None, where=None,
+                 min_n: int = DEFAULT_MIN_N):
+        self.group_col = group_col
+        self.metric = metric
+
+        codes, levels = pd.factorize(df[group_col], sort=True)
+        values = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype=float)
+        valid = (codes >= 0) & ~np.isnan(values)
+        if where is not None:
+            valid &= np.asarray(where, dtype=bool)
+        if groups is not None:
+            valid &= np.isin(codes, levels.get_indexer(list(groups)))
+        codes, values = codes[valid], values[valid]
+
+        counts = np.bincount(codes, minlength=len(levels))
+        kept = np.flatnonzero(counts >= min_n)
+        recode = np.full(len(levels), -1, dtype=np.intp)
+        recode[kept] = np.arange(len(kept))
+        codes = recode[codes]
+        keep = codes >= 0
+
+        self.codes = codes[keep]
+        self.values = values[keep]
+        self.levels = levels[kept]
+        self.k = len(kept)
+        self.n_total = len(self.values)
+        self._moments = None
+        self._ranks = None
+
+    # ---------- shared passes ----------
+
+    @property
+    def moments(self) -> tuple:
+        """(n, mean, var) per group."""
+        if self._moments is None:
+            self._moments = grouped_moments(self.codes, self.values, self.k)
+        return self._moments
+
+    @property
+    def ranks(self) -> tuple:
+        """(rank sum per group, tie term sum(t^3 - t)) of one global sort with average ranks."""
+        if self._ranks is None:
+            order = np.argsort(self.values, kind="stable")
+            ordered = self.values[order]
+            first = np.r_[True, ordered[1:] != ordered[:-1]]
+            starts = np.flatnonzero(first)
+            ties = np.diff(np.r_[starts, self.n_total]).astype(float)
+            average = starts + (ties + 1) / 2
+            run = np.cumsum(first) - 1
+            rank_sums = np.bincount(self.codes[order], weights=average[run], minlength=self.k)
+            self._ranks = rank_sums, float((ties ** 3 - ties).sum())
+        return self._ranks
+
+    def summary(self) -> pd.DataFrame:
+        n, mean, var = self.moments
+        return pd.DataFrame({
+            "n": n.astype(int),
+            "mean": mean,
+            "var": var,
+            "mean_rank": self.ranks[0] / n,
+        }, index=pd.Index(self.levels, name=self.group_col))
+
+    def _result(self, test: str, statistic, p_value, dof, effect_name, effect_size, k=None) -> dict:
+        return {
+            "test_name": TEST_NAMES[test],
+            "groups_tested": self.k if k is None else k,
+            "n": self.n_total,
+            "statistic": float(statistic),
+            "p_value": float(p_value),
+            "dof": [float(d) for d in dof],
+            "effect_name": effect_name,
+            "effect_size": float(effect_size),
+        }
+
+    def _check(self):
+        if self.k < 2:
+            raise ValueError(f"need at least two groups of {self.group_col!r}, got {self.k}")
+
+    # ---------- omnibus tests ----------
+
+    def _eta_squared(self) -> float:
+        n, mean, var = self.moments
+        grand = (n * mean).sum() / n.sum()
+        between = (n * (mean - grand) ** 2).sum()
+        within = ((n - 1) * var).sum()
+        return between / (between + within) if between + within > 0 else 0.0
+
+    def anova(self) -> dict:
+        """Classic one-way ANOVA (equal variances) with eta squared."""
+        self._check()
+        statistic, p_value = anova_from_moments(*self.moments)
+        return self._result("anova", statistic, p_value, (self.k - 1, self.n_total - self.k),
+                            "eta_squared", self._eta_squared())
+
+    def welch_anova(self) -> dict:
+        """
+        Welch's one-way ANOVA (unequal variances) with eta squared. Groups
+        with zero variance (infinite weight) are left out, like groups below
+        min_n; with fewer than two groups left the statistic is NaN.
+        """
+        from scipy.stats import f as f_dist
+
+        self._check()
+        n, mean, var = self.moments
+        live = var > 0
+        n, mean, var = n[live], mean[live], var[live]
+        k = int(live.sum())
+        if k < 2:
+            return self._result("welch_anova", np.nan, np.nan, (np.nan, np.nan),
+                                "eta_squared", self._eta_squared(), k=k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w = n / var
+            weighted = (w * mean).sum() / w.sum()
+            between = (w * (mean - weighted) ** 2).sum() / (k - 1)
+            tmp = ((1 - w / w.sum()) ** 2 / (n - 1)).sum()
+            statistic = between / (1 + 2 * (k - 2) * tmp / (k ** 2 - 1))
+            dof2 = (k ** 2 - 1) / (3 * tmp)
+        return self._result("welch_anova", statistic, f_dist.sf(statistic, k - 1, dof2), (k - 1, dof2),
+                            "eta_squared", self._eta_squared(), k=k)
+
+    def kruskal(self) -> dict:
+        """Kruskal-Wallis H with tie correction and epsilon squared."""
+        from scipy.stats import chi2
+
+        self._check()
+        n = self.moments[0]
+        rank_sums, tie_term = self.ranks
+        total = self.n_total
+        h = 12 / (total * (total + 1)) * (rank_sums ** 2 / n).sum() - 3 * (total + 1)
+        correction = 1 - tie_term / (total ** 3 - total)
+        h = h / correction if correction > 0 else 0.0
+        return self._result("kruskal", h, chi2.sf(h, self.k - 1), (self.k - 1,),
+                            "epsilon_squared", h / (total - 1))
+
+    # ---------- post-hoc pairs ----------
+
+    def _pairs(self, statistic, p_value, p_adjusted, alpha, extra) -> pd.DataFrame:
+        ia, ib = self._pair_index
+        n = self.moments[0]
+        results = pd.DataFrame({
+            "group_a_name": self.levels[ia],
+            "group_b_name": self.levels[ib],
+            "group_a_n": n[ia].astype(int),
+            "group_b_n": n[ib].astype(int),
+            **extra,
+            "statistic": statistic,
+            "p_value": p_value,
+            "p_adjusted": p_adjusted,
+        })
+        results["reject"] = results["p_adjusted"] < alpha
+        return results
+
+    @property
+    def _pair_index(self) -> tuple:
+        return np.triu_indices(self.k, k=1)
+
+    def dunn(self, correction: str | None = "holm", alpha: float = 0.05) -> pd.DataFrame:
+        """
+        Dunn's z-test on mean ranks for every pair of groups (tie-corrected),
+        p-values adjusted across pairs ('holm', 'bh' or None).
+        """
+        from scipy.stats import norm
+
+        self._check()
+        ia, ib = self._pair_index
+        n = self.moments[0]
+        rank_sums, tie_term = self.ranks
+        mean_rank = rank_sums / n
+        total = self.n_total
+        scale = total * (total + 1) / 12 - tie_term / (12 * (total - 1))
+        z = (mean_rank[ia] - mean_rank[ib]) / np.sqrt(scale * (1 / n[ia] + 1 / n[ib]))
+        p_value = 2 * norm.sf(np.abs(z))
+        p_adjusted = adjust_pvalues(p_value, correction) if correction else p_value
+        extra = {"group_a_mean_rank": mean_rank[ia], "group_b_mean_rank": mean_rank[ib]}
+        return self._pairs(z, p_value, p_adjusted, alpha, extra)
+
+    def games_howell(self, alpha: float = 0.05) -> pd.DataFrame:
+        """
+        Games-Howell comparison of means for every pair of groups (unequal
+        variances, Welch dof, studentized range p-values: already adjusted
+        for the k(k-1)/2 comparisons). Pairs of two zero-variance groups
+        have no standard error: their q and p-value are NaN.
+        """
+        self._check()
+        ia, ib = self._pair_index
+        n, mean, var = self.moments
+        va, vb = var[ia] / n[ia], var[ib] / n[ib]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diff = mean[ib] - mean[ia]
+            q = np.where(va + vb > 0, np.abs(diff) / np.sqrt((va + vb) / 2), np.nan)
+            dof = (va + vb) ** 2 / (va ** 2 / (n[ia] - 1) + vb ** 2 / (n[ib] - 1))
+        p_value = studentized_range_sf(q, self.k, dof)
+        extra = {"group_a_mean": mean[ia], "group_b_mean": mean[ib], "mean_diff": diff, "dof": dof}
+        return self._pairs(q, p_value, p_value, alpha, extra)
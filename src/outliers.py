@@ -0,0 +1,269 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .sketches import QuantileSketch
+
+# Segment key of the caps fitted on all rows
+ALL = "__all__"
+
+# Segments with fewer rows are capped with the all-rows caps
+DEFAULT_MIN_ROWS = 100
+
+
+def numeric_columns(df: pd.DataFrame, exclude=()) -> list:
+    """Numeric, non-boolean columns (every int/float width the dtype plan produces)."""
+    return [
+        col for col in df.columns
+        if col not in exclude
+        and pd.api.types.is_numeric_dtype(df[col])
+        and not pd.api.types.is_bool_dtype(df[col])
+    ]
+
+
+def _segment_key(value):
+    """JSON-safe segment key (numpy scalars → Python, tuples → lists)."""
+    if isinstance(value, tuple):
+        return [_segment_key(v) for v in value]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class Winsorizer:
+    """
+    Caps numeric columns at their [lower, upper] quantiles, overall or per
+    segment (e.g. by="covertype").
+
+    fit / partial_fit scan the frame once: rows are grouped by segment with
+    one factorize + stable sort, and each (segment, column) slice updates a
+    mergeable sketches.QuantileSketch, next to an all-rows sketch per column.
+    Sketches from separate chunks or months merge, and save / load persist
+    them, so new data is capped consistently with history (and history can
+    be extended) without rescanning it. exact=True computes exact pandas
+    quantiles instead; its caps can be saved, but not merged or updated.
+
+    Segments with fewer than min_rows rows, unseen segments and missing
+    segment values use the all-rows caps. Integer columns keep their dtype
+    (caps rounded inwards).
+    """
+
+    def __init__(self, lower: float = 0.01, upper: float = 0.99, columns=None, by=None,
+                 exact: bool = False, k: int = 2048, min_rows: int = DEFAULT_MIN_ROWS):
+        self.lower = lower
+        self.upper = upper
+        self.columns = columns
+        self.by = [by] if isinstance(by, str) else list(by or [])
+        self.exact = exact
+        self.k = k
+        self.min_rows = min_rows
+        self.sketches = {}   # segment → {column: QuantileSketch}
+        self.counts = {}     # segment → rows
+        self._caps = None    # segment → (lower, upper) arrays over columns
+
+    # ---------- fitting ----------
+
+    def _columns(self, df: pd.DataFrame) -> list:
+        if self.columns is None:
+            self.columns = numeric_columns(df, exclude=self.by)
+        return list(self.columns)
+
+    def _segments(self, df: pd.DataFrame):
+        """(codes, levels) of the segment key per row; -1 for missing."""
+        if len(self.by) == 1:
+            codes, levels = pd.factorize(df[self.by[0]], sort=True)
+            return codes, list(levels)
+        key = pd.MultiIndex.from_frame(df[self.by])
+        codes, levels = pd.factorize(key, sort=True)
+        return codes, list(levels)
+
+    def partial_fit(self, df: pd.DataFrame) -> "Winsorizer":
+        """Adds a chunk to the sketches."""
+        if self.exact:
+            raise ValueError("exact caps cannot be updated; use fit() or exact=False")
+        columns = self._columns(df)
+        values = {col: df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in columns}
+
+        slices = [(ALL, slice(None), len(df))]
+        if self.by:
+            codes, levels = self._segments(df)
+            order = np.argsort(codes, kind="stable")
+            starts = np.searchsorted(codes[order], np.arange(len(levels) + 1))
+            slices += [
+                (levels[i], order[starts[i]: starts[i + 1]], starts[i + 1] - starts[i])
+                for i in range(len(levels))
+            ]
+
+        for segment, rows, n in slices:
+            sketches = self.sketches.setdefault(segment, {})
+            for col in columns:
+                sketches.setdefault(col, QuantileSketch(k=self.k)).update(values[col][rows])
+            self.counts[segment] = self.counts.get(segment, 0) + int(n)
+        self._caps = None
+        return self
+
+    def fit(self, df: pd.DataFrame) -> "Winsorizer":
+        self.sketches, self.counts, self._caps = {}, {}, None
+        if not self.exact:
+            return self.partial_fit(df)
+
+        columns = self._columns(df)
+        q = [self.lower, self.upper]
+        frames = {ALL: df[columns].quantile(q)}
+        self.counts = {ALL: len(df)}
+        if self.by:
+            grouped = df.groupby(self.by, observed=True, sort=True)
+            per_segment = grouped[columns].quantile(q)
+            for segment, size in grouped.size().items():
+                frames[segment] = per_segment.loc[segment]
+                self.counts[segment] = int(size)
+        self._caps = {
+            segment: (f.loc[self.lower].to_numpy(dtype=float), f.loc[self.upper].to_numpy(dtype=float))
+            for segment, f in frames.items()
+        }
+        return self
+
+    def merge(self, other: "Winsorizer") -> "Winsorizer":
+        """Combines sketches fitted on other rows with the same settings."""
+        if self.exact or other.exact:
+            raise ValueError("exact caps cannot be merged")
+        for segment, sketches in other.sketches.items():
+            mine = self.sketches.setdefault(segment, {})
+            for col, sketch in sketches.items():
+                if col in mine:
+                    mine[col].merge(sketch)
+                else:
+                    mine[col] = QuantileSketch.from_dict(sketch.to_dict())
+            self.counts[segment] = self.counts.get(segment, 0) + other.counts[segment]
+        if self.columns is None:
+            self.columns = other.columns
+        self._caps = None
+        return self
+
+    # ---------- caps ----------
+
+    def caps(self) -> dict:
+        """segment → (lower, upper) arrays aligned with self.columns."""
+        if self._caps is None:
+            if not self.sketches:
+                raise RuntimeError("call fit() first")
+            q = [self.lower, self.upper]
+            self._caps = {}
+            for segment, sketches in self.sketches.items():
+                quantiles = np.array([sketches[col].quantile(q) for col in self.columns])
+                self._caps[segment] = (quantiles[:, 0], quantiles[:, 1])
+        return self._caps
+
+    def bounds(self) -> pd.DataFrame:
+        """Caps as a long table: segment, column, lower, upper, rows."""
+        rows = [
+            (segment, col, lo, hi, self.counts.get(segment, 0))
+            for segment, (low, high) in self.caps().items()
+            for col, lo, hi in zip(self.columns, low, high)
+        ]
+        return pd.DataFrame(rows, columns=["segment", "column", "lower", "upper", "rows"])
+
+    def _tables(self) -> tuple:
+        """(segments, lower, upper): arrays (n_segments + 1, n_columns), all-rows caps last."""
+        caps = self.caps()
+        segments = [s for s in caps if s != ALL and self.counts.get(s, 0) >= self.min_rows]
+        order = segments + [ALL]
+        return (
+            segments,
+            np.array([caps[s][0] for s in order], dtype=float),
+            np.array([caps[s][1] for s in order], dtype=float),
+        )
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Capped copy of df (columns not fitted are left as they are)."""
+        segments, low, high = self._tables()
+        if self.by and segments:
+            if len(self.by) == 1:
+                index = pd.Index(segments)
+                codes = index.get_indexer(df[self.by[0]])
+            else:
+                index = pd.MultiIndex.from_tuples(segments, names=self.by)
+                codes = index.get_indexer(pd.MultiIndex.from_frame(df[self.by]))
+            codes[codes < 0] = len(segments)
+        else:
+            codes = np.full(len(df), len(segments))
+
+        out = df.copy()
+        for j, col in enumerate(self.columns):
+            if col not in out.columns:
+                continue
+            lo, hi = low[codes, j], high[codes, j]
+            series = out[col]
+            if pd.api.types.is_integer_dtype(series):
+                lo, hi = np.ceil(lo), np.floor(hi)
+                hi = np.maximum(hi, lo)
+            capped = np.clip(series.to_numpy(dtype=np.float64, na_value=np.nan), lo, hi)
+            out[col] = pd.Series(capped, index=out.index).astype(series.dtype)
+        return out
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
+    # ---------- persistence ----------
+
+    def to_dict(self) -> dict:
+        state = {
+            "lower": self.lower,
+            "upper": self.upper,
+            "columns": self.columns,
+            "by": self.by,
+            "exact": self.exact,
+            "k": self.k,
+            "min_rows": self.min_rows,
+        }
+        if self.exact:
+            state["segments"] = [
+                {
+                    "key": _segment_key(segment),
+                    "rows": int(self.counts[segment]),
+                    "lower": low.tolist(),
+                    "upper": high.tolist(),
+                }
+                for segment, (low, high) in self.caps().items()
+            ]
+        else:
+            state["segments"] = [
+                {
+                    "key": _segment_key(segment),
+                    "rows": int(self.counts[segment]),
+                    "sketches": {col: s.to_dict() for col, s in sketches.items()},
+                }
+                for segment, sketches in self.sketches.items()
+            ]
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "Winsorizer":
+        w = cls(state["lower"], state["upper"], state["columns"], state["by"], state["exact"],
+                state["k"], state["min_rows"])
+
+        def key(value):
+            return tuple(value) if isinstance(value, list) else value
+
+        if w.exact:
+            w._caps = {}
+        for entry in state["segments"]:
+            segment = key(entry["key"])
+            w.counts[segment] = entry["rows"]
+            if w.exact:
+                w._caps[segment] = (np.asarray(entry["lower"], dtype=float), np.asarray(entry["upper"], dtype=float))
+            else:
+                w.sketches[segment] = {
+                    col: QuantileSketch.from_dict(s) for col, s in entry["sketches"].items()
+                }
+        return w
+
+    def save(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict()))
+        return path
+
+    @classmethod
+    def load(cls, path: Path | str) -> "Winsorizer":
+        return cls.from_dict(json.loads(Path(path).read_text()))
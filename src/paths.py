@@ -0,0 +1,26 @@
+"""
+Where the pipeline reads and writes data (raw file, artifacts, caches,
+run logs, monitoring store):
+
+1. $ACIS_DATA_DIR, when set
+2. data/ of the source checkout, when running from it (or an editable
+   install: pip install -e .)
+3. data/ under the working directory (a regular pip install, where the
+   package lives in site-packages)
+"""
+import os
+from pathlib import Path
+
+CHECKOUT_DIR = Path(__file__).resolve().parents[1]
+
+
+def data_dir() -> Path:
+    if os.environ.get("ACIS_DATA_DIR"):
+        return Path(os.environ["ACIS_DATA_DIR"]).expanduser().resolve()
+    # dvc.yaml only exists next to src/ in the repository, never in site-packages
+    if (CHECKOUT_DIR / "dvc.yaml").exists():
+        return CHECKOUT_DIR / "data"
+    return Path.cwd() / "data"
+
+
+DATA_DIR = data_dir()
@@ -0,0 +1,383 @@
+"""
+Pre-aggregated plotting: box statistics, binned histograms and hexbin
+densities computed in one vectorized pass over the rows, then drawn from
+the summaries only (a few numbers per group / bin instead of every row).
+
+    box = box_stats(df, "totalclaims", by="province")
+    box.plot(ax)                    # redraws from the summary, any style
+    hexbin_density(df, "totalpremium", "totalclaims").plot(ax, bins="log")
+
+Summaries are kept in an LRU keyed by the fingerprint of the columns they
+were computed from, so redrawing a figure after a style change does not
+scan the data again.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .stage_cache import data_fingerprint
+
+# Summaries kept by the default shared cache
+DEFAULT_MAX_ENTRIES = 128
+
+# Outliers kept per box (evenly spaced by rank, extremes included)
+DEFAULT_MAX_FLIERS = 200
+
+DEFAULT_BINS = 50
+DEFAULT_GRIDSIZE = 100
+
+
+# ===============================
+# 1. CACHE
+# ===============================
+
+class SummaryCache:
+    """LRU of plot summaries keyed by (data fingerprint, kind, parameters)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        summary = self.entries.get(key)
+        if summary is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return summary
+
+    def put(self, key: tuple, summary):
+        self.entries[key] = summary
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+DEFAULT_CACHE = SummaryCache()
+
+
+def _rows(df: pd.DataFrame, columns: list, where) -> pd.DataFrame:
+    """The rows a summary is computed from (only their columns when masked)."""
+    return df if where is None else df.loc[np.asarray(where, dtype=bool), columns]
+
+
+def _cached(kind: str, df: pd.DataFrame, columns: list, params: tuple, cache, compute):
+    cache = cache if cache is not None else DEFAULT_CACHE
+    key = (data_fingerprint(df, columns), kind, params)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute()
+        cache.put(key, summary)
+    return summary
+
+
+def _axes(ax):
+    """The given Axes, else the current one (pyplot is only imported to draw)."""
+    if ax is not None:
+        return ax
+    import matplotlib.pyplot as plt
+
+    return plt.gca()
+
+
+def _values(df: pd.DataFrame, column: str) -> np.ndarray:
+    return df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _groups(df: pd.DataFrame, by) -> tuple:
+    """(codes, labels) of the group column per row, sorted labels; -1 for missing."""
+    if by is None:
+        return np.zeros(len(df), dtype=np.intp), [None]
+    codes, labels = pd.factorize(df[by], sort=True)
+    return codes, list(labels)
+
+
+# ===============================
+# 2. BOX STATISTICS
+# ===============================
+
+class BoxStats:
+    """
+    Per group: n, mean, quartiles, whisker ends (matplotlib's rule: the most
+    extreme values within whis × IQR of the box) and the number of outliers,
+    plus a capped sample of the outliers for drawing.
+    """
+
+    def __init__(self, column: str, by, table: pd.DataFrame, fliers: dict):
+        self.column = column
+        self.by = by
+        self.table = table      # one row per group, indexed by label
+        self.fliers = fliers    # label → sampled outlier values
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.table.copy()
+
+    def stats(self, order=None) -> list:
+        """Axes.bxp input, in `order` (labels) or label order."""
+        labels = list(self.table.index) if order is None else list(order)
+        rows = self.table.loc[labels]
+        return [
+            {
+                "label": "" if label is None else str(label),
+                "mean": row.mean,
+                "med": row.median,
+                "q1": row.q1,
+                "q3": row.q3,
+                "whislo": row.whislo,
+                "whishi": row.whishi,
+                "fliers": self.fliers[label],
+            }
+            for label, row in zip(labels, rows.itertuples())
+        ]
+
+    def plot(self, ax=None, order=None, **kwargs):
+        """Draws the boxes with Axes.bxp; kwargs go to bxp (showfliers, showmeans, ...)."""
+        ax = _axes(ax)
+        kwargs.setdefault("flierprops", {"marker": ".", "alpha": 0.5})
+        stats = self.stats(order)
+        if stats:  # an empty selection only gets its axis labels
+            ax.bxp(stats, **kwargs)
+        value_label, group_label = ax.set_ylabel, ax.set_xlabel
+        if kwargs.get("orientation") == "horizontal":
+            value_label, group_label = group_label, value_label
+        value_label(self.column)
+        if self.by is not None:
+            group_label(self.by)
+        return ax
+
+
+def _box_stats(values, codes, labels, column, by, whis, max_fliers) -> BoxStats:
+    keep = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+    if len(values) == 0:
+        # No rows selected: no groups (reduceat needs at least one)
+        columns = ["n", "mean", "q1", "median", "q3", "whislo", "whishi", "n_fliers"]
+        table = pd.DataFrame({col: pd.Series(dtype=float) for col in columns},
+                             index=pd.Index([], name=by))
+        return BoxStats(column, by, table.astype({"n": np.int64, "n_fliers": np.int64}), {})
+    # One sort gives every group's order statistics as contiguous slices
+    order = np.lexsort((values, codes))
+    v, c = values[order], codes[order]
+    n_all = np.bincount(c, minlength=len(labels))
+    present = np.flatnonzero(n_all)
+    n = n_all[present]
+    starts = np.concatenate([[0], np.cumsum(n)[:-1]])
+    last = starts + n - 1
+
+    def quantile(p):
+        # numpy / pandas "linear" interpolation
+        pos = starts + p * (n - 1)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.minimum(lo + 1, last)
+        return v[lo] + (pos - lo) * (v[hi] - v[lo])
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    group = np.repeat(np.arange(len(present)), n)
+    inside = (v >= (q1 - whis * iqr)[group]) & (v <= (q3 + whis * iqr)[group])
+    whislo = np.minimum.reduceat(np.where(inside, v, np.inf), starts)
+    whishi = np.maximum.reduceat(np.where(inside, v, -np.inf), starts)
+    whislo = np.where(whislo > q1, q1, whislo)
+    whishi = np.where(whishi < q3, q3, whishi)
+    outside = (v < whislo[group]) | (v > whishi[group])
+
+    fliers = {}
+    group_labels = [labels[i] for i in present]
+    for i, label in enumerate(group_labels):
+        out = v[starts[i]: last[i] + 1][outside[starts[i]: last[i] + 1]]
+        if len(out) > max_fliers:
+            out = out[np.linspace(0, len(out) - 1, max_fliers).round().astype(np.intp)]
+        fliers[label] = out
+
+    table = pd.DataFrame({
+        "n": n,
+        "mean": np.add.reduceat(v, starts) / n,
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "whislo": whislo,
+        "whishi": whishi,
+        "n_fliers": np.add.reduceat(outside.astype(np.int64), starts),
+    }, index=pd.Index(group_labels, name=by))
+    return BoxStats(column, by, table, fliers)
+
+
+def box_stats(df: pd.DataFrame, column: str, by=None, where=None, whis: float = 1.5,
+              max_fliers: int = DEFAULT_MAX_FLIERS, cache: SummaryCache | None = None) -> BoxStats:
+    """
+    Box statistics of `column` per group of `by` (one box without), over the
+    rows where the boolean mask `where` holds. Missing values and missing
+    groups are dropped, as in groupby.
+    """
+    columns = [column] + ([by] if by is not None else [])
+    df = _rows(df, columns, where)
+
+    def compute():
+        codes, labels = _groups(df, by)
+        return _box_stats(_values(df, column), codes, labels, column, by, whis, max_fliers)
+
+    return _cached("box", df, columns, (column, by, whis, max_fliers), cache, compute)
+
+
+# ===============================
+# 3. HISTOGRAMS
+# ===============================
+
+class Histogram:
+    """Bin edges and counts per group (rows: groups in label order)."""
+
+    def __init__(self, column: str, by, edges: np.ndarray, counts: np.ndarray, labels: list):
+        self.column = column
+        self.by = by
+        self.edges = edges
+        self.counts = counts
+        self.labels = labels
+
+    def to_frame(self) -> pd.DataFrame:
+        """Counts with one column per group, indexed by bin intervals."""
+        index = pd.IntervalIndex.from_breaks(self.edges, closed="left", name=self.column)
+        return pd.DataFrame(self.counts.T, index=index, columns=pd.Index(self.labels, name=self.by))
+
+    def plot(self, ax=None, density: bool = False, **kwargs):
+        """One Axes.stairs outline (filled for a single group) per group."""
+        ax = _axes(ax)
+        widths = np.diff(self.edges)
+        for label, counts in zip(self.labels, self.counts):
+            heights = counts / (counts.sum() * widths) if density and counts.sum() else counts
+            style = {"fill": len(self.labels) == 1, "label": None if label is None else str(label)}
+            ax.stairs(heights, self.edges, **{**style, **kwargs})
+        ax.set_xlabel(self.column)
+        ax.set_ylabel("density" if density else "count")
+        if len(self.labels) > 1:
+            ax.legend(title=self.by)
+        return ax
+
+
+def histogram(df: pd.DataFrame, column: str, bins=DEFAULT_BINS, by=None, range=None,
+              where=None, cache: SummaryCache | None = None) -> Histogram:
+    """
+    Counts of `column` in `bins` (a count or edges, as np.histogram) per
+    group of `by`: one bincount over (group, bin) codes for all groups.
+    """
+    columns = [column] + ([by] if by is not None else [])
+    bins_key = tuple(bins) if np.ndim(bins) else bins
+    df = _rows(df, columns, where)
+
+    def compute():
+        values = _values(df, column)
+        codes, labels = _groups(df, by)
+        finite = np.isfinite(values) & (codes >= 0)
+        edges = np.histogram_bin_edges(values[finite], bins=bins, range=range)
+        nbins = len(edges) - 1
+        # Bins are closed on the left, the last one on both sides (np.histogram)
+        idx = np.searchsorted(edges, values, side="right") - 1
+        idx[values == edges[-1]] = nbins - 1
+        valid = finite & (idx >= 0) & (idx < nbins)
+        flat = codes[valid] * nbins + idx[valid]
+        counts = np.bincount(flat, minlength=len(labels) * nbins).reshape(len(labels), nbins)
+        return Histogram(column, by, edges, counts, labels)
+
+    return _cached("hist", df, columns, (column, by, bins_key, range), cache, compute)
+
+
+# ===============================
+# 4. HEXBIN DENSITIES
+# ===============================
+
+class HexDensity:
+    """
+    Hexagon counts of an (x, y) scatter on matplotlib's hexbin grid:
+    centers and counts of the non-empty hexagons only.
+    """
+
+    def __init__(self, x: str, y: str, gridsize: int, extent: tuple, centers: np.ndarray, counts: np.ndarray):
+        self.x = x
+        self.y = y
+        self.gridsize = gridsize
+        self.extent = extent
+        self.centers = centers
+        self.counts = counts
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({self.x: self.centers[:, 0], self.y: self.centers[:, 1], "count": self.counts})
+
+    def plot(self, ax=None, **kwargs):
+        """
+        Axes.hexbin over the hexagon centers weighted by their counts: the
+        same figure as hexbin on the rows (kwargs: bins="log", cmap, ...).
+        """
+        ax = _axes(ax)
+        collection = ax.hexbin(
+            self.centers[:, 0], self.centers[:, 1], C=self.counts, reduce_C_function=np.sum,
+            gridsize=self.gridsize, extent=self.extent, **kwargs,
+        )
+        ax.set_xlabel(self.x)
+        ax.set_ylabel(self.y)
+        return collection
+
+
+def _extent(values: np.ndarray) -> tuple:
+    lo, hi = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+    if lo == hi:
+        # singular data: widen like matplotlib does
+        pad = 0.1 * abs(lo) if lo else 0.1
+        lo, hi = lo - pad, hi + pad
+    return float(lo), float(hi)
+
+
+def _hex_counts(x, y, gridsize: int, extent: tuple) -> tuple:
+    """matplotlib's hexbin binning (two offset rectangular lattices) → (centers, counts)."""
+    xmin, xmax, ymin, ymax = extent
+    nx = gridsize
+    ny = int(nx / np.sqrt(3))
+    padding = 1.e-9 * (xmax - xmin)
+    xmin, xmax = xmin - padding, xmax + padding
+    sx, sy = (xmax - xmin) / nx, (ymax - ymin) / ny
+    ix, iy = (x - xmin) / sx, (y - ymin) / sy
+    ix1, iy1 = np.round(ix).astype(np.intp), np.round(iy).astype(np.intp)
+    ix2, iy2 = np.floor(ix).astype(np.intp), np.floor(iy).astype(np.intp)
+    nx1, ny1 = nx + 1, ny + 1
+    i1 = np.where((0 <= ix1) & (ix1 < nx1) & (0 <= iy1) & (iy1 < ny1), ix1 * ny1 + iy1 + 1, 0)
+    i2 = np.where((0 <= ix2) & (ix2 < nx) & (0 <= iy2) & (iy2 < ny), ix2 * ny + iy2 + 1, 0)
+    first = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2 < (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2
+    counts = np.concatenate([
+        np.bincount(i1[first], minlength=1 + nx1 * ny1)[1:],
+        np.bincount(i2[~first], minlength=1 + nx * ny)[1:],
+    ])
+
+    a, b = np.divmod(np.arange(nx1 * ny1), ny1)
+    c, d = np.divmod(np.arange(nx * ny), ny)
+    centers = np.column_stack([
+        np.concatenate([xmin + a * sx, xmin + (c + 0.5) * sx]),
+        np.concatenate([ymin + b * sy, ymin + (d + 0.5) * sy]),
+    ])
+    nonzero = counts > 0
+    return centers[nonzero], counts[nonzero]
+
+
+def hexbin_density(df: pd.DataFrame, x: str, y: str, gridsize: int = DEFAULT_GRIDSIZE,
+                   extent: tuple | None = None, where=None, cache: SummaryCache | None = None) -> HexDensity:
+    """
+    Hexbin counts of y against x (rows with both values), in place of a
+    scatter of every row; extent (xmin, xmax, ymin, ymax) defaults to the
+    data range.
+    """
+    df = _rows(df, [x, y], where)
+
+    def compute():
+        xs, ys = _values(df, x), _values(df, y)
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        xs, ys = xs[finite], ys[finite]
+        box = tuple(extent) if extent is not None else _extent(xs) + _extent(ys)
+        centers, counts = _hex_counts(xs, ys, gridsize, box)
+        return HexDensity(x, y, gridsize, box, centers, counts)
+
+    params = (x, y, gridsize, tuple(extent) if extent is not None else None)
+    return _cached("hexbin", df, [x, y], params, cache, compute)
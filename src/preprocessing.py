@@ -1,24 +1,28 @@
 import pandas as pd
 
+from .dedup import drop_duplicates
+from .instrumentation import instrumented
 
-def preprocess_for_analysis(df: pd.DataFrame) -> pd.DataFrame:
+
+@instrumented
+def preprocess_for_analysis(df: pd.DataFrame, dedup_key: list | None = None) -> pd.DataFrame:
     """
     Pre-processing pipeline for EDA + Statistical Testing.
     Steps:
-    1. Remove duplicates
+    1. Remove duplicates: exact full-row duplicates by default, or rows
+       repeating `dedup_key` (e.g. dedup.BUSINESS_KEY); what was dropped is
+       summarised in df.attrs["duplicates"]
     2. Ensure correct numeric types
     3. Encode categorical variables (optional for modeling)
     4. Remove unrealistic values
     """
 
   
-    df = df.drop_duplicates()
-
-  
-    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    df, duplicates = drop_duplicates(df, key=dedup_key)
+    df.attrs["duplicates"] = duplicates.summary()
 
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Numeric dtypes are already set by cleaning (and the dtype plan);
+    # re-coercing them with pd.to_numeric was a no-op copy per column
 
    
     for col in ["totalclaims", "totalpremium", "suminsured"]:
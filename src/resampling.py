@@ -0,0 +1,241 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .effects import cramers_v, cohens_d
+
+# Resamples per seeded block. Blocks, not workers, own the random streams,
+# so results for a given seed do not depend on n_jobs.
+BLOCK_SIZE = 256
+
+# Upper bound on elements in one index matrix (int64 → 32 MB)
+MAX_ELEMENTS = 2 ** 22
+
+
+# ===============================
+# 1. BLOCK KERNELS (run in workers)
+# ===============================
+
+def _perm_mean_diff(rng, n, values, n_a, max_elements):
+    """Mean(A) - mean(B) under random relabelling, batched as index matrices."""
+    total, size = values.sum(), len(values)
+    per_batch = max(1, max_elements // size)
+    out = []
+    while n > 0:
+        b = min(per_batch, n)
+        idx = rng.permuted(np.tile(np.arange(size), (b, 1)), axis=1)[:, :n_a]
+        sum_a = values[idx].sum(axis=1)
+        out.append(sum_a / n_a - (total - sum_a) / (size - n_a))
+        n -= b
+    return np.concatenate(out)
+
+
+def _perm_binary_chi2(rng, n, group_n, claims_total):
+    """
+    Chi-squared of group × claim tables under random relabelling.
+
+    With fixed margins the claims landing in each group follow sequential
+    hypergeometric draws, so no row-level shuffling is needed.
+    """
+    group_n = np.asarray(group_n)
+    good = np.full(n, claims_total)
+    bad = np.full(n, group_n.sum() - claims_total)
+    claims = np.empty((n, len(group_n)))
+    for i, size in enumerate(group_n[:-1]):
+        claims[:, i] = rng.hypergeometric(good, bad, size) if size else 0
+        bad = bad - (size - claims[:, i]).astype(int)
+        good = good - claims[:, i].astype(int)
+    claims[:, -1] = good
+    tables = np.stack([group_n - claims, claims], axis=2)
+    return _chi2_batch(tables, correction=True)
+
+
+def _boot_cohens_d(rng, n, a, b, max_elements):
+    per_batch = max(1, max_elements // (len(a) + len(b)))
+    out = []
+    while n > 0:
+        m = min(per_batch, n)
+        xa = a[rng.integers(0, len(a), (m, len(a)))]
+        xb = b[rng.integers(0, len(b), (m, len(b)))]
+        pooled = np.sqrt((xa.var(axis=1, ddof=1) + xb.var(axis=1, ddof=1)) / 2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            d = np.where(pooled > 0, (xa.mean(axis=1) - xb.mean(axis=1)) / pooled, 0.0)
+        out.append(d)
+        n -= m
+    return np.concatenate(out)
+
+
+def _boot_cramers_v(rng, n, table):
+    """Rows resampled with replacement ≡ one multinomial draw per row."""
+    table = np.asarray(table, dtype=float)
+    totals = table.sum(axis=1)
+    probs = table / totals[:, None]
+    tables = np.stack(
+        [rng.multinomial(int(t), p, size=n) for t, p in zip(totals, probs)],
+        axis=1,
+    )
+    chi2 = _chi2_batch(tables, correction=False)
+    k = min(table.shape) - 1
+    return np.sqrt(chi2 / (table.sum() * k)) if k > 0 else np.zeros(n)
+
+
+KERNELS = {
+    "perm_mean_diff": _perm_mean_diff,
+    "perm_binary_chi2": _perm_binary_chi2,
+    "boot_cohens_d": _boot_cohens_d,
+    "boot_cramers_v": _boot_cramers_v,
+}
+
+
+def _chi2_batch(tables, correction=True):
+    """Pearson chi-squared for a stack of tables (R, rows, cols)."""
+    tables = np.asarray(tables, dtype=float)
+    total = tables.sum(axis=(1, 2), keepdims=True)
+    expected = tables.sum(axis=2, keepdims=True) * tables.sum(axis=1, keepdims=True) / total
+    observed = tables
+    if correction and tables.shape[1:] == (2, 2):
+        diff = expected - observed
+        observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    return terms.sum(axis=(1, 2))
+
+
+def _run_blocks(kernel, blocks, args):
+    fn = KERNELS[kernel]
+    return np.concatenate([
+        fn(np.random.default_rng(seq), n, *args) for n, seq in blocks
+    ])
+
+
+# ===============================
+# 2. DRIVER
+# ===============================
+
+def resample(kernel, args, n_resamples=10_000, seed=0, n_jobs=1):
+    """
+    Runs `n_resamples` draws of a kernel, split into seeded blocks.
+
+    n_jobs > 1 spreads contiguous block ranges over a process pool
+    (n_jobs=-1 → all cores). Output order and values are identical
+    for any n_jobs.
+    """
+    n_blocks = -(-n_resamples // BLOCK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+    sizes = [min(BLOCK_SIZE, n_resamples - i * BLOCK_SIZE) for i in range(n_blocks)]
+    blocks = list(zip(sizes, seeds))
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, n_blocks))
+    if n_jobs == 1:
+        return _run_blocks(kernel, blocks, args)
+
+    splits = np.array_split(np.arange(n_blocks), n_jobs)
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [
+            pool.submit(_run_blocks, kernel, [blocks[i] for i in part], args)
+            for part in splits
+        ]
+        return np.concatenate([f.result() for f in futures])
+
+
+def _p_value(null, observed):
+    """Two-sided (via |stat|) permutation p-value with the +1 correction."""
+    return (1 + np.count_nonzero(np.abs(null) >= abs(observed))) / (len(null) + 1)
+
+
+def _interval(samples, ci):
+    tail = (1 - ci) / 2
+    low, high = np.nanquantile(samples, [tail, 1 - tail])
+    return low, high
+
+
+# ===============================
+# 3. TESTS ON A/B FRAMES
+# ===============================
+
+def _ab_values(df, column, positive_only=False):
+    data = df[df[column] > 0] if positive_only else df
+    a = data.loc[data["ab_group"] == "A_Control", column].to_numpy(dtype=float)
+    b = data.loc[data["ab_group"] == "B_Test", column].to_numpy(dtype=float)
+    return a[~np.isnan(a)], b[~np.isnan(b)]
+
+
+def _perm_mean_test(a, b, n_resamples, seed, n_jobs, max_elements):
+    observed = a.mean() - b.mean()
+    # Shuffle labels for the smaller group; the sign is restored below
+    small_first = len(a) <= len(b)
+    pooled = np.concatenate([a, b] if small_first else [b, a])
+    null = resample(
+        "perm_mean_diff",
+        (pooled, min(len(a), len(b)), max_elements),
+        n_resamples, seed, n_jobs,
+    )
+    null = null if small_first else -null
+    return observed, _p_value(null, observed)
+
+
+def permutation_frequency_test(df, n_resamples=10_000, seed=0, n_jobs=1):
+    """
+    claim_frequency_test with a permutation p-value.
+    Returns (chi2, p_perm, cramers_v).
+    """
+    from scipy.stats import chi2_contingency
+
+    cont = pd.crosstab(df["ab_group"], df["has_claim"])
+    chi2, _, _, _ = chi2_contingency(cont)
+    if cont.shape[1] < 2:
+        return chi2, 1.0, cramers_v(cont)
+
+    null = resample(
+        "perm_binary_chi2",
+        (cont.sum(axis=1).to_numpy(), int(cont[1].sum())),
+        n_resamples, seed, n_jobs,
+    )
+    p = (1 + np.count_nonzero(null >= chi2 - 1e-12)) / (len(null) + 1)
+    return chi2, p, cramers_v(cont)
+
+
+def permutation_severity_test(df, n_resamples=10_000, seed=0, n_jobs=1,
+                              max_elements=MAX_ELEMENTS):
+    """
+    claim_severity_test with a permutation p-value on the difference in
+    mean positive totalclaims. Returns (mean_diff, p_perm, cohens_d).
+    """
+    a, b = _ab_values(df, "totalclaims", positive_only=True)
+    diff, p = _perm_mean_test(a, b, n_resamples, seed, n_jobs, max_elements)
+    return diff, p, cohens_d(pd.Series(a), pd.Series(b))
+
+
+def permutation_margin_test(df, n_resamples=10_000, seed=0, n_jobs=1,
+                            max_elements=MAX_ELEMENTS):
+    """margin_test with a permutation p-value. Returns (mean_diff, p_perm)."""
+    a, b = _ab_values(df, "margin")
+    return _perm_mean_test(a, b, n_resamples, seed, n_jobs, max_elements)
+
+
+# ===============================
+# 4. BOOTSTRAP CONFIDENCE INTERVALS
+# ===============================
+
+def bootstrap_cohens_d(g1, g2, n_resamples=10_000, ci=0.95, seed=0, n_jobs=1,
+                       max_elements=MAX_ELEMENTS):
+    """cohens_d with a percentile bootstrap interval → (d, low, high)."""
+    a = np.asarray(g1, dtype=float)
+    b = np.asarray(g2, dtype=float)
+    samples = resample("boot_cohens_d", (a, b, max_elements), n_resamples, seed, n_jobs)
+    # Series std (ddof=1), as cohens_d sees it in statistical_tests
+    return (cohens_d(pd.Series(a), pd.Series(b)), *_interval(samples, ci))
+
+
+def bootstrap_cramers_v(cont_table, n_resamples=10_000, ci=0.95, seed=0, n_jobs=1):
+    """
+    cramers_v with a percentile bootstrap interval → (v, low, high).
+    Each row (group) of the table is resampled with replacement.
+    """
+    table = np.asarray(cont_table)
+    samples = resample("boot_cramers_v", (table.astype(float),), n_resamples, seed, n_jobs)
+    return (cramers_v(table), *_interval(samples, ci))
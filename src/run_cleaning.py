@@ -1,46 +1,132 @@
+"""
+Cleaning stage of the DVC pipeline: raw pipe-delimited file → cleaned,
+province-partitioned Parquet artifact.
+
+    acis-clean [--chunksize 200000] [--profile cprofile]   # console entry point
+    python -m src.run_cleaning                             # same, without installing
+"""
+import argparse
 import os
-import sys
 from pathlib import Path
 
-# ---------------------------------------------------------
-# Ensure that src/ folder is in Python path
-# So we can import src.data_loader and src.cleaning
-# ---------------------------------------------------------
-current_dir = os.path.dirname(os.path.abspath(__file__))   # src/
-project_root = os.path.abspath(os.path.join(current_dir, ".."))  # project root
-src_path = os.path.join(project_root, "src")               # project_root/src
-
-sys.path.append(src_path)
-
-# ---------------------------------------------------------
-# Now imports will work (even under dvc repro)
-# ---------------------------------------------------------
-from data_loader import load_data
-from cleaning import clean_data
+from . import paths
+from .data_loader import load_raw, save_data
+from .cleaning import CleaningReport, clean_data
+from .dtype_planner import plan_dtypes
+from .instrumentation import PROFILERS, RunLog, span
+from .stage_cache import StageCache
+from .stream_cleaning import clean_data_streaming
 
 
 # ---------------------------------------------------------
 # File paths
 # ---------------------------------------------------------
-DATA_DIR = os.path.join(project_root, "data")
+DATA_DIR = str(paths.DATA_DIR)  # $ACIS_DATA_DIR, the checkout's data/ or ./data
 RAW_FILE = os.path.join(DATA_DIR, "MachineLearningRating_v3.txt")
-CLEAN_FILE = os.path.join(DATA_DIR, "clean_data.csv")
+CLEAN_FILE = os.path.join(DATA_DIR, "clean_data.parquet")
 
-# Adjust delimiter here if needed
-DELIMITER = "|"
+# Parquet layout: one directory per province, rows ordered by month so
+# row-group statistics support month filters
+PARTITION_COLS = ["province"]
+SORT_BY = "transactionmonth"
 
+# Raw column whose values split the row-wise cleaning stages into cached
+# partitions, so a new month of data only recomputes that month
+CACHE_PARTITION = "TransactionMonth"
 
-def main():
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean the raw ACIS dataset.")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the raw file in chunks of this many rows (bounded memory)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record peak allocations per cleaning stage (slower)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse unchanged stages and months from data/cache/stages (pays off "
+             "on reruns; a cold run is slower, as every output is hashed and written)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILERS,
+        default=None,
+        help="Profile the run (cProfile stats or a py-spy flame graph in data/runs)",
+    )
+    args = parser.parse_args(argv)
+
+    # Per-stage wall/CPU time, memory and rows, saved as JSON + CSV in data/runs
+    # (--trace-memory stays with the CleaningReport, which runs tracemalloc itself)
+    # Saved in finally: a failed run is the one that most needs its log
+    run = RunLog("run_cleaning", profile=args.profile)
+    try:
+        with run:
+            _run(args)
+    finally:
+        print(run.report())
+        json_path, _ = run.save()
+        print("Run log saved to:", json_path)
+
+
+def _run(args):
     print("Working directory:", os.getcwd())
     print("Loading raw dataset from:", RAW_FILE)
 
-    df = load_data("MachineLearningRating_v3.txt", sep=DELIMITER)
+    if args.chunksize:
+        print(f"Cleaning dataset in streaming mode ({args.chunksize:,} rows per chunk)...")
+        clean_data_streaming(
+            "MachineLearningRating_v3.txt",
+            os.path.basename(CLEAN_FILE),
+            chunksize=args.chunksize,
+            partition_cols=PARTITION_COLS,
+        )
+        print("Saved cleaned dataset to:", CLEAN_FILE)
+        print("\n✔ Cleaning step complete.")
+        return
+
+    # Separator is sniffed; columns are parsed with the declared raw schema.
+    # With --cache, unchanged stages (and unchanged months) are read back;
+    # off by default since DVC already skips the stage when nothing changed.
+    cache = StageCache() if args.cache else None
+    if cache is None:
+        df, fingerprint = load_raw("MachineLearningRating_v3.txt"), None
+    else:
+        # The raw file is only parsed if some stage has to run
+        df = lambda: load_raw("MachineLearningRating_v3.txt")
+        fingerprint = cache.load_key("MachineLearningRating_v3.txt", loader=load_raw)
 
     print("Cleaning dataset...")
-    df_clean = clean_data(df)
+    report = CleaningReport(trace_memory=args.trace_memory)
+    df_clean = clean_data(
+        df,
+        report=report,
+        cache=cache,
+        fingerprint=fingerprint,
+        partition_by=CACHE_PARTITION if cache is not None else None,
+    )
+    print(report)
+    if cache is not None:
+        print(f"Stage cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+
+    # Cheapest exact dtype per column; persisted next to the artifact
+    with span("plan_dtypes", df_clean):
+        plan = plan_dtypes(df_clean)
 
     print("Saving cleaned dataset to:", CLEAN_FILE)
-    df_clean.to_csv(CLEAN_FILE, index=False)
+    save_data(
+        df_clean,
+        os.path.basename(CLEAN_FILE),
+        partition_cols=PARTITION_COLS,
+        sort_by=SORT_BY,
+        dtype_plan=plan,
+    )
 
     print("\n✔ Cleaning step complete.")
 
@@ -0,0 +1,399 @@
+"""
+Risk premium scoring with the Task 4 frequency and severity models.
+
+    risk premium = P(claim) × E[severity] × (1 + expense_loading + profit_margin)
+                   + fixed_loading
+
+Batch mode scores a CSV / JSON-lines / Parquet file (or a stream on stdin)
+in vectorised micro-batches; serve mode keeps the models loaded behind a
+local HTTP endpoint.
+
+    acis-score batch policies.csv -o premiums.csv    # or python -m src.scoring
+    cat policies.jsonl | acis-score batch - --format jsonl
+    acis-score serve --port 8080
+"""
+import argparse
+import io
+import json
+import pickle
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.json as pa_json
+
+from .data_loader import DATA_DIR
+from .features import engineer_features
+
+PRICING_FILE = DATA_DIR / "cache" / "models" / "pricing.pkl"  # modeling.MODEL_DIR, without importing sklearn
+
+# Rows per micro-batch
+DEFAULT_BATCH_SIZE = 65_536
+
+# Loadings used in the Task 4 risk-based premium framework
+EXPENSE_LOADING = 0.15
+PROFIT_MARGIN = 0.10
+
+# Output columns of PricingModel.score
+OUTPUT = ["claim_probability", "expected_severity", "expected_loss", "risk_premium"]
+
+
+def _conform(series: pd.Series, dtype) -> pd.Series:
+    """Casts an incoming column to the dtype the preprocessors were fitted on."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        kind = dtype.categories.dtype.kind
+        if kind in "iuf" and series.dtype.kind not in "iuf":
+            series = pd.to_numeric(series, errors="coerce")
+        elif kind == "O" and series.dtype.kind in "iufb":
+            series = series.astype(str)
+        # Levels unseen in training become missing → "other" / parent rate
+        return series.astype(dtype)
+    if dtype.kind in "iufb":
+        return pd.to_numeric(series, errors="coerce")
+    return series
+
+
+# ===============================
+# 1. MODEL BUNDLE
+# ===============================
+
+class PricingModel:
+    """
+    Fitted preprocessors and models of the claim probability and claim
+    severity tasks, pickled as one file and loaded once per process.
+
+    dtypes holds the model input columns and the dtypes they were trained
+    with; incoming records are run through engineer_features for any
+    derived column they lack and cast to those dtypes before scoring.
+    """
+
+    def __init__(self, frequency_preprocessor, frequency_model, severity_preprocessor, severity_model,
+                 dtypes: pd.Series, expense_loading: float = EXPENSE_LOADING,
+                 profit_margin: float = PROFIT_MARGIN, fixed_loading: float = 0.0):
+        self.frequency_preprocessor = frequency_preprocessor
+        self.frequency_model = frequency_model
+        self.severity_preprocessor = severity_preprocessor
+        self.severity_model = severity_model
+        self.dtypes = dtypes
+        self.expense_loading = expense_loading
+        self.profit_margin = profit_margin
+        self.fixed_loading = fixed_loading
+
+    @classmethod
+    def from_harnesses(cls, probability_harness, probability_model: str, severity_harness,
+                       severity_model: str, X: pd.DataFrame, **loadings) -> "PricingModel":
+        """Bundles the named candidates fitted by two modeling.TrainingHarness runs; X gives the input dtypes."""
+        return cls(
+            probability_harness.preprocessor,
+            probability_harness.model(probability_model),
+            severity_harness.preprocessor,
+            severity_harness.model(severity_model),
+            X.dtypes,
+            **loadings,
+        )
+
+    def save(self, path: Path | str = PRICING_FILE) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+        return path
+
+    @staticmethod
+    def load(path: Path | str = PRICING_FILE) -> "PricingModel":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def features(self, records: pd.DataFrame) -> pd.DataFrame:
+        """Model inputs for raw policy records (derived features added, dtypes conformed)."""
+        columns = list(self.dtypes.index)
+        if not set(columns) <= set(records.columns):
+            try:
+                records = engineer_features(records)
+            except KeyError as e:
+                raise ValueError(f"records lack column {e} needed for the model features") from None
+        missing = [c for c in columns if c not in records.columns]
+        if missing:
+            raise ValueError(f"records lack model input columns: {missing}")
+        return pd.DataFrame({c: _conform(records[c], self.dtypes[c]) for c in columns}, index=records.index)
+
+    def score(self, records: pd.DataFrame) -> pd.DataFrame:
+        """OUTPUT columns per record, one vectorised pass per model."""
+        X = self.features(records)
+        p = self.frequency_model.predict_proba(self.frequency_preprocessor.transform(X))[:, 1]
+        severity = np.maximum(self.severity_model.predict(self.severity_preprocessor.transform(X)), 0.0)
+        loss = p * severity
+        premium = loss * (1 + self.expense_loading + self.profit_margin) + self.fixed_loading
+        return pd.DataFrame(
+            {"claim_probability": p, "expected_severity": severity, "expected_loss": loss, "risk_premium": premium},
+            index=records.index,
+        )
+
+
+# ===============================
+# 2. INPUT
+# ===============================
+
+def _format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".json", ".ndjson"):
+        return "jsonl"
+    if suffix == ".parquet" or Path(path).is_dir():
+        return "parquet"
+    return "csv"
+
+
+def _record_batches(source, fmt: str, batch_size: int):
+    """pyarrow record batches from a path or binary stream."""
+    if fmt == "parquet":
+        # A single file or a partitioned artifact directory, streamed
+        yield from ds.dataset(source, format="parquet", partitioning="hive").to_batches(batch_size=batch_size)
+    elif fmt == "jsonl":
+        # pyarrow's JSON reader is not incremental; read a block of lines at a time
+        lines = []
+        for line in source:
+            if line.strip():
+                lines.append(line)
+            if len(lines) == batch_size:
+                yield from pa_json.read_json(io.BytesIO(b"".join(lines))).to_batches()
+                lines = []
+        if lines:
+            yield from pa_json.read_json(io.BytesIO(b"".join(lines))).to_batches()
+    elif fmt == "csv":
+        yield from pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=1 << 22))
+    else:
+        raise ValueError(f"unknown input format {fmt!r}")
+
+
+def read_batches(path: str, fmt: str | None = None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Policy records as DataFrames of batch_size rows (last one shorter); path "-" reads stdin."""
+    fmt = _format(path, fmt)
+    if path == "-":
+        if fmt == "parquet":
+            raise ValueError("parquet cannot be streamed from stdin")
+        source = sys.stdin.buffer
+    else:
+        source = path if fmt == "parquet" else open(path, "rb")
+
+    pending, rows = [], 0
+    try:
+        for batch in _record_batches(source, fmt, batch_size):
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= batch_size:
+                table = pa.Table.from_batches(pending)
+                yield table.slice(0, batch_size).to_pandas()
+                rest = table.slice(batch_size)
+                pending, rows = rest.to_batches(), rest.num_rows
+        if rows:
+            yield pa.Table.from_batches(pending).to_pandas()
+    finally:
+        if source is not sys.stdin.buffer and not isinstance(source, str):
+            source.close()
+
+
+# ===============================
+# 3. BATCH SCORING
+# ===============================
+
+class ScoringStats:
+    """
+    Per-batch latency and overall throughput. Safe to share between the
+    request threads of the HTTP service: updates and snapshots hold a lock.
+    """
+
+    def __init__(self):
+        self.batches = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def add(self, rows: int, seconds: float):
+        with self._lock:
+            self.batches += 1
+            self.rows += rows
+            self.seconds += seconds
+            self.latencies.append(seconds)
+
+    @property
+    def throughput(self) -> float:
+        with self._lock:
+            return self.rows / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            batches, rows, seconds = self.batches, self.rows, self.seconds
+            latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "batches": batches,
+            "rows": rows,
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds if seconds else 0.0, 1),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 2),
+        }
+
+    def __str__(self):
+        s = self.to_dict()
+        return (f"{s['rows']:,} policies in {s['batches']} batch(es), {s['seconds']:.2f} s scoring "
+                f"→ {s['rows_per_second']:,.0f} policies/s (batch latency p50 {s['latency_ms_p50']} ms, "
+                f"p95 {s['latency_ms_p95']} ms)")
+
+
+def score_stream(model: PricingModel, batches, out, keep: list | None = None,
+                 stats: ScoringStats | None = None, verbose: bool = True) -> ScoringStats:
+    """
+    Scores each DataFrame of `batches` and appends the OUTPUT columns (after
+    the `keep` id columns) as CSV to the binary stream `out`.
+    """
+    stats = stats if stats is not None else ScoringStats()
+    header = True
+    for batch in batches:
+        start = time.perf_counter()
+        scored = model.score(batch)
+        seconds = time.perf_counter() - start
+        stats.add(len(batch), seconds)
+        if verbose:
+            print(f"batch {stats.batches}: {len(batch):,} policies in {seconds * 1000:.1f} ms "
+                  f"({len(batch) / seconds:,.0f}/s)", file=sys.stderr)
+        if keep:
+            scored = pd.concat([batch[keep].reset_index(drop=True), scored.reset_index(drop=True)], axis=1)
+        # pyarrow's writer: pandas to_csv formats floats one value at a time
+        pa_csv.write_csv(pa.Table.from_pandas(scored, preserve_index=False), out,
+                         write_options=pa_csv.WriteOptions(include_header=header))
+        header = False
+    return stats
+
+
+# ===============================
+# 4. HTTP SERVICE
+# ===============================
+
+def _handler(model: PricingModel, stats: ScoringStats):
+    class ScoringHandler(BaseHTTPRequestHandler):
+        """
+        POST /score: JSON records ([{...}, ...] or {"records": [...]}), JSON
+        lines or CSV (by Content-Type) → {"risk_premium": [...], ...}.
+        GET /health, GET /stats.
+        """
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._send(200, stats.to_dict())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def _records(self, body: bytes) -> pd.DataFrame:
+            content_type = self.headers.get("Content-Type", "application/json")
+            if "csv" in content_type:
+                return pa_csv.read_csv(io.BytesIO(body)).to_pandas()
+            if "ndjson" in content_type or "jsonl" in content_type:
+                return pa_json.read_json(io.BytesIO(body)).to_pandas()
+            payload = json.loads(body)
+            return pd.DataFrame.from_records(payload["records"] if isinstance(payload, dict) else payload)
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                records = self._records(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                start = time.perf_counter()
+                scored = model.score(records)
+                seconds = time.perf_counter() - start
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            stats.add(len(records), seconds)
+            self._send(200, {**{c: scored[c].tolist() for c in OUTPUT},
+                             "rows": len(records), "latency_ms": round(seconds * 1000, 3)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoringHandler
+
+
+def serve(model: PricingModel, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """HTTP server around a loaded model; call serve_forever() on it."""
+    return ThreadingHTTPServer((host, port), _handler(model, ScoringStats()))
+
+
+# ===============================
+# 5. CLI
+# ===============================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score policies with the risk premium models.")
+    parser.add_argument("--model", default=str(PRICING_FILE), help="Pickled PricingModel")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="Score a file or stdin stream")
+    batch.add_argument("input", help='CSV, JSON lines or Parquet file; "-" for stdin')
+    batch.add_argument("-o", "--output", default="-", help='CSV output file; "-" for stdout')
+    batch.add_argument("--format", choices=["csv", "jsonl", "parquet"], default=None)
+    batch.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    batch.add_argument("--keep", nargs="*", default=["policyid"],
+                       help="Input columns copied to the output (when present)")
+    batch.add_argument("--quiet", action="store_true", help="No per-batch lines on stderr")
+
+    http = sub.add_parser("serve", help="Local HTTP scoring service")
+    http.add_argument("--host", default="127.0.0.1")
+    http.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    model = PricingModel.load(args.model)
+    print(f"Loaded {args.model} in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+
+    if args.command == "batch":
+        batches = read_batches(args.input, args.format, args.batch_size)
+        first = next(batches, None)
+        if first is None:
+            return
+        keep = [c for c in args.keep if c in first.columns]
+
+        def chained():
+            yield first
+            yield from batches
+
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            stats = score_stream(model, chained(), out, keep=keep, verbose=not args.quiet)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        print(stats, file=sys.stderr)
+    else:
+        server = serve(model, args.host, args.port)
+        print(f"Serving POST http://{args.host}:{args.port}/score", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .stage_cache import data_fingerprint
+from .stats_cube import _add_moments, _cells, _rollup
+
+# Aggregates kept by the default shared cache
+DEFAULT_MAX_ENTRIES = 64
+
+# Output columns of SegmentMetrics.metrics
+METRICS = [
+    "exposure",
+    "claim_count",
+    "claim_frequency",
+    "claim_severity",
+    "margin",
+    "premium",
+    "loss_ratio",
+]
+
+
+def _normalize_filters(filters: dict | None) -> tuple:
+    """{col: value or values} → hashable ((col, (values...)), ...), sorted."""
+    items = []
+    for col, value in (filters or {}).items():
+        values = value if isinstance(value, (list, tuple, set, pd.Index, np.ndarray)) else [value]
+        items.append((col, tuple(sorted(set(values), key=repr))))
+    return tuple(sorted(items))
+
+
+class MetricCache:
+    """
+    LRU of segment aggregates keyed by (dataset fingerprint, segment
+    columns, filters). Each entry holds the stats_cube measures
+    per cell, so any coarser segmentation can be rolled up from it.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.rollups = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        cells = self.entries.get(key)
+        if cells is not None:
+            self.entries.move_to_end(key)
+        return cells
+
+    def put(self, key: tuple, cells: pd.DataFrame):
+        self.entries[key] = cells
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def finer(self, fingerprint: str, by: tuple, filters: tuple):
+        """
+        Smallest cached aggregate that `by` under `filters` can be rolled up
+        from: same data, a superset of the segment columns, and filters that
+        are a subset of the requested ones, the rest being on its columns.
+        Returns (key, cells) or (None, None).
+        """
+        wanted, best = set(by), (None, None)
+        for key, cells in self.entries.items():
+            fp, entry_by, entry_filters = key
+            if fp != fingerprint or not wanted <= set(entry_by):
+                continue
+            if not set(entry_filters) <= set(filters):
+                continue
+            extra = set(filters) - set(entry_filters)
+            if not all(col in entry_by for col, _ in extra):
+                continue
+            if best[1] is None or len(cells) < len(best[1]):
+                best = (key, cells)
+        return best
+
+    def clear(self):
+        self.entries.clear()
+
+
+DEFAULT_CACHE = MetricCache()
+
+
+class SegmentMetrics:
+    """
+    Claim frequency, severity, margin, premium, loss ratio and exposure for
+    any combination of segmentation columns, in one groupby pass.
+
+    Replaces calculate_claim_frequency / calculate_claim_severity /
+    calculate_margin applied per group: the same numbers for every group at
+    once, from cached cell aggregates whenever the same or a finer
+    segmentation of the same data was computed before.
+    """
+
+    def __init__(self, df: pd.DataFrame, fingerprint: str | None = None,
+                 cache: MetricCache | None = None):
+        self.df = df
+        self._fingerprint = fingerprint
+        self.cache = cache if cache is not None else DEFAULT_CACHE
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = data_fingerprint(self.df)
+        return self._fingerprint
+
+    def cells(self, by, filters: dict | None = None) -> pd.DataFrame:
+        """
+        Measures (stats_cube.MEASURES) per segment of `by` after
+        `filters` ({col: value or list of values}), from the cache when possible.
+        """
+        by = (by,) if isinstance(by, str) else tuple(by)
+        filters = _normalize_filters(filters)
+        key = (self.fingerprint, by, filters)
+
+        cells = self.cache.get(key)
+        if cells is not None:
+            self.cache.hits += 1
+            return cells
+
+        source_key, source = self.cache.finer(self.fingerprint, by, filters)
+        if source is not None:
+            self.cache.rollups += 1
+            source = source.reset_index()
+            for col, values in set(filters) - set(source_key[2]):
+                source = source[source[col].isin(values)]
+            cells = _rollup(source, list(by), dropna=False)
+        else:
+            self.cache.misses += 1
+            df = self.df
+            if filters:
+                mask = np.ones(len(df), dtype=bool)
+                for col, values in filters:
+                    mask &= df[col].isin(values).to_numpy()
+                df = df[mask]
+            cells = _cells(df, list(by))
+
+        cells = cells.sort_index()
+        self.cache.put(key, cells)
+        return cells
+
+    def metrics(self, by, filters: dict | None = None) -> pd.DataFrame:
+        """
+        METRICS per segment, matching the Hypothesis_helper definitions:
+        - exposure: rows (policy-months); claim_count: rows with a claim
+        - claim_frequency: % of rows with a claim
+        - claim_severity: mean of positive totalclaims (0 without claims)
+        - margin, premium: mean margin and totalpremium
+        - loss_ratio: total claims / total premium
+        """
+        agg = _add_moments(self.cells(by, filters).copy())
+        out = pd.DataFrame(index=agg.index)
+        out["exposure"] = agg["n"]
+        out["claim_count"] = agg["claims"]
+        out["claim_frequency"] = agg["claim_frequency"] * 100
+        out["claim_severity"] = agg["severity_mean"].fillna(0)
+        out["margin"] = agg["margin_mean"]
+        out["premium"] = agg["premium_mean"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # margin = premium - claims per row, so the claims total is their difference
+            out["loss_ratio"] = (agg["premium_sum"] - agg["margin_sum"]) / agg["premium_sum"]
+        return out
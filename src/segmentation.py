@@ -1,5 +1,9 @@
 import pandas as pd
 
+from .instrumentation import instrumented
+
+
+@instrumented
 def create_ab_groups(df, feature, A_val, B_val):
     """Return A/B segmented dataset based on feature values"""
     subset = df[df[feature].isin([A_val, B_val])].copy()
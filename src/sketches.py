@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch for streaming numeric data.
+
+    - Keeps at most `k` items per level; full levels are sorted and every
+      other item (random offset) is promoted with double weight
+    - Exact while fewer than `k` values have been seen
+    - Rank error is roughly log2(n / k) / k, e.g. < 0.5% for 1M values at k=2048
+    - Sketches built on separate chunks can be merged
+    """
+
+    def __init__(self, k: int = 2048, seed: int | None = 0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        self.count += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.size > self.k:
+                items = np.sort(items)
+                keep = items[-1:] if items.size % 2 else items[:0]
+                pairs = items[: items.size - keep.size]
+                promoted = pairs[self._rng.integers(2)::2]
+
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, q):
+        """Approximate quantile(s) for q in [0, 1]; NaN when empty."""
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+
+        if self.count == 0:
+            out = np.full(q.shape, np.nan)
+            return out[0] if scalar else out
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(level.size, 2.0 ** h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+
+        # Midpoint ranks, interpolated like pandas' "linear" quantile
+        cum = np.cumsum(weights)
+        ranks = (cum - weights / 2) / cum[-1]
+        out = np.interp(q, ranks, items)
+
+        # Extremes are tracked exactly
+        out = np.where(q <= 0, self.min, out)
+        out = np.where(q >= 1, self.max, out)
+        return out[0] if scalar else out
+
+    def median(self) -> float:
+        return float(self.quantile(0.5))
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "count": int(self.count),
+            "min": float(self.min),
+            "max": float(self.max),
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "QuantileSketch":
+        sketch = cls(k=state["k"])
+        sketch.count = state["count"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        sketch.levels = [np.asarray(level, dtype=float) for level in state["levels"]]
+        return sketch
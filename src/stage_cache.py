@@ -0,0 +1,377 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import DATA_DIR, _apply_categories, _parquet_categories, load_data
+
+CACHE_DIR = DATA_DIR / "cache" / "stages"
+
+# Least recently used entries are evicted above this total size
+DEFAULT_MAX_BYTES = 4 * 2 ** 30
+
+# Bump to invalidate every entry when the storage format changes
+CACHE_VERSION = 1
+
+
+# ===============================
+# 1. FINGERPRINTS
+# ===============================
+
+def data_fingerprint(df: pd.DataFrame, columns: list | None = None) -> str:
+    """Content hash of a frame's values, column names and dtypes (index excluded)."""
+    columns = sorted(columns or df.columns)
+    digest = hashlib.sha256()
+    digest.update(repr([(c, str(df[c].dtype)) for c in columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: Path) -> str:
+    """Identity of a file on disk (resolved path, size, mtime) without reading it."""
+    path = Path(path).resolve()
+    if path.is_dir():
+        files = sorted(p for p in path.rglob("*") if p.is_file())
+    else:
+        files = [path]
+    stats = [(str(p), p.stat().st_size, p.stat().st_mtime_ns) for p in files]
+    return hashlib.sha256(repr(stats).encode()).hexdigest()
+
+
+def _code_names(code) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+# Package whose modules are hashed whole when a stage reaches into them
+_PACKAGE = __name__.rpartition(".")[0]
+
+
+def _package_module(value) -> str | None:
+    """Name of the module of this package a function, class or module comes from."""
+    if inspect.ismodule(value):
+        name = value.__name__
+    elif inspect.isfunction(value) or inspect.isclass(value):
+        name = value.__module__
+    else:
+        return None
+    return name if _PACKAGE and name.startswith(_PACKAGE + ".") else None
+
+
+def _module_source(name: str) -> str:
+    try:
+        return inspect.getsource(sys.modules[name])
+    except (KeyError, OSError, TypeError):
+        return name
+
+
+def code_fingerprint(fn) -> str:
+    """
+    Hash of a function's source plus what it reads from its own module:
+    same-module helper functions and classes (recursively) and plain
+    constants such as NUMERIC_LIKE or MISSING_DROP_THRESHOLD. Anything it
+    uses from other modules of the package (e.g. outliers.Winsorizer) adds
+    the whole source of that module and, transitively, of the package
+    modules it imports from (sketches.QuantileSketch).
+    """
+    seen, modules, parts = set(), set(), []
+
+    def visit_module(name):
+        if name in modules:
+            return
+        modules.add(name)
+        parts.append(_module_source(name))
+        for value in list(vars(sys.modules[name]).values()):
+            other = _package_module(value)
+            if other is not None:
+                visit_module(other)
+
+    def visit(f):
+        # Hash the function itself, not an @instrumented wrapper around it
+        f = inspect.unwrap(f)
+        if f in seen:
+            return
+        seen.add(f)
+        try:
+            parts.append(inspect.getsource(f))
+        except (OSError, TypeError):
+            parts.append(f"{f.__module__}.{f.__qualname__}")
+        code = getattr(f, "__code__", None)
+        if code is None:
+            return
+        for name in sorted(_code_names(code)):
+            value = f.__globals__.get(name)
+            if inspect.isfunction(value) and value.__module__ == f.__module__:
+                visit(value)
+            elif inspect.isclass(value) and value.__module__ == f.__module__:
+                if value not in seen:
+                    seen.add(value)
+                    try:
+                        parts.append(inspect.getsource(value))
+                    except (OSError, TypeError):
+                        parts.append(f"{value.__module__}.{value.__qualname__}")
+            elif _package_module(value) is not None:
+                visit_module(_package_module(value))
+            elif isinstance(value, (str, int, float, bool, tuple, list, dict, frozenset)):
+                parts.append(f"{name}={value!r}")
+
+    visit(fn)
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+# ===============================
+# 2. CACHE
+# ===============================
+
+class StageCache:
+    """
+    Content-addressed memoization of DataFrame → DataFrame stages.
+
+    An entry's key hashes the input fingerprint, the stage's code
+    (code_fingerprint), its parameters and the pandas version. The key also
+    serves as the output's fingerprint, so chained stages never re-hash data.
+    Entries are Parquet files under `root`; reads refresh an entry's mtime
+    and the least recently used entries are deleted once the store exceeds
+    `max_bytes`.
+    """
+
+    def __init__(self, root: Path | str = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- keys and storage ----------
+
+    def key(self, fn, fingerprint: str, params: dict | None = None) -> str:
+        payload = json.dumps(
+            {
+                "version": CACHE_VERSION,
+                "pandas": pd.__version__,
+                "stage": f"{fn.__module__}.{fn.__qualname__}",
+                "code": code_fingerprint(fn),
+                "params": params or {},
+                "input": fingerprint,
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.parquet"
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        df = pd.read_parquet(path)
+        df = _apply_categories(df, _parquet_categories(path))
+        os.utime(path)
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        """Stores an output; frames Parquet cannot represent are not cached."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(".tmp")
+        try:
+            df.to_parquet(tmp, engine="pyarrow")
+        except (ValueError, TypeError, NotImplementedError):
+            tmp.unlink(missing_ok=True)
+            return
+        tmp.replace(self._path(key))
+        self.evict(keep=key)
+
+    def entries(self) -> pd.DataFrame:
+        files = list(self.root.glob("*.parquet")) if self.root.exists() else []
+        stats = [(p.stem, p.stat().st_size, p.stat().st_mtime) for p in files]
+        return pd.DataFrame(stats, columns=["key", "bytes", "last_used"]).sort_values("last_used")
+
+    def evict(self, keep: str | None = None):
+        """
+        Deletes least recently used entries until the store fits max_bytes,
+        never the entry `keep` (the one put() just wrote).
+        """
+        entries = self.entries()
+        excess = entries["bytes"].sum() - self.max_bytes
+        for key, size in zip(entries["key"], entries["bytes"]):
+            if excess <= 0:
+                break
+            if key == keep:
+                continue
+            self._path(key).unlink(missing_ok=True)
+            excess -= size
+
+    def clear(self):
+        for key in self.entries()["key"]:
+            self._path(key).unlink(missing_ok=True)
+
+    # ---------- running stages ----------
+
+    def _memoized(self, key: str, compute, store: bool = True):
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, key
+        self.misses += 1
+        out = compute()
+        if store:
+            self.put(key, out)
+        return out, key
+
+    def run(self, fn, df: pd.DataFrame, fingerprint: str | None = None, store: bool = True, **params):
+        """
+        Returns (fn(df, **params), output fingerprint), loading the output
+        from the store when the same code already ran on the same input.
+        `df` is passed to fn as is, so in-place stages may modify it.
+        store=False only computes the key and never writes the output.
+        """
+        fingerprint = fingerprint or data_fingerprint(df)
+        key = self.key(fn, fingerprint, params)
+        return self._memoized(key, lambda: fn(df, **params), store)
+
+    def load_key(self, filename: str, loader=load_data, **kwargs) -> str:
+        """Fingerprint of loader(filename, **kwargs), from the file's identity alone."""
+        fingerprint = file_fingerprint(DATA_DIR / filename)
+        return self.key(loader, fingerprint, {"filename": str(filename), **kwargs})
+
+    def load(self, filename: str, loader=load_data, **kwargs):
+        """
+        loader(filename, **kwargs) (load_data, load_raw, ...) memoized on the
+        file's identity rather than its content → (df, fingerprint).
+        Not for chunksize reads.
+        """
+        key = self.load_key(filename, loader, **kwargs)
+        return self._memoized(key, lambda: loader(filename, **kwargs))
+
+    # ---------- chains ----------
+
+    def _alias_path(self, block: "Partitioned", fingerprint: str) -> Path:
+        codes = [(name, code_fingerprint(fn)) for name, fn in block.stages]
+        payload = json.dumps([CACHE_VERSION, codes, block.by, fingerprint])
+        return self.root / f"{hashlib.sha256(payload.encode()).hexdigest()[:32]}.json"
+
+    def _output_key(self, step, fingerprint: str) -> str | None:
+        if isinstance(step, Partitioned):
+            alias = self._alias_path(step, fingerprint)
+            return json.loads(alias.read_text())["fingerprint"] if alias.exists() else None
+        return self.key(step[1], fingerprint)
+
+    def run_chain(self, stages: list, source, fingerprint: str | None = None, on_stage=None,
+                  keep: str = "last"):
+        """
+        Runs stages ([(name, fn), ...] or Partitioned blocks) in order →
+        (output, fingerprint).
+
+        `source` is the input frame or a zero-argument callable loading it.
+        All keys are first derived from `fingerprint` alone; only the output
+        of the last stage found in the store is read, and the input is only
+        loaded when no stored output can be used. on_stage(name, df,
+        seconds, cached) is called for every step that is read or run.
+        keep="last" stores only the final output (and each partition's);
+        keep="all" also stores every intermediate stage.
+        """
+        load = source if callable(source) else (lambda: source)
+        if fingerprint is None:
+            frame = load()
+            load, fingerprint = (lambda: frame), data_fingerprint(frame)
+        on_stage = on_stage or (lambda *args: None)
+
+        outputs, key = [], fingerprint
+        for step in stages:
+            key = self._output_key(step, key) if key else None
+            outputs.append(key)
+
+        df, done = None, 0
+        for i in reversed(range(len(stages))):
+            if outputs[i] is None or isinstance(stages[i], Partitioned):
+                continue
+            start = time.perf_counter()
+            df = self.get(outputs[i])
+            if df is not None:
+                self.hits += 1
+                done, fingerprint = i + 1, outputs[i]
+                names = " + ".join(_step_name(step) for step in stages[:done])
+                on_stage(names, df, time.perf_counter() - start, 1.0)
+                break
+        if df is None:
+            df = load()
+
+        for i, step in enumerate(stages[done:], start=done):
+            start, hits = time.perf_counter(), self.hits
+            if isinstance(step, Partitioned):
+                df, fingerprint, cached = self.run_partitioned(step, df, fingerprint)
+            else:
+                store = keep == "all" or i == len(stages) - 1
+                df, fingerprint = self.run(step[1], df, fingerprint, store=store)
+                cached = float(self.hits > hits)
+            on_stage(_step_name(step), df, time.perf_counter() - start, cached)
+        return df, fingerprint
+
+    def run_partitioned(self, block: "Partitioned", df: pd.DataFrame, fingerprint: str | None = None):
+        """
+        Runs a Partitioned block separately on every partition of
+        df[block.by]. Partitions are fingerprinted by content, so only new or
+        changed partitions are recomputed. Returns (frame in the original row
+        order, fingerprint, share of partitions served from the store).
+        """
+        codes, _ = pd.factorize(df[block.by].to_numpy(), use_na_sentinel=False)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.cumsum(np.bincount(codes))[:-1]
+
+        parts, part_keys, cached = [], [], 0
+        for rows in np.split(order, bounds):
+            misses = self.misses
+            # A copy, not a slice: the stages modify their input in place
+            part, key = self.run_chain(block.stages, df.iloc[rows].copy())
+            cached += self.misses == misses
+            parts.append(part.set_axis(df.index[rows]))
+            part_keys.append(key)
+
+        out = _concat_parts(parts).iloc[np.argsort(order, kind="stable")]
+        combined = hashlib.sha256("|".join(sorted(part_keys)).encode()).hexdigest()[:32]
+        if fingerprint is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._alias_path(block, fingerprint).write_text(json.dumps({"fingerprint": combined}))
+        return out, combined, cached / max(1, len(parts))
+
+
+class Partitioned:
+    """
+    Row-wise stages ([(name, fn), ...], one output row per input row, in
+    order) that run_chain applies per partition of column `by`, e.g. the
+    transaction month.
+    """
+
+    def __init__(self, stages: list, by: str):
+        self.stages = list(stages)
+        self.by = by
+
+
+def _step_name(step) -> str:
+    if isinstance(step, Partitioned):
+        return " + ".join(name for name, _ in step.stages) + f" [by {step.by}]"
+    return step[0]
+
+
+def _concat_parts(parts: list) -> pd.DataFrame:
+    """Concatenates partitions, unioning categoricals whose categories differ."""
+    first = parts[0]
+    for col in first.columns:
+        if isinstance(first[col].dtype, pd.CategoricalDtype):
+            dtypes = {str(p[col].dtype.categories.tolist()) for p in parts}
+            if len(dtypes) > 1:
+                union = pd.api.types.union_categoricals(
+                    [p[col] for p in parts], sort_categories=True
+                ).categories
+                parts = [p.assign(**{col: p[col].cat.set_categories(union)}) for p in parts]
+    return pd.concat(parts)
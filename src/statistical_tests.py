@@ -1,19 +1,86 @@
-from scipy.stats import chi2_contingency, ttest_ind, f_oneway
-from effects import cramers_v, cohens_d
+from .effects import cramers_v, cohens_d
+import numpy as np
 import pandas as pd
+
+from .instrumentation import instrumented
+
+@instrumented
 def claim_frequency_test(df):
+    from scipy.stats import chi2_contingency
+
     cont = pd.crosstab(df['ab_group'], df['has_claim'])
     chi2, p, _, _ = chi2_contingency(cont)
     return chi2, p, cramers_v(cont)
 
+@instrumented
 def claim_severity_test(df):
+    from scipy.stats import ttest_ind
+
     A = df[(df['ab_group'] == 'A_Control') & (df['totalclaims'] > 0)]['totalclaims']
     B = df[(df['ab_group'] == 'B_Test') & (df['totalclaims'] > 0)]['totalclaims']
     t, p = ttest_ind(A, B, equal_var=False)
     return t, p, cohens_d(A, B)
 
+@instrumented
 def margin_test(df):
-    A = df[df['ab_group'] == 'A_Control']['margin']
-    B = df[df['ab_group'] == 'B_Test']['margin']
-    f, p = f_oneway(A, B)
+    # One-way ANOVA of the two arms from their moments (no masked copies)
+    codes = pd.Index(['A_Control', 'B_Test']).get_indexer(df['ab_group'])
+    values = df['margin'].to_numpy(dtype=float)
+    valid = (codes >= 0) & ~np.isnan(values)
+    f, p = anova_from_moments(*grouped_moments(codes[valid], values[valid], 2))
     return f, p
+
+
+def grouped_moments(codes, values, k):
+    """
+    Per-group size, mean and sample variance of `values` for group codes
+    0..k-1, from bincounts. Squares are taken around the overall mean
+    to keep variances accurate for large values such as totalclaims, and
+    constant groups get a variance of exactly 0 (not cancellation noise).
+    """
+    shift = values.mean() if len(values) else 0.0
+    centered = values - shift
+    n = np.bincount(codes, minlength=k).astype(float)
+    s = np.bincount(codes, weights=centered, minlength=k)
+    ss = np.bincount(codes, weights=centered * centered, minlength=k)
+    # Distance of every value from its group's first value: 0 for constant groups
+    first = np.zeros(k)
+    first[codes[::-1]] = values[::-1]
+    spread = np.bincount(codes, weights=np.abs(values - first[codes]), minlength=k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = s / n + shift
+        var = (ss - s * s / n) / (n - 1)
+    var = np.where(spread > 0, np.clip(var, 0, None), np.where(n > 1, 0.0, var))
+    return n, mean, var
+
+
+def welch_t_from_moments(n1, mean1, var1, n2, mean2, var2):
+    """Welch's t-test (t, p) from group sizes, means and sample variances."""
+    from scipy.stats import t as t_dist
+
+    se1, se2 = var1 / n1, var2 / n2
+    t = (mean1 - mean2) / np.sqrt(se1 + se2)
+    dof = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+    return t, 2 * t_dist.sf(np.abs(t), dof)
+
+
+def anova_from_moments(n, mean, var):
+    """Classic one-way ANOVA (F, p) from per-group sizes, means and variances."""
+    from scipy.stats import f as f_dist
+
+    n, mean, var = (np.asarray(x, dtype=float) for x in (n, mean, var))
+    keep = n > 0
+    n, mean, var = n[keep], mean[keep], np.nan_to_num(var[keep])
+    k, total = len(n), n.sum()
+
+    grand = (n * mean).sum() / total
+    between = (n * (mean - grand) ** 2).sum() / (k - 1)
+    within = ((n - 1) * var).sum() / (total - k)
+    f = between / within
+    return f, f_dist.sf(f, k - 1, total - k)
+
+
+def cohens_d_from_moments(mean1, var1, mean2, var2):
+    """Same pooling as effects.cohens_d, from variances."""
+    pooled = np.sqrt((var1 + var2) / 2)
+    return (mean1 - mean2) / pooled if pooled > 0 else 0
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from .data_loader import load_data, save_data
+from .effects import cramers_v
+from .statistical_tests import (
+    anova_from_moments,
+    cohens_d_from_moments,
+    welch_t_from_moments,
+)
+
+# Segmentation dimensions the cube is keyed on
+CUBE_DIMS = ["province", "postalcode", "gender", "vehicletype", "covertype", "month"]
+
+# Measures stored per cell: counts and sums add up, the m2 (sum of squared
+# deviations from the cell mean) are merged by _rollup
+MEASURES = [
+    "n",
+    "claims",
+    "severity_n",
+    "severity_sum",
+    "severity_m2",
+    "margin_sum",
+    "margin_m2",
+    "premium_sum",
+    "premium_m2",
+]
+
+# (metric, count column) of each centered second moment
+MOMENTS = [("severity", "severity_n"), ("margin", "n"), ("premium", "n")]
+
+CUBE_FILE = "stats_cube.parquet"
+
+
+def _cells(df: pd.DataFrame, dims: list) -> pd.DataFrame:
+    """One groupby pass producing the additive measures per dimension cell."""
+    claims = df["totalclaims"].to_numpy(dtype=float)
+    premium = df["totalpremium"].to_numpy(dtype=float)
+    margin = (
+        df["margin"].to_numpy(dtype=float)
+        if "margin" in df.columns
+        else premium - claims
+    )
+    positive = claims > 0
+    severity = np.where(positive, claims, 0.0)
+
+    keys = {}
+    for dim in dims:
+        if dim == "month" and "month" not in df.columns:
+            keys[dim] = df["transactionmonth"].dt.to_period("M").dt.to_timestamp()
+        else:
+            keys[dim] = df[dim]
+
+    # Each row is a cell of its own (m2 = 0), rolled up to dims
+    measures = pd.DataFrame(
+        {
+            **{dim: key.array for dim, key in keys.items()},
+            "n": 1,
+            "claims": df["has_claim"].to_numpy() if "has_claim" in df.columns else positive,
+            "severity_n": positive,
+            "severity_sum": severity,
+            "severity_m2": 0.0,
+            "margin_sum": margin,
+            "margin_m2": 0.0,
+            "premium_sum": premium,
+            "premium_m2": 0.0,
+        }
+    )
+    return _rollup(measures, dims, sort=False, dropna=False)
+
+
+def _rollup(cells: pd.DataFrame, by, **groupby_kwargs) -> pd.DataFrame:
+    """
+    Merges cells (grouped by `by`, columns or index levels) into one row per
+    group: counts and sums are added, m2 combined with Chan's parallel
+    formula m2 = sum(m2_i) + sum(n_i * (mean_i - mean)^2), which stays
+    accurate for large values where raw sums of squares cancel.
+    """
+    grouped = cells.groupby(by, observed=True, **groupby_kwargs)
+    cells = cells.copy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name, count in MOMENTS:
+            n = cells[count].to_numpy(dtype=float)
+            group_n = grouped[count].transform("sum").to_numpy(dtype=float)
+            mean = grouped[f"{name}_sum"].transform("sum").to_numpy(dtype=float) / group_n
+            deviation = cells[f"{name}_sum"].to_numpy(dtype=float) / n - mean
+            cells[f"{name}_m2"] += np.where(n > 0, n * deviation * deviation, 0.0)
+    return cells.groupby(by, observed=True, **groupby_kwargs)[MEASURES].sum()
+
+
+def _from_sumsq(cells: pd.DataFrame) -> pd.DataFrame:
+    """Converts cells stored with raw sums of squares (<name>_sumsq) to m2."""
+    for name, count in MOMENTS:
+        sumsq = f"{name}_sumsq"
+        if sumsq in cells.columns:
+            n, s = cells[count], cells[f"{name}_sum"]
+            m2 = (cells.pop(sumsq) - s * s / n.where(n > 0)).fillna(0.0).clip(lower=0)
+            cells.insert(cells.columns.get_loc(f"{name}_sum") + 1, f"{name}_m2", m2)
+    return cells
+
+
+def _add_moments(agg: pd.DataFrame) -> pd.DataFrame:
+    """Means and sample variances from rolled-up measures."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name, count in MOMENTS:
+            n = agg[count]
+            agg[f"{name}_mean"] = agg[f"{name}_sum"] / n
+            agg[f"{name}_var"] = agg[f"{name}_m2"] / (n - 1)
+        agg["claim_frequency"] = agg["claims"] / agg["n"]
+    return agg
+
+
+class StatsCube:
+    """
+    Persisted sufficient-statistics cube over CUBE_DIMS.
+
+    Each cell holds n, claim count and the sum and m2 (centered sum of
+    squares) of positive totalclaims, margin and totalpremium, so frequency, severity and margin tests can
+    be run on any slice without touching the row-level data.
+    """
+
+    def __init__(self, cells: pd.DataFrame, dims: list | None = None):
+        self.dims = list(dims or cells.index.names)
+        self.cells = cells
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims: list | None = None) -> "StatsCube":
+        dims = [d for d in (dims or CUBE_DIMS) if d in df.columns or d == "month"]
+        return cls(_cells(df, dims), dims)
+
+    def update(self, df_new: pd.DataFrame) -> "StatsCube":
+        """Adds new rows (e.g. a new month) by merging their cells in."""
+        new = _cells(df_new, self.dims)
+        combined = pd.concat([self.cells.reset_index(), new.reset_index()], ignore_index=True)
+        for dim in self.dims:
+            if dim != "month":
+                combined[dim] = combined[dim].astype("category")
+        self.cells = _rollup(combined, self.dims, sort=False, dropna=False)
+        return self
+
+    # ---------- persistence ----------
+
+    def save(self, filename: str = CUBE_FILE):
+        return save_data(self.cells.reset_index(), filename)
+
+    @classmethod
+    def load(cls, filename: str = CUBE_FILE, dims: list | None = None) -> "StatsCube":
+        cells = _from_sumsq(load_data(filename))
+        dims = dims or [c for c in cells.columns if c not in MEASURES]
+        return cls(cells.set_index(dims), dims)
+
+    # ---------- slicing ----------
+
+    def slice(self, by, filters: dict | None = None) -> pd.DataFrame:
+        """
+        Rolls the cube up to `by` (column or list) after `filters`
+        ({dim: value or list of values}) and adds means/variances.
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        cells = self.cells.reset_index()
+        for dim, value in (filters or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            cells = cells[cells[dim].isin(values)]
+        agg = _rollup(cells, by)
+        return _add_moments(agg)
+
+    def _pair(self, feature, a_val, b_val, filters=None):
+        agg = self.slice(feature, {**(filters or {}), feature: [a_val, b_val]})
+        return agg.loc[a_val], agg.loc[b_val]
+
+    # ---------- tests (same return shapes as statistical_tests) ----------
+
+    def claim_frequency_test(self, feature, a_val=None, b_val=None, filters=None):
+        """Chi-squared on level × has_claim counts → (chi2, p, cramers_v)."""
+        from scipy.stats import chi2_contingency
+
+        if a_val is not None:
+            filters = {**(filters or {}), feature: [a_val, b_val]}
+        agg = self.slice(feature, filters)
+        table = np.column_stack([agg["n"] - agg["claims"], agg["claims"]])
+        table = table[:, table.sum(axis=0) > 0]
+        chi2, p, _, _ = chi2_contingency(table)
+        return chi2, p, cramers_v(table)
+
+    def claim_severity_test(self, feature, a_val, b_val, filters=None):
+        """Welch t on positive totalclaims → (t, p, cohens_d)."""
+        a, b = self._pair(feature, a_val, b_val, filters)
+        t, p = welch_t_from_moments(
+            a["severity_n"], a["severity_mean"], a["severity_var"],
+            b["severity_n"], b["severity_mean"], b["severity_var"],
+        )
+        d = cohens_d_from_moments(a["severity_mean"], a["severity_var"], b["severity_mean"], b["severity_var"])
+        return t, p, d
+
+    def margin_test(self, feature, a_val, b_val, filters=None):
+        """One-way ANOVA on margin for two levels → (f, p)."""
+        agg = self.slice(feature, {**(filters or {}), feature: [a_val, b_val]})
+        return anova_from_moments(agg["n"], agg["margin_mean"], agg["margin_var"])
+
+    def anova(self, feature, metric="severity", filters=None):
+        """
+        One-way ANOVA across all levels of `feature` for
+        metric in {"severity", "margin", "premium"} → (f, p).
+        """
+        count = "severity_n" if metric == "severity" else "n"
+        agg = self.slice(feature, filters)
+        return anova_from_moments(agg[count], agg[f"{metric}_mean"], agg[f"{metric}_var"])
@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+
+from .cleaning import (
+    CATEGORICAL_LIKE,
+    MISSING_DROP_THRESHOLD,
+    NUMERIC_LIKE,
+    OUTLIER_COLUMNS,
+    add_derived_fields,
+    date_columns,
+    standardize_columns,
+)
+from .data_loader import DATA_DIR, load_raw
+from .dtype_planner import plan_path
+from .sketches import QuantileSketch
+
+
+# ===============================
+# 1. PER-CHUNK CONVERSION
+# ===============================
+
+def convert_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Renames + date/numeric conversion of one raw chunk (no categories yet)."""
+    chunk.columns = standardize_columns(chunk.columns)
+
+    for col in date_columns(chunk.columns):
+        chunk[col] = pd.to_datetime(chunk[col], errors="coerce")
+
+    for col in NUMERIC_LIKE:
+        if col in chunk.columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+
+    return chunk
+
+
+def _plain_counts(counts: pd.Series) -> pd.Series:
+    # Categorical indexes from different chunks don't align on add()
+    counts.index = pd.Index(counts.index.tolist())
+    return counts
+
+
+# ===============================
+# 2. PASS 1: COLUMN STATISTICS
+# ===============================
+
+class ColumnStats:
+    """
+    Mergeable per-column statistics built chunk by chunk:
+    - missing counts (→ columns to drop)
+    - quantile sketches for numeric columns (→ medians, clip bounds)
+    - value counts for categorical columns (→ modes, category sets)
+    """
+
+    def __init__(self, k: int = 2048):
+        self.k = k
+        self.rows = 0
+        self.missing = pd.Series(dtype="int64")
+        self.sketches = {}
+        self.counts = {}
+        self.numeric_dtypes = {}
+        self.object_cols = set()
+
+    def update(self, chunk: pd.DataFrame) -> "ColumnStats":
+        self.rows += len(chunk)
+        self.missing = self.missing.add(chunk.isna().sum(), fill_value=0)
+
+        for col in chunk.select_dtypes(include="number").columns:
+            values = chunk[col].to_numpy(dtype=float, na_value=np.nan)
+            self.sketches.setdefault(col, QuantileSketch(k=self.k)).update(values)
+            prev = self.numeric_dtypes.get(col, chunk[col].dtype)
+            self.numeric_dtypes[col] = np.result_type(prev, chunk[col].dtype)
+
+        for col in self.categorical_columns(chunk):
+            counts = _plain_counts(chunk[col].value_counts())
+            if col in self.counts:
+                counts = self.counts[col].add(counts, fill_value=0)
+            self.counts[col] = counts
+
+        self.object_cols.update(chunk.select_dtypes(include="object").columns)
+        return self
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        self.rows += other.rows
+        self.missing = self.missing.add(other.missing, fill_value=0)
+        for col, sketch in other.sketches.items():
+            if col in self.sketches:
+                self.sketches[col].merge(sketch)
+            else:
+                self.sketches[col] = sketch
+        for col, counts in other.counts.items():
+            self.counts[col] = self.counts[col].add(counts, fill_value=0) if col in self.counts else counts
+        for col, dtype in other.numeric_dtypes.items():
+            self.numeric_dtypes[col] = np.result_type(self.numeric_dtypes.get(col, dtype), dtype)
+        self.object_cols |= other.object_cols
+        return self
+
+    @staticmethod
+    def categorical_columns(chunk: pd.DataFrame) -> list:
+        declared = [c for c in CATEGORICAL_LIKE if c in chunk.columns]
+        already = chunk.select_dtypes(include="category").columns
+        return list(dict.fromkeys(declared + list(already)))
+
+    def missing_fraction(self) -> pd.Series:
+        return self.missing / self.rows if self.rows else self.missing
+
+    def columns_to_drop(self) -> list:
+        pct = self.missing_fraction()
+        return pct[pct > MISSING_DROP_THRESHOLD].index.tolist()
+
+    def medians(self) -> dict:
+        return {col: sketch.median() for col, sketch in self.sketches.items()}
+
+    def quantiles(self, lower: float, upper: float, columns=None) -> dict:
+        return {
+            col: tuple(sketch.quantile([lower, upper]))
+            for col, sketch in self.sketches.items()
+            if sketch.count and (columns is None or col in columns)
+        }
+
+    def modes(self) -> dict:
+        modes = {}
+        for col, counts in self.counts.items():
+            counts = counts[counts > 0]
+            modes[col] = counts.idxmax() if len(counts) else "Unknown"
+        return modes
+
+    def category_dtype(self, col: str) -> pd.CategoricalDtype:
+        categories = self.counts[col]
+        categories = categories[categories > 0].index
+        try:
+            categories = categories.sort_values()
+        except TypeError:
+            pass
+        return pd.CategoricalDtype(categories)
+
+
+def collect_stats(chunks, k: int = 2048) -> ColumnStats:
+    """Pass 1: statistics over converted chunks."""
+    stats = ColumnStats(k=k)
+    for chunk in chunks:
+        stats.update(convert_chunk(chunk))
+    return stats
+
+
+# ===============================
+# 3. PASS 2: CHUNK CLEANING
+# ===============================
+
+class ChunkCleaner:
+    """
+    Applies the clean_data steps to one chunk using pass-1 statistics,
+    so every chunk gets the same drops, fills, categories and caps.
+    Caps apply to clip_columns only (default: cleaning.OUTLIER_COLUMNS,
+    as in apply_outlier_treatment), never to claims or ID / code columns.
+    """
+
+    def __init__(self, stats: ColumnStats, clip_quantiles: tuple | None = None, clip_columns=None):
+        self.stats = stats
+        self.drop = stats.columns_to_drop()
+        self.medians = stats.medians()
+        self.modes = stats.modes()
+        self.category_dtypes = {col: stats.category_dtype(col) for col in stats.counts}
+        columns = OUTLIER_COLUMNS if clip_columns is None else list(clip_columns)
+        self.clip_bounds = stats.quantiles(*clip_quantiles, columns=columns) if clip_quantiles else {}
+
+    def __call__(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = convert_chunk(chunk)
+        chunk = chunk.drop(columns=[c for c in self.drop if c in chunk.columns])
+
+        for col, dtype in self.category_dtypes.items():
+            if col not in chunk.columns:
+                continue
+            chunk[col] = chunk[col].astype(object).astype(dtype)
+            mode = self.modes[col]
+            if mode not in dtype.categories:
+                chunk[col] = chunk[col].cat.add_categories([mode])
+            chunk[col] = chunk[col].fillna(mode)
+
+        numeric = [c for c in self.stats.numeric_dtypes if c in chunk.columns]
+        chunk[numeric] = chunk[numeric].fillna({c: self.medians[c] for c in numeric})
+        for col in numeric:
+            chunk[col] = chunk[col].astype(self.stats.numeric_dtypes[col])
+
+        # Mixed object columns: keep a consistent string type across chunks
+        for col in self.stats.object_cols - set(self.category_dtypes):
+            if col in chunk.columns and chunk[col].dtype != object:
+                chunk[col] = chunk[col].astype(object).where(chunk[col].notna(), None)
+
+        chunk = add_derived_fields(chunk)
+
+        for col, (low, high) in self.clip_bounds.items():
+            if col in chunk.columns:
+                if pd.api.types.is_integer_dtype(chunk[col]):
+                    # Integer columns keep their dtype (caps rounded inwards, like Winsorizer)
+                    low, high = np.ceil(low), np.floor(high)
+                    high = max(high, low)
+                chunk[col] = chunk[col].clip(low, high)
+
+        return chunk
+
+
+# ===============================
+# 4. STREAMING PIPELINE
+# ===============================
+
+def clean_data_streaming(
+    filename: str = "MachineLearningRating_v3.txt",
+    output: str = "clean_data.parquet",
+    chunksize: int = 100_000,
+    partition_cols: list | None = None,
+    clip_quantiles: tuple | None = None,
+    k: int = 2048,
+):
+    """
+    Two-pass, bounded-memory version of clean_data for the raw file.
+
+    1. Stream chunks to build ColumnStats (missing %, sketches, counts)
+    2. Stream again, clean each chunk with ChunkCleaner and append it to
+       a Parquet dataset in data/
+
+    Peak memory is about one chunk plus the sketches; medians and clip
+    bounds match the in-memory path within sketch error. clip_quantiles
+    (e.g. (0.01, 0.99)) caps the continuous measures like
+    clean_data(outliers=True); it is off by default, as there. The output
+    gets no dtype plan (that needs the whole frame), so a stale one from an
+    earlier in-memory run is removed.
+    """
+    import shutil
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    stats = collect_stats(load_raw(filename, chunksize=chunksize), k=k)
+    cleaner = ChunkCleaner(stats, clip_quantiles=clip_quantiles)
+
+    chunks = (cleaner(chunk) for chunk in load_raw(filename, chunksize=chunksize))
+    first = pa.Table.from_pandas(next(chunks), preserve_index=False)
+    schema = pa.schema(
+        [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in first.schema],
+        metadata=first.schema.metadata,
+    )
+
+    def batches():
+        yield from first.cast(schema).to_batches()
+        for chunk in chunks:
+            yield from pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).to_batches()
+
+    path = DATA_DIR / output
+    if path.is_dir():
+        shutil.rmtree(path)
+    plan_path(path).unlink(missing_ok=True)
+
+    ds.write_dataset(
+        batches(),
+        path,
+        schema=schema,
+        format="parquet",
+        partitioning=partition_cols,
+        partitioning_flavor="hive" if partition_cols else None,
+        max_rows_per_group=chunksize,
+        existing_data_behavior="delete_matching",
+    )
+    return path, stats
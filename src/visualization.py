@@ -1,19 +1,39 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import numpy as np
+import pandas as pd
+
+from .plot_summaries import box_stats
 
 def visualize_ab(df, title):
+    """
+    Claim frequency, severity and sample size per A/B group. Every panel is
+    drawn from one aggregation: group counts / claim counts in one bincount
+    and severity box statistics of the positive claims.
+    """
+    import matplotlib.pyplot as plt
+
+    codes, groups = pd.factorize(df['ab_group'], sort=True)
+    valid = codes >= 0
+    sizes = np.bincount(codes[valid], minlength=len(groups))
+    claims = np.bincount(codes[valid], weights=df['has_claim'].to_numpy(dtype=float)[valid],
+                         minlength=len(groups))
+    severity = box_stats(df, 'totalclaims', by='ab_group', where=(df['totalclaims'] > 0).to_numpy())
+
+    summary = pd.DataFrame({'policies': sizes, 'claim_frequency': claims / sizes},
+                           index=pd.Index(groups, name='ab_group'))
+    summary = summary.join(severity.to_frame().add_prefix('severity_'))
+
     fig, ax = plt.subplots(1, 3, figsize=(16,5))
 
-    df.groupby('ab_group')['has_claim'].mean().plot.bar(ax=ax[0])
+    summary['claim_frequency'].plot.bar(ax=ax[0])
     ax[0].set_title("Claim Frequency (%)")
 
-    claims = df[df['totalclaims'] > 0]
-    sns.boxplot(data=claims, x='ab_group', y='totalclaims', ax=ax[1])
+    severity.plot(ax=ax[1])
     ax[1].set_title("Claim Severity")
 
-    df['ab_group'].value_counts().plot.bar(ax=ax[2])
+    summary['policies'].sort_values(ascending=False).plot.bar(ax=ax[2])
     ax[2].set_title("Sample Sizes")
 
     fig.suptitle(title, fontsize=14)
     plt.tight_layout()
     plt.show()
+    return summary
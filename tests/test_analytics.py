@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics import Analytics, available_engines
+from src.data_loader import save_data
+
+
+@pytest.fixture(scope="module")
+def clean_path(tmp_path_factory):
+    """Province-partitioned artifact; hive values such as Eastern%20Cape are URL-encoded."""
+    rng = np.random.default_rng(0)
+    n = 5000
+    claims = np.where(rng.random(n) < 0.05, rng.lognormal(8, 1, n), 0.0)
+    df = pd.DataFrame({
+        "province": pd.Categorical(rng.choice(["Eastern Cape", "Gauteng", "North West"], n)),
+        "postalcode": rng.integers(1, 50, n),
+        "transactionmonth": pd.to_datetime(rng.choice(["2015-01-01", "2015-02-01"], n)),
+        "make": rng.choice(["TOYOTA", "NISSAN", "FORD"], n),
+        "totalpremium": rng.lognormal(3, 1, n),
+        "totalclaims": claims,
+        "suminsured": rng.lognormal(10, 1, n),
+    })
+    path = tmp_path_factory.mktemp("analytics") / "clean.parquet"
+    save_data(df, str(path), partition_cols=["province"])
+    return str(path)
+
+
+def test_auto_uses_arrow(clean_path):
+    assert Analytics(clean_path).engine == "arrow"
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_partition_values_are_decoded(clean_path, engine):
+    summary = Analytics(clean_path, engine=engine).segment_summary("province")
+    assert list(summary.index) == ["Eastern Cape", "Gauteng", "North West"]
+
+
+@pytest.mark.parametrize("engine", [e for e in available_engines() if e != "pandas"])
+@pytest.mark.parametrize("query", [
+    lambda a: a.segment_summary("province", extra=["suminsured"]),
+    lambda a: a.segment_summary(["province", "make"]),
+    lambda a: a.frequency_severity("province"),
+    lambda a: a.margin_by_postalcode(filters=[("province", "in", ["Eastern Cape", "North West"])]),
+    lambda a: a.loss_ratio("make", filters=[("province", "==", "Eastern Cape")]),
+])
+def test_engines_match_pandas(clean_path, engine, query):
+    expected = query(Analytics(clean_path, engine="pandas"))
+    result = query(Analytics(clean_path, engine=engine))
+    # partition keys come back categorical from some engines: compare values
+    pd.testing.assert_frame_equal(result, expected, check_index_type=False,
+                                  check_categorical=False, rtol=1e-9)
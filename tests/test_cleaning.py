@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from src.cleaning import clean_data
+
+
+def raw_frame(n=20_000, seed=0):
+    """Raw-named policy rows with ~0.3% claims, like the ACIS data."""
+    rng = np.random.default_rng(seed)
+    has_claim = rng.random(n) < 0.003
+    return pd.DataFrame({
+        "PolicyID": rng.integers(135, 22223, n),
+        "UnderwrittenCoverID": rng.integers(1015, 263091, n),
+        "mmcode": rng.integers(5036102, 64082300, n).astype(float),
+        "RegistrationYear": rng.integers(2001, 2016, n),
+        "PostalCode": rng.integers(1, 9000, n),
+        "TransactionMonth": "2015-03-01 00:00:00",
+        "Province": rng.choice(["Gauteng", "Western Cape"], n),
+        "SumInsured": rng.lognormal(10, 2, n),
+        "CalculatedPremiumPerTerm": rng.lognormal(2.5, 1.5, n),
+        "TotalPremium": rng.lognormal(3.0, 1.4, n),
+        "TotalClaims": np.where(has_claim, rng.lognormal(9.6, 1.3, n), 0.0),
+    })
+
+
+def test_outlier_treatment_keeps_claims():
+    raw = raw_frame()
+    positive = int((raw["TotalClaims"] > 0).sum())
+    assert positive > 0
+
+    df = clean_data(raw.copy(), outliers=True)
+
+    assert int((df["totalclaims"] > 0).sum()) == positive
+    assert int(df["has_claim"].sum()) == positive
+    # ID / code columns are left as they were
+    for raw_col, col in [("PolicyID", "policyid"), ("mmcode", "mmcode"), ("RegistrationYear", "registrationyear")]:
+        assert (df[col].to_numpy() == raw[raw_col].to_numpy()).all()
+
+
+def test_outlier_treatment_caps_continuous_measures():
+    raw = raw_frame()
+    df = clean_data(raw.copy(), outliers=True)
+    assert df["suminsured"].max() <= raw["SumInsured"].quantile(0.995)
+    assert df["totalpremium"].max() < raw["TotalPremium"].max()
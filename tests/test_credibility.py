@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.credibility import CredibilityEncoder, credibility_rates
+
+
+def hand_example():
+    # Groups A, B, C: within SS 2, 2, 20 → EPV = 24 / 6 = 4; weighted
+    # mean 28 / 9; VHM = (882 / 81 - 2 * 4) / (9 - 29 / 9) = 0.5 → k = 8
+    y = [1, 2, 3, 4, 6, 0, 2, 4, 6]
+    province = ["A"] * 3 + ["B"] * 2 + ["C"] * 4
+    return pd.DataFrame({"province": province}), np.array(y, dtype=float)
+
+
+def test_single_level_matches_hand_computed_buhlmann_straub():
+    X, y = hand_example()
+    encoder = CredibilityEncoder(hierarchy=("province",)).fit(X, y)
+    assert encoder.k_[0] == pytest.approx(8.0)
+
+    prior = 28 / 9
+    expected = {"A": (3 * 2 + 8 * prior) / 11, "B": (2 * 5 + 8 * prior) / 10, "C": (4 * 3 + 8 * prior) / 12}
+    encoded = encoder.transform(pd.DataFrame({"province": list(expected) + ["unseen"]}))[:, 0]
+    np.testing.assert_allclose(encoded, list(expected.values()) + [prior])
+
+
+def reference_k(n, s, ss, parent):
+    """Bühlmann-Straub k per parent group, written out with loops."""
+    within = dof = 0.0
+    for i in range(len(n)):
+        within += ss[i] - s[i] ** 2 / n[i]
+        dof += n[i] - 1
+    epv = within / dof
+    between = denom = 0.0
+    parents = sorted(set(parent))
+    for p in parents:
+        members = [i for i in range(len(n)) if parent[i] == p]
+        n_p = sum(n[i] for i in members)
+        mean_p = sum(s[i] for i in members) / n_p
+        between += sum(n[i] * (s[i] / n[i] - mean_p) ** 2 for i in members)
+        denom += n_p - sum(n[i] ** 2 for i in members) / n_p
+    vhm = (between - (len(n) - len(parents)) * epv) / denom
+    return epv / vhm
+
+
+def test_lower_level_variance_is_measured_around_raw_parent_means():
+    n = np.array([3.0, 2.0, 4.0, 5.0])
+    s = np.array([6.0, 10.0, 12.0, 40.0])
+    ss = np.array([14.0, 52.0, 56.0, 330.0])
+    parent = np.array([0, 0, 1, 1])
+    # Shrunk parent rates differ from the raw means (16 / 5 and 52 / 9)
+    shrunk = np.array([3.5, 5.0])
+    _, k = credibility_rates(n, s, ss, parent, shrunk)
+    assert k == pytest.approx(reference_k(n, s, ss, parent))
+
+
+def test_out_of_fold_encoding_never_uses_a_rows_own_target():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "province": rng.choice(["Gauteng", "Western Cape", "Limpopo"], 300),
+        "postalcode": rng.choice([1, 2, 3, 4, 5, 6], 300),
+    })
+    y = rng.gamma(2.0, 100.0, 300)
+    encoder = CredibilityEncoder(n_splits=5, random_state=0)
+    before = encoder.fit_transform(X, y)
+    for row in [0, 17, 299]:
+        changed = y.copy()
+        changed[row] = 1e6
+        after = CredibilityEncoder(n_splits=5, random_state=0).fit_transform(X, changed)
+        # Out-of-fold stats are totals minus the fold's, so only rounding differs
+        np.testing.assert_allclose(after[row], before[row], rtol=1e-9)
+        assert not np.allclose(after, before)
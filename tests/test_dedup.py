@@ -0,0 +1,29 @@
+import warnings
+
+import pandas as pd
+
+from src.dedup import drop_duplicates
+from src.preprocessing import preprocess_for_analysis
+
+
+def test_preprocess_after_dropping_duplicates_does_not_warn():
+    df = pd.DataFrame({
+        "policyid": [1, 1, 2],
+        "totalpremium": [10.0, 10.0, -5.0],
+        "totalclaims": [0.0, 0.0, 3.0],
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        out = preprocess_for_analysis(df)
+    assert len(out) == 2
+    assert out["totalpremium"].tolist() == [10.0, 0.0]
+    assert out["margin"].tolist() == [10.0, -3.0]
+    assert len(df) == 3 and df["totalpremium"].tolist() == [10.0, 10.0, -5.0]
+
+
+def test_drop_duplicates_returns_independent_frame():
+    df = pd.DataFrame({"a": [1, 1, 2], "b": [0.5, 0.5, 1.5]})
+    out, report = drop_duplicates(df)
+    out["b"] = 0.0
+    assert df["b"].tolist() == [0.5, 0.5, 1.5]
+    assert out.index.tolist() == [0, 2]
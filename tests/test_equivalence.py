@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.equivalence import balance_table
+
+
+def frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "group": rng.choice(["A", "B", "C"], n),
+        "premium": 1e9 + rng.gamma(2.0, 50.0, n),
+        "suminsured": np.where(rng.random(n) < 0.1, np.nan, rng.lognormal(10, 1, n)),
+        "postalcode": rng.integers(1, 9000, n),
+        "newvehicle": rng.integers(0, 2, n),
+        "gender": rng.choice(["Male", "Female", None], n),
+    })
+    df.loc[df["group"] == "B", "premium"] += 5.0
+    return df
+
+
+def test_numeric_rows_match_welch_t_test():
+    df = frame()
+    table = balance_table(df, "group", ["premium", "suminsured", "postalcode"], groups=("A", "B")).set_index("feature")
+    for col in ["premium", "suminsured", "postalcode"]:
+        # Reference on values moved near 0, where it is exact itself
+        offset = 1e9 if col == "premium" else 0.0
+        a = df.loc[df["group"] == "A", col].dropna().astype(float) - offset
+        b = df.loc[df["group"] == "B", col].dropna().astype(float) - offset
+        t, p = stats.ttest_ind(a, b, equal_var=False)
+        row = table.loc[col]
+        assert row["type"] == "numeric"
+        assert row["statistic"] == pytest.approx(t, rel=1e-9)
+        assert row["p_value"] == pytest.approx(p, rel=1e-7)
+        assert (row["n_a"], row["n_b"]) == (len(a), len(b))
+        assert row["mean_a"] == pytest.approx(a.mean() + offset, rel=1e-12)
+        pooled = np.sqrt((a.var() + b.var()) / 2)
+        assert row["smd"] == pytest.approx((a.mean() - b.mean()) / pooled, rel=1e-7)
+
+
+def test_categorical_rows_match_chi_squared():
+    df = frame()
+    table = balance_table(df, "group", ["newvehicle", "gender"], groups=("A", "B")).set_index("feature")
+    ab = df[df["group"].isin(["A", "B"])]
+    for col in ["newvehicle", "gender"]:
+        chi2, p, _, _ = stats.chi2_contingency(pd.crosstab(ab["group"], ab[col]))
+        assert table.loc[col, "type"] == "categorical"
+        assert table.loc[col, "statistic"] == pytest.approx(chi2)
+        assert table.loc[col, "p_value"] == pytest.approx(p)
+
+
+def test_untestable_covariates_are_skipped_with_a_reason():
+    df = frame(n=200)
+    df["constant"] = 3.5
+    df["when"] = pd.Timestamp("2015-01-01")
+    table = balance_table(df, "group", ["constant", "when", "missing"], groups=("A", "B")).set_index("feature")
+    assert (table["status"] == "skipped").all()
+    assert table.loc["constant", "reason"] == "zero variance in both groups"
+    assert table.loc["missing", "reason"] == "column not found"
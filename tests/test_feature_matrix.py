@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.feature_matrix import OTHER, SparseFeatureBuilder
+
+NUMERIC = ["suminsured", "kilowatts"]
+CATEGORICAL = ["province", "make"]
+
+
+def policies(n=3000, seed=0, makes=("Toyota", "VW", "Ford", "Nissan", "Rare1", "Rare2")):
+    rng = np.random.default_rng(seed)
+    suminsured = rng.lognormal(11, 1, n)
+    suminsured[rng.random(n) < 0.05] = np.nan
+    p = np.array([0.4, 0.3, 0.15, 0.13, 0.01, 0.01])[: len(makes)]
+    return pd.DataFrame({
+        "suminsured": suminsured,
+        "kilowatts": rng.normal(100, 20, n),
+        "province": pd.Categorical(rng.choice(["Gauteng", "Western Cape", "Limpopo"], n, p=[0.5, 0.3, 0.2])),
+        "make": rng.choice(makes, n, p=p / p.sum()),
+    })
+
+
+def _reference(train, test, **encoder_kwargs):
+    """StandardScaler (missing → 0) plus OneHotEncoder, as a frame keyed by builder-style names."""
+    scaler = StandardScaler().fit(train[NUMERIC])
+    numeric = np.nan_to_num(scaler.transform(test[NUMERIC]), nan=0.0)
+    frame = pd.DataFrame(numeric, columns=NUMERIC)
+    for col in CATEGORICAL:
+        encoder = OneHotEncoder(sparse_output=False, **encoder_kwargs).fit(train[[col]].astype(str))
+        names = [name.replace(f"{col}_infrequent_sklearn", f"{col}={OTHER}").replace(f"{col}_", f"{col}=", 1)
+                 for name in encoder.get_feature_names_out()]
+        frame[names] = encoder.transform(test[[col]].astype(str))
+    return frame
+
+
+def _builder_frame(builder, test):
+    names = builder.get_feature_names_out()
+    return pd.DataFrame(builder.transform(test).toarray(), columns=names)
+
+
+def test_matches_one_hot_encoder_and_scaled_numerics():
+    df = policies()
+    builder = SparseFeatureBuilder(NUMERIC, CATEGORICAL, dtype=np.float64).fit(df)
+    out = _builder_frame(builder, df)
+    expected = _reference(df, df)
+
+    # Every level is kept, so the OTHER columns stay empty and sklearn has none
+    others = [f"{col}={OTHER}" for col in CATEGORICAL]
+    assert (out[others] == 0).all().all()
+    pd.testing.assert_frame_equal(out.drop(columns=others)[expected.columns], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("kwargs,encoder_kwargs", [
+    ({"min_frequency": 100}, {"min_frequency": 100}),
+    ({"max_levels": 3}, {"max_categories": 4}),
+])
+def test_rare_and_unseen_levels_match_infrequent_column(kwargs, encoder_kwargs):
+    train = policies()
+    test = policies(n=500, seed=1, makes=("Toyota", "VW", "Ford", "Nissan", "Rare1", "Unseen"))
+    builder = SparseFeatureBuilder(NUMERIC, CATEGORICAL, dtype=np.float64, **kwargs).fit(train)
+    out = _builder_frame(builder, test)
+    expected = _reference(train, test, handle_unknown="infrequent_if_exist", **encoder_kwargs)
+
+    assert f"make={OTHER}" in expected.columns
+    pd.testing.assert_frame_equal(out[expected.columns], expected, rtol=1e-12)
+    assert out.drop(columns=expected.columns).eq(0).all().all()
+
+
+def test_one_entry_per_input_column():
+    df = policies()
+    builder = SparseFeatureBuilder(NUMERIC, CATEGORICAL, hashed=["make"], n_hash_features=64).fit(df)
+    out = builder.transform(df)
+    assert out.dtype == np.float32
+    assert out.shape == (len(df), len(builder.get_feature_names_out()))
+    np.testing.assert_array_equal(np.diff(out.indptr), len(NUMERIC) + len(CATEGORICAL) + 1)
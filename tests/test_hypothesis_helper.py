@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.Hypothesis_helper import batch_ab_tests, perform_ab_test
+
+FIELDS = ["test_name", "group_a_name", "group_b_name", "group_a_n", "group_b_n",
+          "group_a_mean", "group_b_mean", "effect_size", "relative_diff_pct", "statistic", "p_value"]
+
+
+def policies(n=3000, seed=0, offset=0.0):
+    rng = np.random.default_rng(seed)
+    province = rng.choice(["Gauteng", "Western Cape", "Limpopo", "Free State"], n, p=[0.4, 0.3, 0.2, 0.1])
+    rate = pd.Series(province).map({"Gauteng": 0.08, "Western Cape": 0.05,
+                                    "Limpopo": 0.05, "Free State": 0.12}).to_numpy()
+    claims = np.where(rng.random(n) < rate, rng.lognormal(8, 1, n), 0.0)
+    margin = offset + rng.lognormal(3, 1, n) - claims
+    margin[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        "province": province,
+        "has_claim": (claims > 0).astype(int),
+        "margin": margin,
+    })
+
+
+def _reference(df, pairs, metric, test_type):
+    rows = []
+    for a, b in pairs:
+        result = perform_ab_test(df[df["province"] == a], df[df["province"] == b], metric,
+                                 test_type=test_type, group_a_name=a, group_b_name=b)
+        rows.append({field: result[field] for field in FIELDS})
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("metric,test_type,offset", [
+    ("margin", "ttest", 0.0),
+    ("margin", "ttest", 1e9),
+    ("has_claim", "chi2", 0.0),
+])
+def test_batch_matches_perform_ab_test_row_by_row(metric, test_type, offset):
+    df = policies(offset=offset)
+    batch = batch_ab_tests(df, "province", metric, test_type=test_type)
+    pairs = list(zip(batch["group_a_name"], batch["group_b_name"]))
+    assert len(pairs) == 6
+
+    expected = _reference(df, pairs, metric, test_type)
+    pd.testing.assert_frame_equal(batch[FIELDS], expected, check_exact=False, rtol=1e-6, check_dtype=False)
+
+
+def test_batch_pairs_keep_requested_order():
+    df = policies(seed=1)
+    pairs = [("Limpopo", "Gauteng"), ("Free State", "Western Cape"), ("Gauteng", "Mars")]
+    batch = batch_ab_tests(df, "province", "margin", pairs=pairs, correction=None)
+    expected = _reference(df, pairs[:2], "margin", "ttest")
+    pd.testing.assert_frame_equal(batch[FIELDS], expected, check_exact=False, rtol=1e-6, check_dtype=False)
+    assert (batch["p_adjusted"] == batch["p_value"]).all()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import hypothesis_runner
+from src.hypothesis_runner import TASK3_HYPOTHESES, normalize_spec, run_hypotheses
+
+
+def policies(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    claims = np.where(rng.random(n) < 0.05, rng.lognormal(8, 1, n), 0.0)
+    premium = rng.lognormal(3, 1, n)
+    return pd.DataFrame({
+        "province": pd.Categorical(rng.choice(["Gauteng", "Western Cape", "Limpopo"], n)),
+        "postalcode": pd.Categorical(rng.integers(1, 40, n)),
+        "gender": pd.Categorical(rng.choice(["Male", "Female", "Not specified"], n)),
+        "totalclaims": claims,
+        "has_claim": (claims > 0).astype(int),
+        "margin": premium - claims,
+    })
+
+
+def test_shared_columns_are_zero_copy_views(tmp_path):
+    df = policies()
+    path = hypothesis_runner._write_shared(df, str(tmp_path))
+    hypothesis_runner._init_worker(path)
+    try:
+        frame = hypothesis_runner._shared_columns(["province", "totalclaims", "margin"])
+        buffer = hypothesis_runner._SHARED["table"].column("totalclaims").chunk(0).buffers()[1]
+        values = frame["totalclaims"].to_numpy()
+        assert values.ctypes.data == buffer.address
+        assert not values.flags.writeable
+        pd.testing.assert_frame_equal(frame, df[["province", "totalclaims", "margin"]])
+    finally:
+        hypothesis_runner._SHARED.clear()
+
+
+@pytest.mark.parametrize("spec", TASK3_HYPOTHESES, ids=lambda s: s["id"])
+def test_worker_matches_in_process(tmp_path, spec):
+    df = policies()
+    spec = normalize_spec(spec)
+    hypothesis_runner._init_worker(hypothesis_runner._write_shared(df, str(tmp_path)))
+    try:
+        shared = hypothesis_runner._worker(spec)
+    finally:
+        hypothesis_runner._SHARED.clear()
+    assert shared == hypothesis_runner.run_hypothesis(df, spec)
+
+
+def test_process_pool_matches_serial():
+    df = policies()
+    serial = run_hypotheses(df, TASK3_HYPOTHESES, cache_dir=None)
+    pooled = run_hypotheses(df, TASK3_HYPOTHESES, n_jobs=2, cache_dir=None)
+    pd.testing.assert_frame_equal(serial, pooled)
@@ -0,0 +1,39 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_import_time_budget():
+    """benchmarks/bench_import.py: data and stats paths within budget, no heavy deps loaded."""
+    out = subprocess.run([sys.executable, str(ROOT_DIR / "benchmarks" / "bench_import.py"), "--repeat", "3"],
+                         capture_output=True, text=True)
+    assert out.returncode == 0, out.stdout + out.stderr
+
+
+def data_dir(cwd, package_parent, **env):
+    code = "import src.data_loader as d, src.instrumentation as i; print(d.DATA_DIR); print(i.RUN_DIR)"
+    environ = {k: v for k, v in os.environ.items() if k != "ACIS_DATA_DIR"}
+    environ.update(env, PYTHONPATH=str(package_parent))
+    out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=environ,
+                         capture_output=True, text=True, check=True)
+    return [Path(line) for line in out.stdout.split()]
+
+
+def test_data_dir_of_checkout(tmp_path):
+    assert data_dir(tmp_path, ROOT_DIR) == [ROOT_DIR / "data", ROOT_DIR / "data" / "runs"]
+
+
+def test_data_dir_of_installed_package(tmp_path):
+    site = tmp_path / "site-packages"
+    shutil.copytree(ROOT_DIR / "src", site / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    work = tmp_path / "work"
+    work.mkdir()
+    assert data_dir(work, site) == [work / "data", work / "data" / "runs"]
+
+
+def test_data_dir_from_environment(tmp_path):
+    assert data_dir(tmp_path, ROOT_DIR, ACIS_DATA_DIR=str(tmp_path / "store"))[0] == tmp_path / "store"
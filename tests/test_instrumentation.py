@@ -0,0 +1,30 @@
+import functools
+import json
+
+import pandas as pd
+import pytest
+
+from src import run_cleaning
+from src.instrumentation import RunLog, instrumented
+
+
+@instrumented
+def failing_stage(df):
+    raise RuntimeError("boom")
+
+
+def test_failed_cleaning_run_still_saves_its_log(tmp_path, monkeypatch):
+    def _run(args):
+        failing_stage(pd.DataFrame({"a": [1, 2]}))
+
+    monkeypatch.setattr(run_cleaning, "_run", _run)
+    monkeypatch.setattr(run_cleaning, "RunLog", functools.partial(RunLog, directory=tmp_path))
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_cleaning.main([])
+
+    [log] = tmp_path.glob("*.json")
+    saved = json.loads(log.read_text())
+    assert saved["error"] == "RuntimeError"
+    assert [r["stage"] for r in saved["records"]] == ["failing_stage"]
+    assert saved["records"][0]["error"] == "RuntimeError"
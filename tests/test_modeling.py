@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+from src.modeling import TrainingHarness
+
+
+class AllocatingRegressor(RegressorMixin, BaseEstimator):
+    """Mean predictor that holds a large scratch buffer while fitting."""
+
+    def __init__(self, scratch_mb: int = 0):
+        self.scratch_mb = scratch_mb
+
+    def fit(self, X, y):
+        scratch = np.ones(self.scratch_mb * 2 ** 20 // 8)
+        self.mean_ = float(np.mean(y)) + scratch[0] - 1
+        return self
+
+    def predict(self, X):
+        return np.full(X.shape[0], self.mean_)
+
+
+def test_run_records_timing_and_rss_peak(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=600), "b": rng.normal(size=600)})
+    y = 2 * X["a"] - X["b"] + rng.normal(scale=0.1, size=600)
+    harness = TrainingHarness("regression", n_splits=2, max_workers=1, root=tmp_path)
+    harness.prepare(StandardScaler(), X[:500], y[:500], X[500:], y[500:])
+
+    results = harness.run({"linear": LinearRegression(), "scratch": AllocatingRegressor(scratch_mb=200)})
+
+    assert len(results) == 6
+    assert (results["fit_s"] >= 0).all() and (results["predict_s"] >= 0).all()
+    scratch = results[results["model"] == "scratch"]
+    # the fit's own allocation is counted on every task, not only the process's first
+    assert (scratch["peak_mb"] > 150).all()
+    assert (results.loc[results["model"] == "linear", "peak_mb"] < 150).all()
+
+
+def test_preprocessors_with_the_same_repr_get_their_own_matrices(tmp_path):
+    # sklearn shortens long reprs: these two differ only past the cut-off
+    columns = [f"c{i}" for i in range(40)]
+    all_columns = ColumnTransformer([("num", StandardScaler(), columns)])
+    fewer_columns = ColumnTransformer([("num", StandardScaler(), columns[:-1])])
+    assert repr(all_columns) == repr(fewer_columns)
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(60, 40)), columns=columns)
+    y = rng.normal(size=60)
+    harness = TrainingHarness("regression", n_splits=2, max_workers=1, root=tmp_path)
+    first = harness.prepare(all_columns, X[:50], y[:50], X[50:], y[50:])
+    second = harness.prepare(fewer_columns, X[:50], y[:50], X[50:], y[50:])
+    assert first != second
+    assert len(harness.feature_names()) == 39
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from src.monitoring import MonthlyMonitor
+
+
+def policies(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "province": rng.choice(["Gauteng", "None", None], n),
+        "covertype": "Own Damage",
+        "vehicletype": "Passenger Vehicle",
+        "gender": rng.choice(["Male", "Female"], n),
+        "transactionmonth": pd.to_datetime("2015-01-01") + pd.to_timedelta(rng.integers(0, 59, n), "D"),
+        "totalpremium": rng.gamma(2.0, 50.0, n),
+        "totalclaims": np.where(rng.random(n) < 0.2, rng.gamma(2.0, 500.0, n), 0.0),
+    })
+
+
+def test_appending_the_same_rows_twice_counts_them_once(tmp_path):
+    df = policies()
+    monitor = MonthlyMonitor(tmp_path)
+    assert len(monitor.append(df)) == 2
+    assert monitor.append(df) == []
+    assert monitor.series()["policies"].sum() == len(df)
+
+    more = policies(seed=1)
+    assert len(monitor.append(more)) == 2
+    assert monitor.series()["policies"].sum() == len(df) + len(more)
+
+
+def test_replace_overwrites_what_was_added(tmp_path):
+    df = policies()
+    monitor = MonthlyMonitor(tmp_path)
+    monitor.append(df)
+    monitor.append(policies(seed=1))
+    monitor.rebuild(df)
+    assert monitor.series()["policies"].sum() == len(df)
+
+
+def test_missing_segment_values_stay_apart_from_a_none_level(tmp_path):
+    df = policies()
+    monitor = MonthlyMonitor(tmp_path)
+    monitor.append(df)
+
+    level = monitor.series(filters={"province": "None"})["policies"].sum()
+    missing = monitor.series(filters={"province": None})["policies"].sum()
+    assert level == (df["province"] == "None").sum()
+    assert missing == df["province"].isna().sum()
+    assert monitor.series(by="province")["policies"].sum() == len(df)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.Hypothesis_helper import adjust_pvalues
+from src.multigroup import KGroupTests, studentized_range_sf
+
+
+def frame(groups=30, n=3000, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"g": rng.integers(0, groups, n), "x": rng.normal(1000, 50, n)})
+
+
+def test_constant_group_has_zero_variance():
+    df = frame()
+    df.loc[df["g"] == 3, "x"] = 1234.567
+    n, mean, var = KGroupTests(df, "g", "x").moments
+    assert var[3] == 0
+    assert (var[np.arange(len(var)) != 3] > 0).all()
+
+
+def test_welch_anova_leaves_out_zero_variance_groups():
+    df = frame()
+    df.loc[df["g"] == 3, "x"] = 1234.567
+    result = KGroupTests(df, "g", "x").welch_anova()
+    expected = KGroupTests(df[df["g"] != 3], "g", "x").welch_anova()
+    assert result["groups_tested"] == 29
+    assert np.isclose(result["statistic"], expected["statistic"])
+    assert np.isclose(result["p_value"], expected["p_value"])
+
+
+def test_welch_anova_nan_without_two_varying_groups():
+    df = pd.DataFrame({"g": [0, 0, 1, 1, 2, 2], "x": [1.0, 1.0, 2.0, 2.0, 3.0, 4.0]})
+    result = KGroupTests(df, "g", "x").welch_anova()
+    assert result["groups_tested"] == 1
+    assert np.isnan(result["statistic"]) and np.isnan(result["p_value"])
+
+
+def test_games_howell_nan_for_two_constant_groups():
+    df = frame(groups=4)
+    df.loc[df["g"] == 0, "x"] = 5.0
+    df.loc[df["g"] == 1, "x"] = 7.0
+    pairs = KGroupTests(df, "g", "x").games_howell()
+    both_constant = (pairs["group_a_name"] == 0) & (pairs["group_b_name"] == 1)
+    assert pairs.loc[both_constant, ["statistic", "p_value"]].isna().all(axis=None)
+    assert pairs.loc[~both_constant, ["statistic", "p_value"]].notna().all(axis=None)
+    assert (pairs.loc[~both_constant, "statistic"] < 1e6).all()
+
+
+def unequal_groups(seed=2):
+    """Five groups of different sizes, means and spreads; rounded, so ranks tie."""
+    rng = np.random.default_rng(seed)
+    sizes, means, sds = [40, 55, 70, 25, 90], [10, 11, 10.5, 13, 9.5], [1, 2, 1.5, 3, 1]
+    return pd.DataFrame({
+        "g": np.repeat(list("abcde"), sizes),
+        "x": np.round(np.concatenate([rng.normal(m, s, n) for n, m, s in zip(sizes, means, sds)]), 1),
+    })
+
+
+def samples(df):
+    return [df.loc[df["g"] == g, "x"].to_numpy() for g in sorted(df["g"].unique())]
+
+
+def test_anova_matches_f_oneway():
+    df = unequal_groups()
+    result = KGroupTests(df, "g", "x").anova()
+    expected = stats.f_oneway(*samples(df))
+    assert result["statistic"] == pytest.approx(expected.statistic, rel=1e-9)
+    assert result["p_value"] == pytest.approx(expected.pvalue, rel=1e-6)
+
+
+def test_kruskal_matches_scipy_with_ties():
+    df = unequal_groups()
+    result = KGroupTests(df, "g", "x").kruskal()
+    expected = stats.kruskal(*samples(df))
+    assert result["statistic"] == pytest.approx(expected.statistic, rel=1e-9)
+    assert result["p_value"] == pytest.approx(expected.pvalue, rel=1e-6)
+
+
+def test_dunn_matches_reference():
+    df = unequal_groups()
+    pairs = KGroupTests(df, "g", "x").dunn(correction="holm")
+
+    # Reference: Dunn (1964) with the tie correction, from scipy's ranks
+    ranks = stats.rankdata(df["x"])
+    total = len(df)
+    _, ties = np.unique(df["x"], return_counts=True)
+    scale = total * (total + 1) / 12 - (ties ** 3 - ties).sum() / (12 * (total - 1))
+    mean_rank = pd.Series(ranks).groupby(df["g"].to_numpy()).mean()
+    n = df["g"].value_counts()
+    z, p = [], []
+    for a, b in zip(pairs["group_a_name"], pairs["group_b_name"]):
+        z.append((mean_rank[a] - mean_rank[b]) / np.sqrt(scale * (1 / n[a] + 1 / n[b])))
+        p.append(2 * stats.norm.sf(abs(z[-1])))
+    np.testing.assert_allclose(pairs["statistic"], z, rtol=1e-9)
+    np.testing.assert_allclose(pairs["p_value"], p, rtol=1e-7)
+    # Holm: step-down over the sorted p-values
+    order = np.argsort(p)
+    holm = np.minimum(1, np.maximum.accumulate(np.array(p)[order] * (len(p) - np.arange(len(p)))))
+    np.testing.assert_allclose(pairs["p_adjusted"].to_numpy()[order], holm, rtol=1e-9)
+    np.testing.assert_allclose(adjust_pvalues(p, "holm")[order], holm, rtol=1e-9)
+
+
+def test_games_howell_matches_reference():
+    df = unequal_groups()
+    pairs = KGroupTests(df, "g", "x").games_howell()
+    groups = dict(zip(sorted(df["g"].unique()), samples(df)))
+    for row in pairs.itertuples():
+        a, b = groups[row.group_a_name], groups[row.group_b_name]
+        va, vb = a.var(ddof=1) / len(a), b.var(ddof=1) / len(b)
+        q = abs(b.mean() - a.mean()) / np.sqrt((va + vb) / 2)
+        dof = (va + vb) ** 2 / (va ** 2 / (len(a) - 1) + vb ** 2 / (len(b) - 1))
+        assert row.statistic == pytest.approx(q, rel=1e-9)
+        assert row.dof == pytest.approx(dof, rel=1e-9)
+        assert row.p_value == pytest.approx(stats.studentized_range.sf(q, len(groups), dof), rel=0.01, abs=1e-12)
+
+
+@pytest.mark.parametrize("k", [2, 5, 30])
+def test_studentized_range_sf_within_1_percent_of_scipy(k):
+    q = np.geomspace(0.1, 80, 14)
+    for dof in [1.5, 3, 10, 100, 2e4, np.inf]:
+        expected = stats.studentized_range.sf(q, k, dof)
+        checked = expected > 1e-9
+        got = studentized_range_sf(q, k, dof)
+        np.testing.assert_allclose(got[checked], expected[checked], rtol=0.01)
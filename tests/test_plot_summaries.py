@@ -0,0 +1,42 @@
+import matplotlib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.plot_summaries import SummaryCache, box_stats
+
+matplotlib.use("Agg")
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"g": rng.choice(["a", "b", "c"], 500), "x": rng.lognormal(0, 1, 500)})
+
+
+def test_box_stats_matches_matplotlib(df):
+    from matplotlib.cbook import boxplot_stats
+
+    box = box_stats(df, "x", by="g", cache=SummaryCache())
+    for stats in box.stats():
+        expected = boxplot_stats(df.loc[df["g"] == stats["label"], "x"].to_numpy())[0]
+        for key in ("mean", "med", "q1", "q3", "whislo", "whishi"):
+            assert np.isclose(stats[key], expected[key])
+
+
+@pytest.mark.parametrize("where", [np.zeros(500, dtype=bool), None])
+def test_box_stats_of_empty_selection(df, where):
+    data = df if where is not None else df.iloc[:0]
+    box = box_stats(data, "x", by="g", where=where, cache=SummaryCache())
+    assert box.to_frame().empty
+    assert box.stats() == []
+    assert list(box.to_frame().columns) == ["n", "mean", "q1", "median", "q3", "whislo", "whishi", "n_fliers"]
+
+
+def test_empty_box_stats_plot(df):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    box_stats(df, "x", by="g", where=np.zeros(len(df), dtype=bool), cache=SummaryCache()).plot(ax)
+    assert ax.get_ylabel() == "x"
+    plt.close(fig)
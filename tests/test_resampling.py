@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.resampling import (
+    bootstrap_cohens_d,
+    permutation_frequency_test,
+    permutation_margin_test,
+    resample,
+)
+
+
+def ab_frame(n=400, shift=6.0, seed=0):
+    rng = np.random.default_rng(seed)
+    group = np.where(rng.random(n) < 0.4, "A_Control", "B_Test")
+    margin = rng.normal(50.0, 40.0, n) + np.where(group == "B_Test", shift, 0.0)
+    has_claim = (rng.random(n) < np.where(group == "B_Test", 0.18, 0.12)).astype(int)
+    return pd.DataFrame({"ab_group": group, "margin": margin, "has_claim": has_claim})
+
+
+def test_margin_p_value_matches_scipy_permutation_test():
+    df = ab_frame()
+    diff, p = permutation_margin_test(df, n_resamples=20_000, seed=1)
+
+    a = df.loc[df["ab_group"] == "A_Control", "margin"].to_numpy()
+    b = df.loc[df["ab_group"] == "B_Test", "margin"].to_numpy()
+    expected = stats.permutation_test(
+        (a, b), lambda x, y: x.mean() - y.mean(), permutation_type="independent",
+        n_resamples=20_000, alternative="two-sided", random_state=1,
+    )
+    assert diff == pytest.approx(expected.statistic)
+    assert 0.01 < expected.pvalue < 0.5
+    # Both are Monte Carlo estimates: a few standard errors apart at most
+    assert p == pytest.approx(expected.pvalue, abs=0.015)
+
+
+def test_frequency_p_value_matches_scipy_permutation_test():
+    df = ab_frame(seed=3)
+    chi2, p, _ = permutation_frequency_test(df, n_resamples=20_000, seed=1)
+
+    claims = df["has_claim"].to_numpy()
+
+    def statistic(is_test):
+        table = np.array([np.bincount(claims[is_test == g], minlength=2) for g in (0, 1)])
+        return stats.chi2_contingency(table)[0]
+
+    expected = stats.permutation_test(
+        ((df["ab_group"] == "B_Test").to_numpy(dtype=int),), statistic, permutation_type="pairings",
+        n_resamples=4_000, alternative="greater", random_state=1,
+    )
+    assert chi2 == pytest.approx(expected.statistic)
+    assert p == pytest.approx(expected.pvalue, abs=0.03)
+
+
+@pytest.mark.parametrize("kernel,args", [
+    ("perm_mean_diff", (np.arange(50, dtype=float), 20, 2 ** 12)),
+    ("perm_binary_chi2", (np.array([120, 80]), 30)),
+])
+def test_resample_is_identical_for_any_n_jobs(kernel, args):
+    serial = resample(kernel, args, n_resamples=1_000, seed=7, n_jobs=1)
+    for n_jobs in (2, 3):
+        np.testing.assert_array_equal(resample(kernel, args, n_resamples=1_000, seed=7, n_jobs=n_jobs), serial)
+    assert not np.array_equal(resample(kernel, args, n_resamples=1_000, seed=8), serial)
+
+
+def test_bootstrap_is_identical_for_any_n_jobs():
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(0, 1, 60), rng.normal(0.5, 1, 80)
+    assert bootstrap_cohens_d(a, b, n_resamples=600, seed=3, n_jobs=1) == \
+        bootstrap_cohens_d(a, b, n_resamples=600, seed=3, n_jobs=2)
@@ -0,0 +1,50 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.scoring import ScoringStats, serve
+
+
+@pytest.fixture
+def server():
+    # Malformed payloads are rejected before the model is used
+    httpd = serve(model=None, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize("payload", [5, None, [1, 2]])
+def test_malformed_json_payload_is_a_bad_request(server, payload):
+    request = urllib.request.Request(f"{server}/score", data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request, timeout=5)
+    assert error.value.code == 400
+    assert "error" in json.loads(error.value.read())
+
+
+def test_stats_from_concurrent_threads_add_up():
+    stats = ScoringStats()
+    snapshots = []
+
+    def work():
+        for _ in range(2000):
+            stats.add(3, 0.001)
+            if _ % 100 == 0:
+                snapshots.append(stats.to_dict())
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert stats.batches == 16000 and stats.rows == 48000
+    assert len(stats.latencies) == 16000
+    assert all(s["rows"] == 3 * s["batches"] for s in snapshots)
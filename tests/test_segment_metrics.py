@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.Hypothesis_helper import calculate_claim_frequency, calculate_claim_severity, calculate_margin
+from src.segment_metrics import MetricCache, SegmentMetrics
+
+
+def policies(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    province = rng.choice(["Gauteng", "Western Cape", "Limpopo", "Northern Cape"], n, p=[0.4, 0.3, 0.29, 0.01])
+    claims = np.where((rng.random(n) < 0.06) & (province != "Northern Cape"), rng.lognormal(8, 1, n), 0.0)
+    premium = rng.lognormal(3, 1, n)
+    return pd.DataFrame({
+        "province": pd.Categorical(province),
+        "gender": pd.Categorical(rng.choice(["Male", "Female", "Not specified"], n)),
+        "totalclaims": claims,
+        "totalpremium": premium,
+        "margin": premium - claims,
+        "has_claim": (claims > 0).astype(int),
+    })
+
+
+def _expected(df, by):
+    grouped = df.groupby(by, observed=True)
+    return pd.DataFrame({
+        "exposure": grouped.size(),
+        "claim_count": grouped["has_claim"].sum(),
+        "claim_frequency": grouped.apply(calculate_claim_frequency, include_groups=False),
+        "claim_severity": grouped.apply(calculate_claim_severity, include_groups=False),
+        "margin": grouped.apply(calculate_margin, include_groups=False),
+        "premium": grouped["totalpremium"].mean(),
+        "loss_ratio": grouped["totalclaims"].sum() / grouped["totalpremium"].sum(),
+    })
+
+
+def _assert_matches(metrics, expected):
+    pd.testing.assert_frame_equal(metrics.sort_index(), expected.sort_index(), check_exact=False, rtol=1e-9,
+                                  check_dtype=False, check_index_type=False, check_categorical=False)
+
+
+@pytest.mark.parametrize("by", ["province", ["province", "gender"]])
+def test_metrics_match_helpers(by):
+    df = policies()
+    _assert_matches(SegmentMetrics(df, cache=MetricCache()).metrics(by), _expected(df, by))
+
+
+def test_rollups_match_helpers():
+    df = policies(seed=1)
+    metrics = SegmentMetrics(df, cache=MetricCache())
+    metrics.cells(["province", "gender"])
+
+    _assert_matches(metrics.metrics("province"), _expected(df, "province"))
+    _assert_matches(metrics.metrics("gender", filters={"province": ["Gauteng", "Limpopo"]}),
+                    _expected(df[df["province"].isin(["Gauteng", "Limpopo"])], "gender"))
+    assert (metrics.cache.misses, metrics.cache.rollups) == (1, 2)
+
+    # Northern Cape has no claims: severity 0 as calculate_claim_severity
+    assert metrics.metrics("province").loc["Northern Cape", "claim_severity"] == 0
+    assert metrics.cache.hits == 1
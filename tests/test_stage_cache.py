@@ -0,0 +1,62 @@
+import warnings
+
+import pandas as pd
+
+from src import stage_cache
+from src.cleaning import apply_outlier_treatment, clean_column_names
+from src.stage_cache import Partitioned, StageCache, code_fingerprint
+
+
+def edited(monkeypatch, module):
+    """Pretend the source of `module` changed."""
+    source = stage_cache._module_source
+
+    def patched(name):
+        return source(name) + "\n# edited" if name == module else source(name)
+
+    monkeypatch.setattr(stage_cache, "_module_source", patched)
+
+
+def test_fingerprint_is_stable():
+    assert code_fingerprint(apply_outlier_treatment) == code_fingerprint(apply_outlier_treatment)
+
+
+def test_fingerprint_covers_modules_the_stage_uses(monkeypatch):
+    before = code_fingerprint(apply_outlier_treatment)
+    edited(monkeypatch, "src.outliers")
+    assert code_fingerprint(apply_outlier_treatment) != before
+
+
+def test_fingerprint_covers_modules_imported_by_those(monkeypatch):
+    before = code_fingerprint(apply_outlier_treatment)
+    edited(monkeypatch, "src.sketches")
+    assert code_fingerprint(apply_outlier_treatment) != before
+
+
+def test_unrelated_module_edit_keeps_key(monkeypatch):
+    before = code_fingerprint(clean_column_names)
+    edited(monkeypatch, "src.outliers")
+    assert code_fingerprint(clean_column_names) == before
+
+
+def add_total(df):
+    df["total"] = df["a"] + df["b"]
+    return df
+
+
+def test_partitions_are_not_views_of_the_input(tmp_path):
+    df = pd.DataFrame({"month": [1, 2, 1, 2], "a": [1, 2, 3, 4], "b": [10, 20, 30, 40]})
+    cache = StageCache(tmp_path)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        out, _, _ = cache.run_partitioned(Partitioned([("add_total", add_total)], "month"), df)
+    assert out["total"].tolist() == [11, 22, 33, 44]
+    assert "total" not in df.columns
+
+
+def test_put_never_evicts_the_entry_it_wrote(tmp_path):
+    cache = StageCache(tmp_path, max_bytes=1)
+    cache.put("old", pd.DataFrame({"a": [1]}))
+    cache.put("new", pd.DataFrame({"a": [2]}))
+    assert cache.get("new") is not None
+    assert cache.get("old") is None
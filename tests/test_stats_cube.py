@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from src.segment_metrics import SegmentMetrics
+from src.stats_cube import StatsCube, _add_moments, _from_sumsq
+
+
+def _frame(seed=0, rows=2000, offset=1e9):
+    rng = np.random.default_rng(seed)
+    claims = np.where(rng.random(rows) < 0.3, offset + rng.gamma(2.0, 50.0, rows), 0.0)
+    premium = offset + rng.normal(0.0, 1.0, rows)
+    return pd.DataFrame({
+        "province": pd.Categorical(rng.choice(["Gauteng", "Western Cape", "Limpopo"], rows)),
+        "gender": pd.Categorical(rng.choice(["Male", "Female"], rows)),
+        "transactionmonth": pd.to_datetime("2015-01-01") + pd.to_timedelta(rng.integers(0, 90, rows), "D"),
+        "totalclaims": claims,
+        "totalpremium": premium,
+    })
+
+
+def _expected_var(df, by):
+    margin = df["totalpremium"] - df["totalclaims"]
+    severity = df["totalclaims"].where(df["totalclaims"] > 0)
+    return pd.DataFrame({
+        "margin_var": margin.groupby(df[by], observed=True).var(),
+        "premium_var": df["totalpremium"].groupby(df[by], observed=True).var(),
+        "severity_var": severity.groupby(df[by], observed=True).var(),
+    })
+
+
+def test_variances_are_accurate_for_large_values():
+    df = _frame()
+    agg = StatsCube.from_frame(df, ["province", "gender", "month"]).slice("province")
+    expected = _expected_var(df, "province")
+    for column in expected.columns:
+        np.testing.assert_allclose(agg[column].sort_index(), expected[column].sort_index(), rtol=1e-6)
+
+
+def test_update_matches_building_from_all_rows():
+    df = _frame(seed=1)
+    first, second = df.iloc[:1200], df.iloc[1200:]
+    dims = ["province", "gender", "month"]
+    updated = StatsCube.from_frame(first, dims).update(second).slice(["province", "gender"])
+    full = StatsCube.from_frame(df, dims).slice(["province", "gender"])
+    pd.testing.assert_frame_equal(updated.sort_index(), full.sort_index(), check_exact=False, rtol=1e-6,
+                                  check_categorical=False, check_index_type=False)
+
+
+def test_segment_metrics_rollup_keeps_variances():
+    df = _frame(seed=2)
+    metrics = SegmentMetrics(df)
+    metrics.cells(["province", "gender"])
+    rolled = metrics.cells("province")
+    assert metrics.cache.rollups == 1
+    expected = _expected_var(df, "province")
+    np.testing.assert_allclose(_add_moments(rolled.copy())["premium_var"].sort_index(),
+                               expected["premium_var"].sort_index(), rtol=1e-6)
+
+
+def test_legacy_sumsq_cells_are_converted():
+    legacy = pd.DataFrame({
+        "province": ["Gauteng"], "n": [3], "claims": [1], "severity_n": [1],
+        "severity_sum": [5.0], "severity_sumsq": [25.0],
+        "margin_sum": [6.0], "margin_sumsq": [14.0],
+        "premium_sum": [9.0], "premium_sumsq": [29.0],
+    })
+    cells = _from_sumsq(legacy)
+    assert "margin_sumsq" not in cells.columns
+    assert cells[["severity_m2", "margin_m2", "premium_m2"]].iloc[0].tolist() == [0.0, 2.0, 2.0]
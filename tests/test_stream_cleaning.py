@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import data_loader, stream_cleaning
+from src.stream_cleaning import ChunkCleaner, clean_data_streaming, collect_stats
+
+from test_cleaning import raw_frame
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(stream_cleaning, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def test_clipping_keeps_claims_and_ids(data_dir):
+    raw = raw_frame()
+    raw.to_csv(data_dir / "raw.txt", sep="|", index=False)
+    positive = int((raw["TotalClaims"] > 0).sum())
+    stats = collect_stats(data_loader.load_raw("raw.txt", chunksize=5000))
+    cleaner = ChunkCleaner(stats, clip_quantiles=(0.01, 0.99))
+    df = pd.concat([cleaner(c) for c in data_loader.load_raw("raw.txt", chunksize=5000)], ignore_index=True)
+
+    assert set(cleaner.clip_bounds) <= {"totalpremium", "calculatedpremiumperterm", "suminsured"}
+    assert int((df["totalclaims"] > 0).sum()) == positive
+    assert (df["policyid"].to_numpy() == raw["PolicyID"].to_numpy()).all()
+    assert (df["mmcode"].to_numpy() == raw["mmcode"].to_numpy()).all()
+    assert df["suminsured"].max() <= raw["SumInsured"].quantile(0.995)
+
+
+def test_streaming_removes_stale_dtype_plan(data_dir):
+    raw_frame(n=2000).to_csv(data_dir / "raw.txt", sep="|", index=False)
+    stale = data_dir / "out.dtypes.json"
+    stale.write_text('{"policyid": "int8"}')
+
+    path, _ = clean_data_streaming("raw.txt", "out.parquet", chunksize=500)
+
+    assert not stale.exists()
+    df = data_loader.load_data("out.parquet")
+    assert len(df) == 2000
+    assert np.issubdtype(df["policyid"].dtype, np.integer) and df["policyid"].max() > 127